@@ -0,0 +1,232 @@
+"""检测循环离线基准：在合成进程表上运行检测逻辑，不需要Tk、托盘或注册表
+
+用法：python benchmarks/bench_detection.py [--sizes 100 1000 10000] [--output bench_detection.json]
+
+对每个进程表规模报告：
+- 每次tick的CPU时间（空闲时的全表扫描、空闲时的增量扫描、被监控进程运行时的缓存命中三种情况）
+- 每次tick的临时内存峰值与净新增内存块数
+- 按脚本化的启动/退出时间线，在虚拟时间中测得的检测延迟p50/p99
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from seewo_watcher.process_events import PollingProcessSource
+from seewo_watcher.rules import RuleSet
+from seewo_watcher.scheduler import AdaptiveScheduler
+from seewo_watcher.snapshot import IncrementalSnapshot
+from seewo_watcher.state import ProcessStateMachine
+
+WATCHED = ("rtcRemoteDesktop.exe", "screenCapture.exe")
+
+
+class SyntheticProcessTable:
+    """合成进程表：提供与psutil遍历相同形式的(pid, 进程名)序列"""
+
+    def __init__(self, size, seed=0):
+        rng = random.Random(seed)
+        self.processes = {}
+        self.resolved = 0
+        self._next_pid = 4
+        for _ in range(size):
+            self.spawn(f"svc{rng.randrange(size)}.exe")
+
+    def spawn(self, name):
+        self._next_pid += 4
+        self.processes[self._next_pid] = name
+        return self._next_pid
+
+    def kill(self, pid):
+        self.processes.pop(pid, None)
+
+    def process_iter(self):
+        return iter(self.processes.items())
+
+    def list_pids(self):
+        return list(self.processes)
+
+    def resolve(self, pid):
+        """单个PID的(名称, 创建时间, 父pid)查询，计数以验证增量扫描只解析新PID"""
+        self.resolved += 1
+        name = self.processes.get(pid)
+        return None if name is None else (name, float(pid), 0)
+
+
+class SyntheticHandles:
+    """与ProcessHandleCache接口一致，存活状态取自合成进程表"""
+
+    def __init__(self, table):
+        self.table = table
+        self.pids = set()
+
+    def add(self, pid, create_time=None):
+        self.pids.add(pid)
+
+    def discard(self, pid):
+        self.pids.discard(pid)
+
+    def clear(self):
+        self.pids.clear()
+
+    def alive(self, pid):
+        return pid in self.pids and pid in self.table.processes
+
+
+def make_detector(table, incremental=False, clock=time.monotonic):
+    rules = RuleSet.from_names(WATCHED)
+    if incremental:
+        differ = IncrementalSnapshot(rules, table.list_pids, table.resolve, clock=clock)
+        source = PollingProcessSource(rules, handles=SyntheticHandles(table), incremental=differ, clock=clock)
+    else:
+        source = PollingProcessSource(rules, enumerate_processes=table.process_iter,
+                                      handles=SyntheticHandles(table), clock=clock)
+    return source, ProcessStateMachine(WATCHED)
+
+
+def tick(source, state_machine):
+    return state_machine.apply(source.poll())
+
+
+def measure_ticks(table, ticks, watched_running, incremental=False):
+    """测量稳定状态下每次tick的CPU时间与内存分配"""
+    source, state_machine = make_detector(table, incremental)
+    pids = [table.spawn(name) for name in WATCHED] if watched_running else []
+    tick(source, state_machine)
+    table.resolved = 0
+    start = time.process_time()
+    for _ in range(ticks):
+        tick(source, state_machine)
+    cpu_us = (time.process_time() - start) / ticks * 1e6
+    resolved = table.resolved / ticks
+
+    tracemalloc.start()
+    blocks_before = sys.getallocatedblocks()
+    peaks = []
+    for _ in range(min(ticks, 50)):
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+        tick(source, state_machine)
+        peaks.append(tracemalloc.get_traced_memory()[1] - base)
+    net_blocks = (sys.getallocatedblocks() - blocks_before) / len(peaks)
+    tracemalloc.stop()
+    for pid in pids:
+        table.kill(pid)
+    return {
+        "cpu_us_per_tick": round(cpu_us, 2),
+        "alloc_peak_bytes_per_tick": int(sum(peaks) / len(peaks)),
+        "net_blocks_per_tick": round(net_blocks, 3),
+        "names_resolved_per_tick": round(resolved, 3),
+    }
+
+
+def make_timeline(duration, transitions, seed=1):
+    """生成脚本化时间线：[(虚拟时间, 进程名, 启动/退出)]，每个进程交替启动与退出"""
+    rng = random.Random(seed)
+    timeline = []
+    for name in WATCHED:
+        times = sorted(rng.uniform(0, duration) for _ in range(transitions))
+        for index, at in enumerate(times):
+            timeline.append((at, name, index % 2 == 0))
+    timeline.sort()
+    return timeline
+
+
+def percentile(values, fraction):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def measure_latency(table, timeline, min_interval, max_interval, burst_duration):
+    """在虚拟时间中按调度器的间隔运行检测，返回每次状态变化的检测延迟(秒)"""
+    now = [0.0]
+    scheduler = AdaptiveScheduler(min_interval, max_interval, burst_duration, clock=lambda: now[0])
+    source, state_machine = make_detector(table, incremental=True, clock=lambda: now[0])
+    running = {name: [] for name in WATCHED}
+    pending = {}
+    latencies = []
+    cursor = 0
+    end = timeline[-1][0] + max_interval * 2 if timeline else 0
+    changed = False
+    while now[0] <= end:
+        now[0] += scheduler.next_interval(changed)
+        while cursor < len(timeline) and timeline[cursor][0] <= now[0]:
+            at, name, start = timeline[cursor]
+            if start:
+                running[name].append(table.spawn(name))
+            elif running[name]:
+                table.kill(running[name].pop())
+            pending.setdefault(name, at)
+            cursor += 1
+        state_changes = tick(source, state_machine)
+        for name, _ in state_changes:
+            if name in pending:
+                latencies.append(now[0] - pending.pop(name))
+        for name in list(pending):
+            # 时间线中发生但状态未变（启动后又在同一tick内退出）的不计入
+            if state_machine.process_states[name] == bool(running[name]):
+                pending.pop(name)
+        changed = bool(state_changes)
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--ticks", type=int, default=200)
+    parser.add_argument("--min-interval", type=float, default=0.05)
+    parser.add_argument("--max-interval", type=float, default=1.0)
+    parser.add_argument("--burst-duration", type=float, default=30.0)
+    parser.add_argument("--timeline-duration", type=float, default=600.0)
+    parser.add_argument("--transitions", type=int, default=100)
+    parser.add_argument("--output", default="bench_detection.json")
+    args = parser.parse_args()
+
+    timeline = make_timeline(args.timeline_duration, args.transitions)
+    results = []
+    for size in args.sizes:
+        table = SyntheticProcessTable(size)
+        idle = measure_ticks(table, args.ticks, watched_running=False)
+        incremental = measure_ticks(table, args.ticks, watched_running=False, incremental=True)
+        cached = measure_ticks(table, args.ticks, watched_running=True)
+        latencies = measure_latency(table, timeline, args.min_interval,
+                                    args.max_interval, args.burst_duration)
+        result = {
+            "processes": size,
+            "idle_tick": idle,
+            "incremental_idle_tick": incremental,
+            "cached_tick": cached,
+            "detections": len(latencies),
+            "latency_p50_ms": round(percentile(latencies, 0.5) * 1000, 2) if latencies else None,
+            "latency_p99_ms": round(percentile(latencies, 0.99) * 1000, 2) if latencies else None,
+        }
+        results.append(result)
+        print(f"{size:>6} 个进程: 空闲tick {idle['cpu_us_per_tick']:.1f}µs / "
+              f"增量 {incremental['cpu_us_per_tick']:.1f}µs / "
+              f"缓存tick {cached['cpu_us_per_tick']:.1f}µs, "
+              f"临时内存 {idle['alloc_peak_bytes_per_tick']}B, "
+              f"检测延迟 p50 {result['latency_p50_ms']}ms p99 {result['latency_p99_ms']}ms")
+
+    report = {
+        "benchmark": "detection",
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "parameters": {key: value for key, value in vars(args).items() if key != "output"},
+        "results": results,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"结果已写入 {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""进程枚举后端吞吐量基准：并排比较各后端每毫秒能枚举多少个进程
+
+用法：python benchmarks/bench_enumerators.py [--rounds 200] [--spawn 200]
+      [--output bench_enumerators.json]
+
+每个当前系统可用的后端测三种操作：
+- full：iter_processes完整扫描一次，得到全部(pid, 进程名)
+- list：list_pids列出一次PID（增量快照每次tick的固定开销）
+- resolve：list_pids后为每个PID调用resolve（增量快照重新同步时的开销）
+
+--spawn额外启动若干个空闲子进程，把进程表扩大到接近桌面系统的规模。
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from seewo_watcher.enumerators import ENUMERATORS, EnumeratorError
+
+
+def spawn_dummies(count):
+    return [subprocess.Popen([sys.executable, "-c", "import time; time.sleep(600)"])
+            for _ in range(count)]
+
+
+def full_scan(enumerator):
+    return sum(1 for _ in enumerator.iter_processes())
+
+
+def list_only(enumerator):
+    return len(enumerator.list_pids())
+
+
+def list_and_resolve(enumerator):
+    resolve = enumerator.resolve
+    pids = enumerator.list_pids()
+    for pid in pids:
+        resolve(pid)
+    return len(pids)
+
+
+OPERATIONS = {"full": full_scan, "list": list_only, "resolve": list_and_resolve}
+
+
+def measure(func, enumerator, rounds):
+    """返回(每毫秒进程数, 每轮耗时毫秒)"""
+    func(enumerator)
+    processes = 0
+    start = time.perf_counter()
+    for _ in range(rounds):
+        processes += func(enumerator)
+    elapsed_ms = (time.perf_counter() - start) * 1e3
+    return processes / elapsed_ms, elapsed_ms / rounds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=200)
+    parser.add_argument("--spawn", type=int, default=200)
+    parser.add_argument("--output", default="bench_enumerators.json")
+    args = parser.parse_args()
+
+    dummies = spawn_dummies(args.spawn)
+    results = {}
+    try:
+        time.sleep(0.5 + args.spawn / 200)
+        print(f"{'后端':<10}{'操作':<10}{'进程/毫秒':>12}{'毫秒/轮':>12}")
+        for name, factory in ENUMERATORS.items():
+            try:
+                enumerator = factory()
+            except EnumeratorError as e:
+                results[name] = {"available": False, "reason": str(e)}
+                print(f"{name:<10}不可用：{e}")
+                continue
+            result = results[name] = {"available": True, "processes": full_scan(enumerator)}
+            for operation, func in OPERATIONS.items():
+                per_ms, ms_per_round = measure(func, enumerator, args.rounds)
+                result[operation] = {"processes_per_ms": round(per_ms, 1),
+                                     "ms_per_round": round(ms_per_round, 3)}
+                print(f"{name:<10}{operation:<10}{per_ms:>12.1f}{ms_per_round:>12.3f}")
+    finally:
+        for proc in dummies:
+            proc.kill()
+            proc.wait()
+
+    report = {
+        "benchmark": "enumerators",
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "parameters": {"rounds": args.rounds, "spawn": args.spawn},
+        "results": results,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"结果已写入 {args.output}")
+
+
+if __name__ == "__main__":
+    main()
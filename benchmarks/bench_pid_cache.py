@@ -0,0 +1,84 @@
+"""PID缓存校验微基准：比较每次新建psutil.Process与持有句柄两种方式
+
+用法：python benchmarks/bench_pid_cache.py [--ticks N]
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import psutil
+
+from seewo_watcher.pidcache import ProcessHandleCache
+
+DUMMY_COUNT = 10
+
+
+def spawn_dummies(count):
+    """启动若干个空闲的子进程作为被缓存的PID"""
+    return [subprocess.Popen([sys.executable, "-c", "import time; time.sleep(600)"])
+            for _ in range(count)]
+
+
+def legacy_tick(pids, name):
+    """原实现：每个缓存PID都新建psutil.Process并查询名称与存活状态"""
+    for pid in pids:
+        try:
+            p = psutil.Process(pid)
+            if not (p.name().lower() == name and p.is_running()):
+                return False
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            return False
+    return True
+
+
+def handle_tick(pids, alive):
+    """新实现：通过缓存的句柄检查存活"""
+    for pid in pids:
+        if not alive(pid):
+            return False
+    return True
+
+
+def measure(func, args, ticks):
+    """返回每次tick的平均耗时(微秒)与平均新分配的内存块数"""
+    func(*args)
+    blocks_before = sys.getallocatedblocks()
+    start = time.perf_counter()
+    for _ in range(ticks):
+        func(*args)
+    elapsed = time.perf_counter() - start
+    blocks = sys.getallocatedblocks() - blocks_before
+    return elapsed / ticks * 1e6, blocks / ticks
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--ticks", type=int, default=2000)
+    args = parser.parse_args()
+
+    dummies = spawn_dummies(DUMMY_COUNT)
+    try:
+        time.sleep(0.5)
+        name = psutil.Process(dummies[0].pid).name().lower()
+        cache = ProcessHandleCache()
+        for proc in dummies:
+            cache.add(proc.pid)
+        print(f"{'缓存PID数':<10}{'psutil.Process(µs)':>20}{'句柄(µs)':>12}{'句柄新分配块/tick':>20}")
+        for count in (0, 1, DUMMY_COUNT):
+            pids = [proc.pid for proc in dummies[:count]]
+            legacy_us, _ = measure(legacy_tick, (pids, name), args.ticks)
+            handle_us, handle_blocks = measure(handle_tick, (pids, cache.alive), args.ticks)
+            print(f"{count:<10}{legacy_us:>20.2f}{handle_us:>12.2f}{handle_blocks:>20.3f}")
+        cache.clear()
+    finally:
+        for proc in dummies:
+            proc.kill()
+            proc.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,214 @@
+"""进程快照内存基准：比较各种快照表示每次tick的内存分配与长时间运行的RSS增长
+
+用法：python benchmarks/bench_snapshot_memory.py [--source synthetic|live] [--processes 1000]
+      [--ticks 20000] [--churn 2] [--output bench_snapshot_memory.json]
+
+对比的实现：
+- process_iter：最初的实现，每次tick构造全部进程对象（各带一个info字典）的列表再逐个比较名称
+- capture：一次遍历(pid, 进程名)建立被监控进程索引（ProcessSnapshot.capture）
+- set_diff：以字典和集合保存上次的PID并做集合差（紧凑快照之前的增量实现）
+- compact：array支撑的紧凑快照与名称驻留表（IncrementalSnapshot）
+
+synthetic在合成进程表上运行，每次tick按--churn启动和结束若干进程；live直接
+使用本机的psutil。每种实现在独立的解释器中运行，RSS互不影响。
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from seewo_watcher.rules import default_rules
+from seewo_watcher.snapshot import IncrementalSnapshot, ProcessSnapshot, iter_processes, list_pids, resolve_process
+
+IMPLEMENTATIONS = ("process_iter", "capture", "set_diff", "compact")
+
+
+class SyntheticProcess:
+    """模拟psutil.Process：每个对象带一个info字典"""
+
+    def __init__(self, pid, name):
+        self.pid = pid
+        self.info = {"pid": pid, "name": name}
+
+
+class SyntheticSystem:
+    """带进程启动/退出的合成进程表，PID单调递增，因此列表天然升序"""
+
+    def __init__(self, size, churn, seed=0):
+        self.rng = random.Random(seed)
+        self.churn = churn
+        self.processes = {}
+        self._next_pid = 4
+        for _ in range(size):
+            self._spawn()
+
+    def _spawn(self):
+        self._next_pid += 4
+        self.processes[self._next_pid] = f"svc{self.rng.randrange(500)}.exe"
+
+    def step(self):
+        for _ in range(self.churn):
+            self.processes.pop(next(iter(self.processes)))
+            self._spawn()
+
+    def process_iter(self):
+        return [SyntheticProcess(pid, name) for pid, name in self.processes.items()]
+
+    def items(self):
+        return iter(self.processes.items())
+
+    def list_pids(self):
+        return list(self.processes)
+
+    def resolve(self, pid):
+        name = self.processes.get(pid)
+        return None if name is None else (name, float(pid), 0)
+
+
+class SetDiffSnapshot:
+    """紧凑快照之前的增量实现：pid -> 规则名的字典加集合差，作为对照"""
+
+    def __init__(self, rules, list_pids, resolve):
+        self.rules = rules
+        self.list_pids = list_pids
+        self.resolve = resolve
+        self.matches = {}
+
+    def update(self):
+        current = set(self.list_pids())
+        stale = {pid: self.matches.pop(pid) for pid in self.matches.keys() - current}
+        new = current - self.matches.keys()
+        for pid in new:
+            info = self.resolve(pid)
+            self.matches[pid] = (self.rules.match(info[0]) or False) if info else False
+        exited = [(rule, pid) for pid, rule in stale.items() if rule]
+        started = [(self.matches[pid], pid) for pid in new if self.matches[pid]]
+        return started, exited
+
+
+def make_tick(implementation, source, rules, system):
+    """返回执行一次扫描的函数"""
+    if source == "live":
+        import psutil
+        process_iter = lambda: list(psutil.process_iter(['pid', 'name']))
+        items, pids, resolve = iter_processes, list_pids, resolve_process
+    else:
+        process_iter, items, pids, resolve = system.process_iter, system.items, system.list_pids, system.resolve
+    watched = {name.lower() for name in rules.names}
+    if implementation == "process_iter":
+        def tick():
+            processes = process_iter()
+            for name in watched:
+                [p.info["pid"] for p in processes if p.info["name"] and p.info["name"].lower() == name]
+        return tick
+    if implementation == "capture":
+        return lambda: ProcessSnapshot.capture(rules, items())
+    if implementation == "set_diff":
+        return SetDiffSnapshot(rules, pids, resolve).update
+    return IncrementalSnapshot(rules, pids, resolve).update
+
+
+def rss_bytes():
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss
+    except ImportError:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+
+def run_worker(implementation, source, processes, ticks, churn):
+    """在当前解释器中运行一种实现，返回测量结果"""
+    rules = default_rules()
+    system = SyntheticSystem(processes, churn) if source == "synthetic" else None
+    step = system.step if system is not None else (lambda: None)
+    tick = make_tick(implementation, source, rules, system)
+    # 预热：第一次扫描解析全部进程
+    for _ in range(3):
+        step()
+        tick()
+    gc.collect()
+
+    tracemalloc.start()
+    peaks = []
+    blocks = []
+    for _ in range(min(ticks, 200)):
+        step()
+        gc.collect()
+        before_blocks = sys.getallocatedblocks()
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+        tick()
+        peaks.append(tracemalloc.get_traced_memory()[1] - base)
+        blocks.append(sys.getallocatedblocks() - before_blocks)
+    tracemalloc.stop()
+
+    gc.collect()
+    rss_before = rss_bytes()
+    start = time.process_time()
+    for _ in range(ticks):
+        step()
+        tick()
+    cpu_us = (time.process_time() - start) / ticks * 1e6
+    gc.collect()
+    rss_after = rss_bytes()
+    return {
+        "cpu_us_per_tick": round(cpu_us, 2),
+        "alloc_peak_bytes_per_tick": int(sum(peaks) / len(peaks)),
+        "net_blocks_per_tick": round(sum(blocks) / len(blocks), 3),
+        "rss_growth_kib": round((rss_after - rss_before) / 1024, 1),
+        "rss_kib": round(rss_after / 1024, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--source", choices=("synthetic", "live"), default="synthetic")
+    parser.add_argument("--processes", type=int, default=1000)
+    parser.add_argument("--ticks", type=int, default=20000)
+    parser.add_argument("--churn", type=int, default=2)
+    parser.add_argument("--output", default="bench_snapshot_memory.json")
+    parser.add_argument("--worker", choices=IMPLEMENTATIONS, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(run_worker(args.worker, args.source, args.processes, args.ticks, args.churn)))
+        return
+
+    results = {}
+    for implementation in IMPLEMENTATIONS:
+        output = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--worker", implementation,
+             "--source", args.source, "--processes", str(args.processes),
+             "--ticks", str(args.ticks), "--churn", str(args.churn)],
+            capture_output=True, text=True, check=True).stdout
+        result = results[implementation] = json.loads(output)
+        print(f"{implementation:>12}: {result['cpu_us_per_tick']:.1f}µs/tick，"
+              f"临时内存 {result['alloc_peak_bytes_per_tick']}B/tick，"
+              f"净增内存块 {result['net_blocks_per_tick']}/tick，"
+              f"{args.ticks}次tick后RSS增长 {result['rss_growth_kib']}KiB")
+
+    report = {
+        "benchmark": "snapshot_memory",
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "parameters": {key: value for key, value in vars(args).items() if key not in ("output", "worker")},
+        "results": results,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"结果已写入 {args.output}")
+
+
+if __name__ == "__main__":
+    main()
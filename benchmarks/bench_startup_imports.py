@@ -0,0 +1,120 @@
+"""依赖检查导入耗时基准：对比逐个导入依赖与find_spec加验证记录两种检查方式
+
+用法：python benchmarks/bench_startup_imports.py [--runs 5] [--top 10] [--output bench_startup_imports.json]
+
+每种方式在新的解释器中以-X importtime运行，报告检查本身的耗时、导入的
+模块总耗时，以及按累计耗时排序的顶层模块（与-X importtime的输出格式一致）。
+只检查本机已安装的依赖，缺失的依赖两种方式都会跳过，避免触发安装流程。
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PRELUDE = """
+import importlib.util, sys, time
+sys.path.insert(0, {root!r})
+from seewo_watcher.adapters import dependencies
+dependencies.REQUIRED = {{lib: pkg for lib, pkg in dependencies.REQUIRED.items()
+                         if importlib.util.find_spec(lib) is not None}}
+start = time.perf_counter()
+"""
+
+MODES = {
+    # 原实现：每次启动逐个__import__所有依赖
+    "import": "for lib in dependencies.REQUIRED:\n    __import__(lib)\n",
+    # 新实现：find_spec + 验证记录命中，跳过实际导入
+    "find_spec": "dependencies.check_dependencies({record!r})\n",
+}
+
+EPILOGUE = """
+print("CHECK_MS", (time.perf_counter() - start) * 1000, file=sys.stderr)
+"""
+
+
+def run_mode(mode, record):
+    """在新解释器中运行一次检查，返回(检查耗时毫秒, [(自身微秒, 累计微秒, 层级, 模块名)])"""
+    code = PRELUDE.format(root=ROOT) + MODES[mode].format(record=record) + EPILOGUE
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                            capture_output=True, text=True, check=True)
+    check_ms = None
+    imports = []
+    started = False
+    for line in result.stderr.splitlines():
+        if line.startswith("CHECK_MS"):
+            check_ms = float(line.split()[1])
+            continue
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        name = name.strip()
+        # 只统计检查开始之后的导入（dependencies模块本身及其之前的不算）
+        if name == "seewo_watcher.adapters.dependencies" and depth == 0:
+            started = True
+            continue
+        if started:
+            imports.append((int(self_us), int(cumulative_us), depth, name))
+    return check_ms, imports
+
+
+def summarize(mode, record, runs, top):
+    checks = []
+    totals = []
+    last_imports = []
+    for _ in range(runs):
+        check_ms, imports = run_mode(mode, record)
+        checks.append(check_ms)
+        totals.append(sum(cumulative for _, cumulative, depth, _ in imports if depth == 0) / 1000)
+        last_imports = imports
+    top_level = sorted((item for item in last_imports if item[2] == 0), key=lambda item: -item[1])
+    return {
+        "check_ms_median": round(statistics.median(checks), 2),
+        "import_ms_median": round(statistics.median(totals), 2),
+        "modules_imported": len(last_imports),
+        "top_modules": [{"module": name, "self_us": self_us, "cumulative_us": cumulative_us}
+                        for self_us, cumulative_us, _, name in top_level[:top]],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--output", default="bench_startup_imports.json")
+    args = parser.parse_args()
+
+    record = os.path.join(tempfile.mkdtemp(), "dependencies_verified.json")
+    # 先运行一次生成验证记录，之后的运行都是记录命中的快速路径
+    run_mode("find_spec", record)
+    results = {}
+    for mode in MODES:
+        results[mode] = summarize(mode, record, args.runs, args.top)
+        summary = results[mode]
+        print(f"{mode:>10}: 检查 {summary['check_ms_median']:.1f}ms，"
+              f"导入 {summary['modules_imported']} 个模块共 {summary['import_ms_median']:.1f}ms")
+        for item in summary["top_modules"]:
+            print(f"{item['self_us']:>12} | {item['cumulative_us']:>12} | {item['module']}")
+
+    report = {
+        "benchmark": "startup_imports",
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "parameters": {"runs": args.runs},
+        "results": results,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"结果已写入 {args.output}")
+
+
+if __name__ == "__main__":
+    main()
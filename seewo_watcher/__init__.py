@@ -0,0 +1,6 @@
+"""希沃窥屏检测器核心模块
+
+核心模块（engine、state、scheduler、settings等）只依赖标准库，psutil在首次
+遍历进程表时才导入，可以在任何系统上导入和运行；托盘、弹窗、注册表、键盘
+和电源等副作用在adapters子包中，由app模块组装成完整程序。
+"""
@@ -0,0 +1,121 @@
+import queue
+import threading
+import time
+
+from .journal import ACTION_ISSUED, ACTION_RESULT
+
+# ================= 动作执行器 =================
+UI_LANE = "ui"
+
+_STOP = object()
+
+
+class TkDispatcher:
+    """把任务交给Tk主线程执行：其他线程只入队，主线程通过root.after定时取出"""
+
+    def __init__(self, root, interval_ms=20):
+        self.root = root
+        self.interval_ms = interval_ms
+        self._tasks = queue.SimpleQueue()
+        self._running = False
+
+    def start(self):
+        self._running = True
+        self.root.after(self.interval_ms, self._drain)
+
+    def stop(self):
+        self._running = False
+
+    def submit(self, func, *args):
+        self._tasks.put((func, args))
+
+    def _drain(self):
+        """在主线程中执行所有已入队的任务"""
+        while True:
+            try:
+                func, args = self._tasks.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                func(*args)
+            except Exception:
+                pass
+        if self._running:
+            self.root.after(self.interval_ms, self._drain)
+
+
+class ActionExecutor:
+    """按动作类型分道执行副作用
+
+    每个类型有独立的队列和工作线程，同一类型的动作严格按提交顺序执行，
+    不同类型之间互不阻塞。ui类型的动作转交Tk主线程执行。
+    提供journal时记录每个动作的提交与执行结果；提供metrics时，带label和
+    detected_at提交的动作在执行完成后记录从检测到完成的延迟。
+    """
+
+    def __init__(self, lanes, dispatcher=None, on_error=None, journal=None, metrics=None,
+                 clock=time.monotonic):
+        self.dispatcher = dispatcher
+        self.on_error = on_error
+        self.journal = journal
+        self.metrics = metrics
+        self.clock = clock
+        self._latency = {}
+        self._queues = {}
+        self._threads = []
+        for lane in lanes:
+            lane_queue = queue.SimpleQueue()
+            self._queues[lane] = lane_queue
+            thread = threading.Thread(target=self._worker, args=(lane, lane_queue),
+                                      name=f"ActionWorker-{lane}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def submit(self, lane, func, *args, label=None, detected_at=None):
+        """提交一个动作，立即返回
+
+        label为延迟指标中的动作名，detected_at为触发该动作的检测时间戳。
+        """
+        if self.journal is not None:
+            self.journal.record(ACTION_ISSUED, lane, getattr(func, "__name__", func))
+        if lane == UI_LANE:
+            if self.dispatcher is None:
+                raise ValueError("没有可用的主线程调度器")
+            self.dispatcher.submit(func, *args)
+            return
+        self._queues[lane].put((func, args, label, detected_at))
+
+    def stop(self):
+        """通知所有工作线程在处理完已提交的动作后退出"""
+        for lane_queue in self._queues.values():
+            lane_queue.put(_STOP)
+        if self.dispatcher is not None:
+            self.dispatcher.stop()
+
+    def _worker(self, lane, lane_queue):
+        while True:
+            item = lane_queue.get()
+            if item is _STOP:
+                return
+            func, args, label, detected_at = item
+            name = getattr(func, "__name__", func)
+            try:
+                func(*args)
+            except Exception as e:
+                if self.journal is not None:
+                    self.journal.record(ACTION_RESULT, lane, f"{name} 失败: {e}")
+                if self.on_error is not None:
+                    self.on_error(lane, e)
+            else:
+                if self.journal is not None:
+                    self.journal.record(ACTION_RESULT, lane, name)
+            if label is not None and detected_at is not None and self.metrics is not None:
+                self._latency_histogram(label).observe(self.clock() - detected_at)
+
+    def _latency_histogram(self, label):
+        histogram = self._latency.get(label)
+        if histogram is None:
+            histogram = self.metrics.histogram(
+                "watcher_action_latency_seconds", "从检测到进程状态变化到动作执行完成的延迟", action=label)
+            self._latency[label] = histogram
+        return histogram
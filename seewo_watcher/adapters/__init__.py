@@ -0,0 +1,5 @@
+"""Windows与Tk相关的副作用适配层
+
+核心模块不导入这里的任何内容。各适配模块只在函数内部导入第三方库，
+导入本包本身不会加载keyboard、pywin32、pystray或Pillow。
+"""
@@ -0,0 +1,112 @@
+import os
+import sys
+from tkinter import Tk, Toplevel, messagebox, ttk
+
+# ================= 提示弹窗 =================
+def show_message(title, message, is_error=False):
+    """通用弹窗函数"""
+    root = Tk()
+    root.withdraw()
+    (messagebox.showerror if is_error else messagebox.showinfo)(title, message)
+    root.destroy()
+
+
+def show_alert(root, changes, alert_duration, alert_on_top):
+    """显示状态变化提醒弹窗（主线程），changes为同一tick中的[(进程名, 是否运行)]，合并在一个弹窗中"""
+    alert_window = Toplevel(root)
+    alert_window.title("状态变化")
+    alert_window.geometry(f"300x{80 + 20 * len(changes)}")
+    alert_window.resizable(False, False)
+    alert_window.update_idletasks()
+    width = alert_window.winfo_width()
+    height = alert_window.winfo_height()
+    x = (alert_window.winfo_screenwidth() // 2) - (width // 2)
+    y = (alert_window.winfo_screenheight() // 2) - (height // 2)
+    alert_window.geometry(f'+{x}+{y}')
+    message = "\n".join(f"{process_name} 已{'启动' if new_state else '终止'}！" for process_name, new_state in changes)
+    ttk.Label(alert_window, text=message).pack(pady=20)
+    alert_window.after(alert_duration * 1000, alert_window.destroy)
+    if alert_on_top:
+        alert_window.lift()
+        alert_window.attributes('-topmost', True)
+        alert_window.after(100, lambda: alert_window.attributes('-topmost', False))
+
+# ================= 免责声明 =================
+def show_disclaimer(settings_dir):
+    """显示免责声明并获取用户同意，同意状态保存在配置目录中"""
+    disclaimer_file = os.path.join(settings_dir, 'disclaimer_accepted')
+    if os.path.exists(disclaimer_file):
+        return True
+    disclaimer_text = """
+    免责声明&用户协议
+
+    本程序为开源技术研究工具，开发者不承担用户使用、传播本程序引发的任何直接或间接责任。使用本程序即视为同意以下条款：
+
+    一、责任豁免
+    1. 您将独自承担使用本程序的所有风险及后果
+    2. 开发者不对程序的完整性、准确性、适用性作任何担保
+    3. 因程序漏洞、数据丢失导致的损失，开发者不承担责任
+    4. 开发者保留随时修改、终止服务的权利，无需提前通知
+
+    二、使用限制
+    1. 禁止用于非法监控、商业间谍等侵犯隐私行为
+    2. 不得违反《网络安全法》《个人信息保护法》等法律法规
+    3. 禁止通过本程序干扰、破坏他人计算机系统
+    4. 不得将本程序用于任何网络攻击行为
+
+    三、知识产权
+    1. 程序涉及的第三方库版权归属原开发者
+    2. 未经许可不得将本程序用于商业用途
+
+    四、法律管辖
+    1. 本声明适用中华人民共和国法律解释
+    2. 争议应提交开发者所在地有管辖权的法院解决
+
+    五、用户承诺
+    1. 已充分理解使用本程序可能存在的法律风险
+    2. 保证使用行为符合所在国家/地区的法律法规
+    3. 若将本程序用于他人设备，已获得合法授权
+
+    继续使用表示您同意承担所有相关责任 请确认您已理解并同意上述条款
+    如果您不同意上述条款，请点击"拒绝"按钮退出程序。
+    """
+    root = Tk()
+    root.title("免责声明&用户协议")
+    root.geometry("800x650")
+    root.resizable(False, False)
+    screen_width = root.winfo_screenwidth()
+    screen_height = root.winfo_screenheight()
+    x = (screen_width - 800) // 2
+    y = (screen_height - 650) // 2
+    root.geometry(f"+{x}+{y}")
+    text = ttk.Label(root, text=disclaimer_text, justify="left", padding=10)
+    text.pack(fill="both", expand=True)
+    button_frame = ttk.Frame(root)
+    button_frame.pack(pady=10)
+    accepted = False
+    
+    def on_accept():
+        if not os.path.exists(settings_dir):
+            try:
+                os.makedirs(settings_dir, exist_ok=True)
+            except Exception as e:
+                show_message("配置错误", f"无法创建配置目录：{str(e)}", True)
+                sys.exit(1)
+        nonlocal accepted
+        accepted = True
+        try:
+            with open(disclaimer_file, 'w') as f:
+                f.write("1")
+        except Exception as e:
+            show_message("错误", f"无法保存同意状态: {str(e)}", True)
+        root.destroy()
+
+    def on_reject():
+        root.destroy()
+    accept_btn = ttk.Button(button_frame, text="同意并继续", command=on_accept)
+    accept_btn.pack(side="left", padx=10)
+    reject_btn = ttk.Button(button_frame, text="拒绝并退出", command=on_reject)
+    reject_btn.pack(side="right", padx=10)
+    root.protocol("WM_DELETE_WINDOW", on_reject)
+    root.mainloop()
+    return accepted
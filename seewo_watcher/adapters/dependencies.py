@@ -0,0 +1,206 @@
+import importlib
+import importlib.util
+import json
+import os
+import subprocess
+import sys
+from threading import Thread
+from tkinter import Tk, messagebox, ttk
+
+from .alerts import show_message
+
+# ================= 前置依赖检查 =================
+# 模块名 -> pip包名
+REQUIRED = {
+    'psutil': 'psutil', 
+    'keyboard': 'keyboard', 
+    'PIL': 'pillow', 
+    'pystray': 'pystray', 
+    'win32api': 'pywin32'
+}
+RECORD_VERSION = 1
+
+
+def find_missing(required=REQUIRED):
+    """只通过find_spec定位模块，不执行模块代码"""
+    missing = []
+    for lib, pkg in required.items():
+        try:
+            spec = importlib.util.find_spec(lib)
+        except (ImportError, ValueError):
+            spec = None
+        if spec is None:
+            missing.append(pkg)
+    return missing
+
+
+def import_missing(required=REQUIRED):
+    """完整检查：实际导入每个模块，返回无法导入的模块名"""
+    still_missing = []
+    for lib in required:
+        try: 
+            __import__(lib)
+        except ImportError:
+            still_missing.append(lib)
+    return still_missing
+
+
+def _normalize(name):
+    return name.lower().replace('-', '_').replace('.', '_')
+
+
+def installed_versions(required=REQUIRED):
+    """从sys.path中dist-info/egg-info目录名读取已安装版本
+
+    只列目录，不导入importlib.metadata（其导入本身就要几十毫秒）。
+    """
+    wanted = {_normalize(pkg) for pkg in required.values()}
+    versions = {}
+    for path in sys.path:
+        try:
+            entries = os.listdir(path or '.')
+        except OSError:
+            continue
+        for entry in entries:
+            stem, ext = os.path.splitext(entry)
+            if ext not in ('.dist-info', '.egg-info'):
+                continue
+            name, _, version = stem.partition('-')
+            key = _normalize(name)
+            if key in wanted and key not in versions:
+                versions[key] = version
+    return versions
+
+
+def dependency_fingerprint(required=REQUIRED):
+    """验证记录的键：解释器路径、Python版本与各依赖包版本"""
+    return {
+        "record_version": RECORD_VERSION,
+        "interpreter": sys.executable,
+        "python": sys.version,
+        "packages": installed_versions(required),
+    }
+
+
+def load_record(record_path):
+    try:
+        with open(record_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except Exception:
+        return None
+
+
+def save_record(record_path, fingerprint):
+    try:
+        from ..persistence import write_text_atomic
+        write_text_atomic(record_path, json.dumps(fingerprint, indent=2, ensure_ascii=False))
+    except Exception:
+        pass
+
+
+def check_dependencies(record_path=None):
+    """前置依赖检查
+
+    模块都能通过find_spec找到，且解释器与包版本和上次完整验证时相同时，
+    直接跳过；否则实际导入一遍，通过后更新验证记录，缺失时安装。
+    """
+    required = REQUIRED
+    missing = find_missing(required)
+    fingerprint = None
+    if not missing and record_path:
+        fingerprint = dependency_fingerprint(required)
+        if load_record(record_path) == fingerprint:
+            return
+    if not missing:
+        missing = [required[lib] for lib in import_missing(required)]
+    if not missing:
+        if record_path:
+            save_record(record_path, fingerprint)
+        return
+    show_message("依赖安装", f"检测到缺少依赖库：{', '.join(missing)}\n点击确定开始自动安装...")
+    progress_root = Tk()
+    progress_root.title("安装依赖")
+    progress_root.geometry("400x150")
+    progress_root.resizable(False, False)
+    screen_width = progress_root.winfo_screenwidth()
+    screen_height = progress_root.winfo_screenheight()
+    x = (screen_width - 400) // 2
+    y = (screen_height - 150) // 2
+    progress_root.geometry(f"+{x}+{y}")
+    progress_root.attributes('-topmost', True)
+    progress_root.lift()
+    progress_root.focus_force()
+    progress_label = ttk.Label(progress_root, text="准备安装依赖...")
+    progress_label.pack(pady=5)
+    progress_bar = ttk.Progressbar(progress_root, orient="horizontal", 
+                                 length=300, mode="determinate")
+    progress_bar.pack(pady=10)
+    detail_label = ttk.Label(progress_root, text="")
+    detail_label.pack(pady=5)
+    current_pkg_label = ttk.Label(progress_root, text="")
+    current_pkg_label.pack(pady=5)
+    install_complete = False
+    failed_packages = []
+    
+    def update_progress(current, total, package, message):
+        """更新进度显示"""
+        progress_bar['value'] = (current / total) * 100
+        progress_label.config(text=f"进度: {current}/{total}")
+        current_pkg_label.config(text=f"正在安装: {package}")
+        detail_label.config(text=message)
+        progress_root.update_idletasks()
+    
+    def on_closing():
+        """处理窗口关闭事件"""
+        nonlocal install_complete
+        if not install_complete:
+            if messagebox.askokcancel("退出", "依赖安装尚未完成，确定要退出吗？"):
+                progress_root.destroy()
+                sys.exit(1)
+        else:
+            progress_root.destroy()
+    progress_root.protocol("WM_DELETE_WINDOW", on_closing)
+    
+    def install_dependencies():
+        """安装缺失的依赖"""
+        nonlocal install_complete, failed_packages
+        total = len(missing)
+        for i, package in enumerate(missing, 1):
+            progress_root.after(0, update_progress, i-1, total, package, "准备安装...")
+            try:
+                result = subprocess.run(
+                    [sys.executable, '-m', 'pip', 'install', package],
+                    capture_output=True,
+                    text=True,
+                    check=True
+                )
+                output = result.stdout
+                status_message = ""
+                if "Successfully installed" in output:
+                    status_message = f"{package} 安装成功"
+                elif "Already satisfied" in output:
+                    status_message = f"{package} 已安装"
+                else:
+                    status_message = output.strip()[:100] + "..." if len(output) > 100 else output.strip()  
+                progress_root.after(0, update_progress, i, total, package, status_message) 
+            except subprocess.CalledProcessError as e:
+                error_msg = e.stderr.strip() if e.stderr else str(e)
+                error_msg = error_msg[:100] + "..." if len(error_msg) > 100 else error_msg
+                progress_root.after(0, update_progress, i, total, package, f"{package} 安装失败: {error_msg}")
+                failed_packages.append(package)
+                continue
+        install_complete = True
+        importlib.invalidate_caches()
+        still_missing = import_missing(required)
+        if failed_packages or still_missing:
+            error_msg = ""
+            if failed_packages:
+                error_msg += f"以下依赖安装失败：{', '.join(failed_packages)}\n"
+            if still_missing:
+                error_msg += f"以下依赖仍缺失：{', '.join(still_missing)}\n"
+            error_msg += f"请手动执行：\npip install {' '.join(missing)}"
+            progress_root.after(0, lambda: messagebox.showerror("安装失败", error_msg))
+            progress_root.after(100, progress_root.destroy)
+            sys.exit(1)
+    Thread(target=install_dependencies, daemon=True).start()
+    progress_root.mainloop()
@@ -0,0 +1,31 @@
+import time
+
+# ================= 键盘模拟 =================
+VK_MEDIA_PLAY_PAUSE = 0xB3
+VK_VOLUME_MUTE = 0xAD
+KEYEVENTF_KEYUP = 2
+
+
+def press_hotkey(key, new_state):
+    """模拟切换虚拟桌面的热键，进程退出时切回左侧桌面"""
+    import keyboard
+    keyboard.press_and_release(key)
+    if not new_state:
+        time.sleep(0.2)
+        keyboard.press_and_release('ctrl+windows+left')
+
+
+def tap_virtual_key(vk):
+    """按下并松开一个虚拟键"""
+    from win32 import win32api
+    win32api.keybd_event(vk, 0, 0, 0)
+    time.sleep(0.1)
+    win32api.keybd_event(vk, 0, KEYEVENTF_KEYUP, 0)
+
+
+def send_media_play_pause():
+    tap_virtual_key(VK_MEDIA_PLAY_PAUSE)
+
+
+def send_volume_mute():
+    tap_virtual_key(VK_VOLUME_MUTE)
@@ -0,0 +1,12 @@
+import platform
+
+# ================= 电源控制 =================
+
+
+def system_sleep():
+    """使系统进入睡眠状态"""
+    if platform.system() != 'Windows':
+        raise RuntimeError("该功能仅支持Windows系统")
+    import ctypes
+    ctypes.windll.kernel32.SetThreadExecutionState(0x80000002)
+    ctypes.windll.powrprof.SetSuspendState(0, 1, 0)
@@ -0,0 +1,33 @@
+import sys
+
+# ================= 注册表操作 =================
+RUN_KEY = r"Software\Microsoft\Windows\CurrentVersion\Run"
+VALUE_NAME = "GlobalProcessWatcher"
+
+
+def get_registry_auto_start():
+    try:
+        import winreg
+        with winreg.OpenKey(winreg.HKEY_CURRENT_USER, RUN_KEY, 0, winreg.KEY_READ) as key:
+            value, _ = winreg.QueryValueEx(key, VALUE_NAME)
+            return value == sys.executable
+    except: return False
+
+
+def set_registry_auto_start(enable):
+    """设置开机自启动注册表项"""
+    try:
+        current_state = get_registry_auto_start()
+        if current_state == enable:
+            return
+        import winreg
+        with winreg.CreateKey(winreg.HKEY_CURRENT_USER, RUN_KEY) as key:
+            if enable:
+                winreg.SetValueEx(key, VALUE_NAME, 0, winreg.REG_SZ, f'"{sys.executable}"')
+            else:
+                try:
+                    winreg.DeleteValue(key, VALUE_NAME)
+                except FileNotFoundError:
+                    pass
+    except Exception as e:
+        raise RuntimeError(f"注册表操作失败：{str(e)}")
@@ -0,0 +1,47 @@
+import os
+import sys
+
+# ================= 系统窗口与权限 =================
+ERROR_ALREADY_EXISTS = 183
+
+
+def hide_console():
+    """隐藏控制台窗口"""
+    if os.name == 'nt':
+        try:
+            import ctypes
+            ctypes.windll.user32.ShowWindow(
+                ctypes.windll.kernel32.GetConsoleWindow(), 0)
+        except Exception:
+            pass
+
+
+def acquire_single_instance(name="GlobalProcessWatcherMutex"):
+    """创建全局互斥量，已有实例在运行时返回None"""
+    if os.name != 'nt':
+        return True
+    import ctypes
+    mutex = ctypes.windll.kernel32.CreateMutexW(None, False, name)
+    if ctypes.windll.kernel32.GetLastError() == ERROR_ALREADY_EXISTS:
+        return None
+    return mutex
+
+
+def admin_check_available():
+    """IsUserAnAdmin能否调用，只检查调用是否成功，不看其返回值"""
+    if os.name != 'nt':
+        return False
+    try:
+        import ctypes
+        ctypes.windll.shell32.IsUserAnAdmin()
+        return True
+    except Exception:
+        return False
+
+
+def relaunch_as_admin():
+    """以管理员权限重新启动本程序"""
+    import ctypes
+    ctypes.windll.shell32.ShellExecuteW(
+        None, "runas", sys.executable, f'"{sys.argv[0]}"', None, 1
+    )
@@ -0,0 +1,17 @@
+import threading
+
+# ================= 系统托盘 =================
+
+
+def create_tray_icon(name, icon, title, items):
+    """创建托盘图标并在后台线程中运行
+
+    items为(文字或返回文字的函数, 回调)列表，文字为函数时每次打开菜单重新计算。
+    """
+    from pystray import Icon, MenuItem
+    tray_icon = Icon(name, icon, title, [
+        MenuItem(text if isinstance(text, str) else (lambda _, text=text: text()), action)
+        for text, action in items
+    ])
+    threading.Thread(target=tray_icon.run, name="TrayIconThread", daemon=True).start()
+    return tray_icon
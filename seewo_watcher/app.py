@@ -0,0 +1,818 @@
+import json
+import os
+import sys
+import threading
+import time
+from threading import Lock
+from tkinter import Tk, messagebox, ttk, Toplevel, StringVar, BooleanVar
+
+from .actions import UI_LANE, ActionExecutor, TkDispatcher
+from .adapters.input import press_hotkey, send_media_play_pause, send_volume_mute
+from .adapters.alerts import show_alert, show_disclaimer, show_message
+from .adapters.power import system_sleep
+from .adapters.registry import get_registry_auto_start, set_registry_auto_start
+from .adapters.system import acquire_single_instance, admin_check_available, hide_console, relaunch_as_admin
+from .adapters.tray import create_tray_icon
+from .config import DEPENDENCY_RECORD_FILE, JOURNAL_FILE, RULES_FILE, SETTINGS_DIR, SETTINGS_FILE
+from .decisions import ACTION_MUTE, DecisionPolicy
+from .engine import DetectionEngine
+from .enumerators import default_enumerator
+from .exporter import MetricsServer
+from .icons import IconAtlas, icon_state
+from .journal import ACTION_ISSUED, ACTION_RESULT, PROCESS_TREE, STATE_CHANGE, EventJournal
+from .metrics import MetricsRegistry
+from .persistence import SettingsWriter, write_text_atomic
+from .rules import ACTION_ALERT, ACTION_HOTKEY, ACTION_KILL, ACTION_PAUSE, ACTION_SLEEP, RuleError, default_rules, load_rules
+from .scheduler import AdaptiveScheduler, parse_hot_hours
+from .settings import WatcherSettings
+from .snapshot import ProcessSnapshot
+from .startup import StartupProfile
+from .termination import TerminationEngine, succeeded
+from .tray import TrayRefresher, menu_state
+
+settings_lock = Lock()
+STARTUP_PHASE_LABELS = {
+    "check_dependencies": "依赖检查",
+    "disclaimer": "免责声明",
+    "load_settings": "读取设置",
+    "load_rules": "读取规则",
+    "snapshot": "进程快照",
+    "registry": "注册表",
+    "tray": "托盘",
+    "hide_console": "隐藏控制台",
+    "tk": "窗口",
+    "event_source": "事件源",
+}
+
+# ================= 配置管理 =================
+def load_settings():
+    """配置加载，兼容旧版本"""
+    if not os.path.exists(SETTINGS_DIR):
+        try:
+            os.makedirs(SETTINGS_DIR, exist_ok=True)
+        except Exception as e:
+            show_message("配置错误", f"无法创建配置目录：{str(e)}", True)
+            sys.exit(1)
+    try:
+        loaded = {}
+        if os.path.exists(SETTINGS_FILE):
+            with settings_lock, open(SETTINGS_FILE, 'r', encoding='utf-8') as f:
+                loaded = json.load(f)
+        return WatcherSettings.from_dict(loaded)
+    except Exception as e:
+        show_message("配置错误", f"加载设置失败：{str(e)}", True)
+        return WatcherSettings()
+
+def load_watch_rules():
+    """加载监控规则，规则文件有误时提示并使用默认规则"""
+    try:
+        return load_rules(RULES_FILE)
+    except (RuleError, OSError) as e:
+        show_message("规则错误", f"加载监控规则失败，已使用默认规则：{str(e)}", True)
+        return default_rules()
+
+# ================= 核心功能类 =================
+class GlobalProcessWatcher:
+    def __init__(self, startup=None):
+        """初始化监控器：互不依赖的阶段在后台线程中并行执行，各阶段耗时记录在startup中"""
+        self.startup = startup if startup is not None else StartupProfile()
+        # 不可变的设置快照，修改时整体替换
+        with self.startup.phase("load_settings"):
+            self.settings = load_settings()
+        with self.startup.phase("load_rules"):
+            self.rules = load_watch_rules()
+        self.settings_update_lock = Lock()
+        self.running = True
+        self.termination = TerminationEngine()
+        self.journal = EventJournal(path=JOURNAL_FILE)
+        self.metrics = MetricsRegistry()
+        self.metrics_server = None
+        self.settings_writer = SettingsWriter(
+            SETTINGS_FILE, settings_lock,
+            on_error=lambda e: self._notify("配置错误", f"保存设置失败：{str(e)}", True)
+        )
+        self.scheduler = AdaptiveScheduler(
+            self.settings.check_interval,
+            self.settings.max_check_interval,
+            self.settings.burst_duration,
+            self._parse_hot_hours(self.settings.hot_hours)
+        )
+        self.engine = DetectionEngine(self.rules, self.scheduler, journal=self.journal, metrics=self.metrics)
+        self.state_machine = self.engine.state_machine
+        self.process_states = self.state_machine.process_states
+        self.process_cache = self.state_machine.process_cache
+        self.policy = DecisionPolicy(self.rules, self.state_machine)
+        self.icon_atlas = IconAtlas(SETTINGS_DIR)
+        self.icon_atlas.warm_async()
+        self.tray_refresher = TrayRefresher(
+            self._push_tray_icon, self._push_tray_menu, self.settings.tray_max_refresh_hz
+        )
+        self._register_metrics()
+        
+        # 进程快照、注册表同步和托盘创建都不依赖Tk，与创建窗口并行执行。
+        # 快照由监控线程的第一次tick直接使用：已在运行的目标进程会在那时按
+        # 自动结束进程/自动暂停的设置处理，无需在这里单独扫描进程表
+        self.startup.start("snapshot", ProcessSnapshot.capture, self.rules)
+        self.startup.start("registry", self.sync_registry_state)
+        self.startup.start("tray", self._create_tray_icon)
+        with self.startup.phase("hide_console"):
+            hide_console()
+        with self.startup.phase("tk"):
+            self.root = Tk()
+            self.root.withdraw()
+        self.actions = ActionExecutor(
+            ("hotkey", "media", "kill", "power"),
+            dispatcher=TkDispatcher(self.root),
+            on_error=lambda lane, e: self._notify("动作执行错误", f"{lane}动作执行失败: {str(e)}", True),
+            journal=self.journal,
+            metrics=self.metrics
+        )
+        # 决策动作 -> (执行线程, 执行函数)
+        self.action_handlers = {
+            ACTION_ALERT: (UI_LANE, self._show_alert),
+            ACTION_HOTKEY: ("hotkey", self._press_hotkey),
+            ACTION_KILL: ("kill", self._kill_processes),
+            ACTION_PAUSE: ("media", self._send_media_key),
+            ACTION_MUTE: ("media", self._mute_system),
+            ACTION_SLEEP: ("power", self._enter_sleep),
+        }
+        try:
+            self.startup.join("registry")
+        except Exception as e:
+            show_message("注册表错误", f"无法同步注册表状态: {str(e)}", True)
+        self._init_tray_icon()
+        self._configure_metrics_server()
+        self.start_monitoring()
+
+    def _register_metrics(self):
+        """把各组件已有的计数登记为指标，读取时才取值"""
+        metrics = self.metrics
+        tray = self.tray_refresher
+        metrics.gauge("watcher_tray_refresh_requests", "托盘刷新请求次数", lambda: tray.requests)
+        metrics.gauge("watcher_tray_refreshes", "托盘实际刷新次数", lambda: tray.pushed)
+        metrics.gauge("watcher_tray_refreshes_dropped", "因无变化跳过的托盘刷新次数", lambda: tray.dropped)
+        metrics.gauge("watcher_tray_refreshes_coalesced", "因限频合并的托盘刷新次数", lambda: tray.coalesced)
+        writer = self.settings_writer
+        metrics.gauge("watcher_settings_writes", "设置写盘次数", lambda: writer.writes)
+        metrics.gauge("watcher_settings_writes_skipped", "内容未变化而跳过的设置写盘次数", lambda: writer.skipped)
+        metrics.gauge("watcher_journal_records", "事件日志缓冲区中的记录数", lambda: len(self.journal))
+        metrics.gauge("watcher_journal_dropped", "写盘前被覆盖的日志记录数", lambda: self.journal.dropped)
+        metrics.gauge("watcher_poll_interval_seconds", "当前轮询间隔", lambda: self.scheduler.interval)
+
+    def _update_settings(self, **changes):
+        """以新快照替换当前设置并保存"""
+        with self.settings_update_lock:
+            self.settings = self.settings.replace(**changes)
+        self.save_current_settings()
+
+    def _parse_hot_hours(self, text):
+        """解析重点时段，格式错误时视为未设置"""
+        try:
+            return parse_hot_hours(text)
+        except ValueError:
+            return []
+
+    def _configure_scheduler(self):
+        """将当前设置应用到轮询调度器"""
+        self.scheduler.configure(
+            self.settings.check_interval,
+            self.settings.max_check_interval,
+            self.settings.burst_duration,
+            self._parse_hot_hours(self.settings.hot_hours)
+        )
+
+    def _configure_metrics_server(self):
+        """按设置启动、停止或更换本机指标端点的端口"""
+        port = self.settings.metrics_port
+        server = self.metrics_server
+        if server is not None and server.port == port:
+            return
+        if server is not None:
+            self.metrics_server = None
+            server.stop()
+        if not port:
+            return
+        try:
+            self.metrics_server = MetricsServer(
+                self.metrics, lambda: (self.process_states, self.settings), port)
+            self.metrics_server.start()
+        except OSError as e:
+            self._notify("指标端点", f"无法在端口 {port} 上启动指标端点: {str(e)}", True)
+
+    def sync_registry_state(self):
+        """同步注册表状态，失败时抛出RuntimeError"""
+        if get_registry_auto_start() != self.settings.auto_start:
+            set_registry_auto_start(self.settings.auto_start)
+
+    def _create_tray_icon(self):
+        """创建托盘图标（启动阶段的后台线程）"""
+        return create_tray_icon(
+            "global_watcher",
+            self._generate_icon(),
+            "进程监控器",
+            self._create_menu()
+        )
+
+    def _init_tray_icon(self):
+        """等待托盘图标创建完成"""
+        try:
+            self.tray_icon = self.startup.join("tray")
+        except Exception as e:
+            show_message("初始化失败", f"无法创建托盘图标: {str(e)}", True)
+            sys.exit(1)
+
+    def _create_menu(self):
+        """创建托盘菜单"""
+        menu_items = [
+            (lambda: f"🚀 开机自启：{'✔' if self.settings.auto_start else '❌'}", self.toggle_auto_start),
+            (lambda: f"📢 弹窗提醒：{'✔' if self.settings.show_alert else '❌'}", self.toggle_alert),
+            (lambda: f"⌨️ 全局热键：{'✔' if self.settings.enable_hotkey else '❌'}", self.toggle_hotkey),
+            (lambda: f"💤 睡眠功能：{'✔' if self.settings.enable_sleep else '❌'}", self.toggle_sleep),
+            (lambda: f"⏸️ 自动暂停：{'✔' if self.settings.auto_pause else '❌'}", self.toggle_auto_pause),
+            (lambda: f"🔴 结束进程：{'✔' if self.settings.auto_kill else '❌'}", self.toggle_auto_kill),
+            ("📊 当前状态", self.show_status),
+            ("🩺 诊断信息", self.show_diagnostics),
+            ("✏️ 更多设置", self.show_settings_dialog),
+            ("📖 使用方法", self.show_usage),
+            ("🌐 项目地址", self.open_project_url),
+            ("⛔ 退出程序", self.clean_exit)
+        ]
+        return menu_items
+    
+    def show_usage(self, _=None):
+        """显示程序使用方法"""
+        usage_text = """
+📢 弹窗提醒：在老师监视你屏幕的时候弹出提示弹窗，弹窗显示的时间可以在更多设置中修改，默认1秒。
+当提示"screenCapture.exe已启动"时，代表老师可能正在观察你的屏幕，同时程序创建的托盘图标中心会变成黄色。
+当提示"rtcRemoteDesktop.exe已启动"时，说明你已经被老师远程控制，此时程序的托盘图标会显示红色。
+⌨️ 全局热键：当上述任意一个程序启动时，自动新建桌面，程序退出时删除新建的桌面
+💤 睡眠功能：当上述任意一个程序启动时，自动使电脑进入睡眠状态
+⏸️ 自动暂停：当上述任意一个程序启动时自动暂停正在播放的音/视频
+🔴 结束进程：当上述任意一个程序启动时自动结束该进程
+⚠️ 警告：使用此功能可能导致被管理员线下真实!作者不对因使用本软件带来的任何后果及连带后果负责！
+
+✏️ 更多设置：你可以在这里修改程序的其他设置
+⏱️ 监测间隔：控制程序的扫描间隔，值越小检测越灵敏，性能要求越高。无变化时间隔会从最小值逐步放宽到最大值
+⚡ 快速监测时长：检测到进程变化后，在这段时间内始终使用最小监测间隔
+🕘 重点时段：在这些时段内始终使用最小监测间隔，例如"8-12,14-17"
+🕒 弹窗显示时间：控制"弹窗提醒"功能弹出的提醒弹窗显示的时长
+📡 本机指标端口：不为0时在http://127.0.0.1:端口/metrics提供Prometheus格式的状态与指标，只允许本机访问
+🔝 弹窗置顶：设置"弹窗提醒"功能的弹窗是否置顶显示
+🎯 仅对rtcRemoteDesktop.exe生效：选中时，除了弹窗提醒和弹窗置顶以外的功能将只在"rtcRemoteDesktop.exe"运行时才触发
+⚠️ 注意：使用此功能前请注意观察学校的行动方式，确认学校在观察你屏幕的时候会启用远程桌面（rtcRemoteDesktop.exe）再打开此功能
+若经常先提示"screenCapture.exe已启动"后提示"rtcRemoteDesktop.exe已启动"则大概率学校在观察你屏幕的时候会启用远程桌面
+
+图标颜色说明：
+外环：
+        只有弹窗提醒开启 - 全环亮蓝色
+        只有全局热键开启 - 全环黄色
+        上述功能都开启：
+        下半环蓝色(弹窗提醒)
+        上半环黄色(全局热键)
+内环：
+        只有自动暂停开启 - 全环紫色
+        只有睡眠功能开启 - 全环橙色
+        上述功能都开启：
+        上半环紫色(自动暂停)
+        下半环橙色(睡眠功能)
+        """
+        messagebox.showinfo("使用方法", usage_text.strip())
+    
+    def open_project_url(self, _=None):
+        """打开项目GitHub地址"""
+        import webbrowser
+        try:
+            webbrowser.open("https://github.com/cmd-png/SeewoScreenPeepingDetector")
+        except Exception as e:
+            show_message("打开失败", f"无法打开项目地址: {str(e)}", True)
+
+    def show_settings_dialog(self, _=None):
+        """显示设置对话框"""
+        try:
+            if hasattr(self, 'settings_window') and self.settings_window.winfo_exists():
+                self.settings_window.lift()
+                return
+
+            self.settings_window = Toplevel(self.root)
+            self.settings_window.title("更多设置")
+            self.settings_window.geometry("400x460")
+            self.settings_window.resizable(False, False)
+            self.settings_window.update_idletasks()
+            width = self.settings_window.winfo_width()
+            height = self.settings_window.winfo_height()
+            x = (self.settings_window.winfo_screenwidth() // 2) - (width // 2)
+            y = (self.settings_window.winfo_screenheight() // 2) - (height // 2)
+            self.settings_window.geometry(f'+{x}+{y}')
+            self.settings_window.protocol("WM_DELETE_WINDOW", self._close_settings_window)
+            ttk.Label(self.settings_window, text="最小监测间隔(0.02-10秒):").grid(
+                row=0, column=0, padx=10, pady=10, sticky="w")
+            self.interval_var = StringVar(value=str(self.settings.check_interval))
+            interval_entry = ttk.Entry(self.settings_window, textvariable=self.interval_var, width=10)
+            interval_entry.grid(row=0, column=1, padx=10, pady=10, sticky="w")
+            ttk.Label(self.settings_window, text="最大监测间隔(0.02-10秒):").grid(
+                row=1, column=0, padx=10, pady=10, sticky="w")
+            self.max_interval_var = StringVar(value=str(self.settings.max_check_interval))
+            ttk.Entry(self.settings_window, textvariable=self.max_interval_var, width=10).grid(
+                row=1, column=1, padx=10, pady=10, sticky="w")
+            ttk.Label(self.settings_window, text="变化后快速监测时长(0-600秒):").grid(
+                row=2, column=0, padx=10, pady=10, sticky="w")
+            self.burst_duration_var = StringVar(value=str(self.settings.burst_duration))
+            ttk.Entry(self.settings_window, textvariable=self.burst_duration_var, width=10).grid(
+                row=2, column=1, padx=10, pady=10, sticky="w")
+            ttk.Label(self.settings_window, text="重点时段(如8-12,14-17):").grid(
+                row=3, column=0, padx=10, pady=10, sticky="w")
+            self.hot_hours_var = StringVar(value=self.settings.hot_hours)
+            ttk.Entry(self.settings_window, textvariable=self.hot_hours_var, width=14).grid(
+                row=3, column=1, padx=10, pady=10, sticky="w")
+            ttk.Label(self.settings_window, text="弹窗显示时间(1-30秒):").grid(
+                row=4, column=0, padx=10, pady=10, sticky="w")
+            self.alert_duration_var = StringVar(value=str(self.settings.alert_duration))
+            alert_duration_entry = ttk.Entry(self.settings_window, 
+                                           textvariable=self.alert_duration_var, 
+                                           width=10)
+            alert_duration_entry.grid(row=4, column=1, padx=10, pady=10, sticky="w")
+            ttk.Label(self.settings_window, text="本机指标端口(0为关闭):").grid(
+                row=5, column=0, padx=10, pady=10, sticky="w")
+            self.metrics_port_var = StringVar(value=str(self.settings.metrics_port))
+            ttk.Entry(self.settings_window, textvariable=self.metrics_port_var, width=10).grid(
+                row=5, column=1, padx=10, pady=10, sticky="w")
+            self.alert_on_top_var = BooleanVar(value=self.settings.alert_on_top)
+            alert_on_top_cb = ttk.Checkbutton(self.settings_window, 
+                                             text="弹窗置顶显示", 
+                                             variable=self.alert_on_top_var)
+            alert_on_top_cb.grid(row=6, column=0, columnspan=2, padx=10, pady=5, sticky="w")
+            self.auto_mute_var = BooleanVar(value=self.settings.auto_mute)
+            auto_mute_cb = ttk.Checkbutton(self.settings_window,
+                                          text="自动暂停执行后使电脑静音",
+                                          variable=self.auto_mute_var)
+            auto_mute_cb.grid(row=7, column=0, columnspan=2, padx=10, pady=5, sticky="w")
+            self.only_rtc_effective_var = BooleanVar(value=self.settings.only_rtc_effective)
+            only_rtc_effective_cb = ttk.Checkbutton(self.settings_window,
+                                                   text="仅对rtcRemoteDesktop.exe生效",
+                                                   variable=self.only_rtc_effective_var)
+            only_rtc_effective_cb.grid(row=8, column=0, columnspan=2, padx=10, pady=5, sticky="w")
+            ttk.Label(self.settings_window, text="注：请查看使用方法后再启用此功能！").grid(
+                row=9, column=0, padx=10, pady=5, sticky="w")
+            save_button = ttk.Button(
+                self.settings_window, 
+                text="保存设置", 
+                command=self._save_settings
+            )
+            save_button.grid(row=10, column=0, columnspan=2, pady=10)
+            interval_entry.focus_set()
+            self.settings_window.bind('<Return>', self._save_settings)
+        except Exception as e:
+            show_message("错误", f"无法创建设置窗口: {str(e)}", True)
+
+    def _close_settings_window(self):
+        """安全关闭设置窗口"""
+        if hasattr(self, 'settings_window'):
+            try:
+                self.settings_window.destroy()
+                del self.settings_window
+            except:
+                pass
+
+    def _save_settings(self, _=None):
+        """保存设置"""
+        try:
+            changes = {
+                "check_interval": float(self.interval_var.get()),
+                "max_check_interval": float(self.max_interval_var.get()),
+                "burst_duration": float(self.burst_duration_var.get()),
+                "hot_hours": self.hot_hours_var.get().strip(),
+                "alert_duration": int(self.alert_duration_var.get()),
+                "metrics_port": int(self.metrics_port_var.get()),
+                "alert_on_top": self.alert_on_top_var.get(),
+                "auto_mute": self.auto_mute_var.get(),
+                "only_rtc_effective": self.only_rtc_effective_var.get()
+            }
+        except ValueError:
+            messagebox.showerror("错误", "请输入有效的数字")
+            return
+        try:
+            self._update_settings(**changes)
+        except ValueError as e:
+            messagebox.showerror("错误", str(e))
+            return
+        self._configure_scheduler()
+        self._configure_metrics_server()
+        self._close_settings_window()
+
+    def _generate_icon(self):
+        """取出当前状态对应的托盘图标，图标集已预先绘制，无需在调用线程上绘图"""
+        return self.icon_atlas.get(icon_state(self.settings, self.process_states, self.rules.watch_only))
+
+    def start_monitoring(self):
+        """启动监控线程"""
+        try:
+            self.monitor_thread = threading.Thread(
+                target=self._monitoring_loop, 
+                name="ProcessMonitorThread",
+                daemon=True
+            )
+            self.monitor_thread.start()
+            self.root.after(100, self._keep_alive)
+        except Exception as e:
+            show_message("监控错误", f"无法启动监控线程: {str(e)}", True)
+        self.actions.dispatcher.start()
+        self._update_tray()
+
+    def _keep_alive(self):
+        """保持主循环运行"""
+        if self.running:
+            self.root.after(100, self._keep_alive)
+
+    def _send_media_key(self):
+        """模拟发送媒体播放/暂停键"""
+        try:
+            send_media_play_pause()
+        except Exception as e:
+            self._notify("媒体控制", f"无法控制媒体播放状态: {str(e)}", True)
+            
+    def _mute_system(self):
+        """使系统静音"""
+        try:
+            send_volume_mute()
+        except Exception as e:
+            self._notify("静音控制", f"无法控制系统音量: {str(e)}", True)
+
+    def _monitoring_loop(self):
+        """监控循环：等待进程事件，检测延迟取决于事件到达时间"""
+        try:
+            snapshot = self.startup.join("snapshot")
+        except Exception:
+            # 启动快照失败时第一次tick自行扫描进程表
+            snapshot = None
+        try:
+            with self.startup.phase("event_source"):
+                self.engine.start(snapshot)
+        except Exception as e:
+            show_message("监控错误", f"无法启动进程事件源: {str(e)}", True)
+            return
+        self.startup.mark("monitoring_armed")
+        while self.running:
+            try:
+                _, state_changes = self.engine.tick()
+                if state_changes:
+                    self._check_processes(state_changes)
+            except Exception as e:
+                show_message("监控错误", f"监控循环错误: {str(e)}", True)
+                time.sleep(self.settings.check_interval)
+        self.engine.stop()
+
+    def _check_processes(self, state_changes):
+        """处理一次tick中的状态变化：决策在监控线程上完成，副作用交给动作执行器"""
+        # 整个tick使用同一份设置快照
+        settings = self.settings
+        try:
+            decisions = self.policy.decide(state_changes, settings)
+        except Exception as e:
+            self._notify("处理状态变化错误", f"处理状态变化错误: {str(e)}", True)
+            decisions = []
+        for decision in decisions:
+            self._dispatch(decision)
+        
+        # 只有在状态发生变化时才更新托盘图标
+        self._update_tray()
+
+    def _dispatch(self, decision):
+        """把一个决策提交到对应的动作执行线程"""
+        action, args, detected = decision
+        if action == ACTION_SLEEP:
+            # 进入睡眠后自动禁用睡眠功能
+            self._update_settings(enable_sleep=False)
+        lane, func = self.action_handlers[action]
+        self.actions.submit(lane, func, *args, label=action, detected_at=detected)
+
+    def _notify(self, title, message, is_error=False):
+        """在主线程中显示提示，可从任意线程调用；动作执行器创建之前（如设置写入器
+        在启动早期出错）直接显示"""
+        actions = getattr(self, "actions", None)
+        if actions is None:
+            show_message(title, message, is_error)
+            return
+        actions.submit(UI_LANE, (messagebox.showerror if is_error else messagebox.showinfo), title, message)
+
+    def _show_alert(self, changes, alert_duration, alert_on_top):
+        """显示一个tick中全部状态变化的汇总提醒弹窗（主线程）"""
+        show_alert(self.root, changes, alert_duration, alert_on_top)
+
+    def _press_hotkey(self, key, new_state):
+        """模拟切换虚拟桌面的热键（热键工作线程）"""
+        try:
+            press_hotkey(key, new_state)
+        except Exception as e:
+            self._notify("热键模拟错误", f"热键模拟错误: {str(e)}", True)
+
+    def _kill_processes(self, process_names):
+        """结束进程（结束进程工作线程），优先使用已缓存的PID，子进程由进程树给出"""
+        create_time = self.engine.event_source.create_time
+        targets = {name: {pid: create_time(pid) for pid in list(self.process_cache.get(name, ()))}
+                   for name in process_names}
+        # 进程树已过时（跳过遍历的扫描之后）时由psutil查找子进程
+        tree = self.engine.event_source.current_tree()
+        if tree is not None:
+            for name, pids in targets.items():
+                for pid in pids:
+                    subtree = tree.descendants(pid)
+                    if subtree:
+                        self.journal.record(PROCESS_TREE, name, f"{pid} 连同 {len(subtree)} 个子进程结束")
+        results = self.termination.terminate(targets, self.state_machine.detected_at, self.rules.images(),
+                                             tree)
+        for result in results:
+            self.journal.record(ACTION_RESULT, "kill", f"{result.name} {result.pid} {result.status}")
+        failed = [name for name in process_names if not succeeded(results, name)]
+        if failed:
+            # 决策时已视为停止：恢复为运行中，由监控线程重新决策并重试一次结束
+            self.policy.record_kill_failure(failed)
+            self.engine.recheck(failed)
+            self._notify("结束进程失败", f"无法结束进程: {', '.join(failed)}\n请确保程序以管理员权限运行", True)
+
+    def _enter_sleep(self):
+        """使系统进入睡眠并禁用睡眠功能（电源工作线程）"""
+        try:
+            system_sleep()
+            self.actions.submit(UI_LANE, self._update_tray)
+            self._notify("睡眠模式", "系统已进入过睡眠状态，睡眠功能已自动禁用")
+        except Exception as e:
+            # 睡眠失败时恢复设置，下次状态变化时重试
+            self._update_settings(enable_sleep=True)
+            self.policy.sleep_triggered = False
+            self._notify("睡眠失败", f"无法进入睡眠状态：{str(e)}", True)
+
+    def _running_rules(self):
+        """遍历一次进程表，返回当前有进程在运行的规则名"""
+        try:
+            return set(ProcessSnapshot.capture(self.rules).index)
+        except Exception:
+            return set()
+
+    def _update_tray(self):
+        """请求更新托盘图标和菜单，是否推送及何时推送由节流器决定"""
+        settings = self.settings
+        self.tray_refresher.request(icon_state(settings, self.process_states, self.rules.watch_only),
+                                    menu_state(settings))
+
+    def _push_tray_icon(self, state):
+        try:
+            self.tray_icon.icon = self.icon_atlas.get(state)
+        except Exception:
+            pass
+
+    def _push_tray_menu(self):
+        try:
+            self.tray_icon.update_menu()
+        except Exception:
+            pass
+
+    def save_current_settings(self):
+        """保存当前设置：交给后台写入器合并写盘，调用方不会被阻塞"""
+        try:
+            self.settings_writer.schedule(self.settings.to_dict())
+        except Exception as e:
+            show_message("保存设置错误", f"保存设置错误: {str(e)}", True)
+
+    def toggle_auto_start(self, _=None):
+        """切换开机自启设置"""
+        try:
+            set_registry_auto_start(not self.settings.auto_start)
+            self._update_settings(auto_start=not self.settings.auto_start)
+            self._update_tray()
+        except Exception as e:
+            if "拒绝访问" in str(e) or "access denied" in str(e).lower():
+                if os.name == 'nt':
+                    # 与原实现一致：只有无法调用IsUserAnAdmin时才以管理员权限重新启动
+                    if not admin_check_available():
+                        try:
+                            relaunch_as_admin()
+                            self.clean_exit()
+                        except Exception as e2:
+                            show_message("权限错误", f"权限请求失败：{str(e2)}", True)
+            else:
+                show_message("设置失败", f"操作失败: {str(e)}", True)
+
+    def toggle_alert(self, _=None):
+        """切换弹窗提醒设置"""
+        # 检查是否要开启弹窗提醒，但结束进程功能已开启
+        changes = {"show_alert": not self.settings.show_alert}
+        if not self.settings.show_alert and self.settings.auto_kill:
+            # 关闭结束进程功能
+            changes["auto_kill"] = False
+            show_message("功能冲突", "检测到\"结束进程\"功能已启用，已自动关闭该功能。\n弹窗提醒和结束进程功能不能同时启用，否则会遭到消息轰炸")
+        
+        self._update_settings(**changes)
+        self._update_tray()
+
+    def toggle_hotkey(self, _=None):
+        """切换热键功能设置"""
+        self._update_settings(enable_hotkey=not self.settings.enable_hotkey)
+        self._update_tray()
+    
+    def toggle_sleep(self, _=None):
+        """切换睡眠功能设置"""
+        self._update_settings(enable_sleep=not self.settings.enable_sleep)
+        self.policy.sleep_triggered = False
+        self._update_tray()
+    
+    def toggle_auto_pause(self, _=None):
+        """切换自动暂停设置"""
+        self._update_settings(auto_pause=not self.settings.auto_pause)
+        self._update_tray()
+    
+    def toggle_auto_kill(self, _=None):
+        """切换自动结束进程设置"""
+        # 检查是否要开启结束进程功能，但弹窗提醒功能已开启
+        changes = {"auto_kill": not self.settings.auto_kill}
+        if not self.settings.auto_kill and self.settings.show_alert:
+            # 关闭弹窗提醒功能
+            changes["show_alert"] = False
+            show_message("功能冲突", "检测到\"弹窗提醒\"功能已启用，已自动关闭该功能。\n弹窗提醒和结束进程功能不能同时启用，否则会遭到消息轰炸")
+        
+        # 切换自动结束进程设置
+        self._update_settings(**changes)
+        
+        # 如果刚刚启用了自动结束进程功能，检查当前是否已有目标进程在运行
+        if self.settings.auto_kill:
+            running = self._running_rules()
+            targets = [name for name in self.rules.with_action(ACTION_KILL, self.settings.only_rtc_effective)
+                       if name in running]
+            if targets:
+                self.actions.submit("kill", self._kill_processes, targets, label="kill")
+        
+        self._update_tray()
+    
+    def toggle_only_rtc_effective(self, _=None):
+        """切换仅对远程生效设置"""
+        self._update_settings(only_rtc_effective=not self.settings.only_rtc_effective)
+        self._update_tray()
+    
+    def show_status(self, _=None):
+        """显示当前状态"""
+        try:
+            status_lines = [
+                "全局监控状态：",
+                f"🚀 开机自启：{'✔ 启用' if self.settings.auto_start else '❌ 禁用'}",
+                f"📢 弹窗提醒：{'✔ 启用' if self.settings.show_alert else '❌ 禁用'}",
+                f"🔝 弹窗置顶：{'✔ 启用' if self.settings.alert_on_top else '❌ 禁用'}",
+                f"⌨️ 全局热键：{'✔ 启用' if self.settings.enable_hotkey else '❌ 禁用'}",
+                f"💤 睡眠功能：{'✔ 启用' if self.settings.enable_sleep else '❌ 禁用'}",
+                f"⏸️ 自动暂停：{'✔ 启用' if self.settings.auto_pause else '❌ 禁用'}",
+                f"🔴 结束进程：{'✔ 启用' if self.settings.auto_kill else '❌ 禁用'}",
+                f"🎯 仅对rtcRemoteDesktop.exe生效：{'✔ 启用' if self.settings.only_rtc_effective else '❌ 禁用'}",
+                f"📜 监控规则：{len(self.rules.rules)} 条（{RULES_FILE}）",
+                f"⏱️ 监测间隔：{self.settings.check_interval}-{self.settings.max_check_interval} 秒",
+                f"📈 实际扫描频率：{self._describe_tick_rate()}",
+                f"🔎 进程枚举：{default_enumerator().name}",
+                f"⏲️ 结束进程延迟：{self._describe_kill_latency()}",
+                f"🖼️ 托盘刷新：推送 {self.tray_refresher.pushed} 次，跳过 {self.tray_refresher.dropped} 次，合并 {self.tray_refresher.coalesced} 次",
+                f"🕒 弹窗显示时间：{self.settings.alert_duration} 秒",
+                f"📡 指标端点：{self._describe_metrics_server()}",
+                f"🚦 启动到开始监控：{self._describe_startup()}",
+                f"🧩 启动阶段：{self._describe_startup_phases()}",
+                "V1.1.3",
+                "",
+                "进程状态："
+            ]
+            for proc, state in self.process_states.items():
+                status_lines.append(f"• {proc}: {'🔴运行中' if state else '🟢已停止'}")
+            tree_lines = self._describe_process_tree()
+            if tree_lines:
+                status_lines += ["", "进程树："] + tree_lines
+            recent = self._describe_recent_events()
+            if recent:
+                status_lines += ["", "最近事件："] + recent
+            messagebox.showinfo("系统状态", "\n".join(status_lines))
+        except Exception as e:
+            show_message("错误", f"无法显示状态: {str(e)}", True)
+    
+    def show_diagnostics(self, _=None):
+        """显示运行指标，可导出为JSON"""
+        try:
+            lines = ["运行指标：", f"⏲️ 运行时间：{self.metrics.clock() - self.metrics.started_at:.0f} 秒"]
+            for metric in self.metrics.collect():
+                lines.append(f"• {self._describe_metric(metric)}")
+            lines += ["", "是否将完整指标导出为JSON文件？"]
+            if messagebox.askyesno("诊断信息", "\n".join(lines)):
+                path = os.path.join(SETTINGS_DIR, f"metrics_{time.strftime('%Y%m%d_%H%M%S')}.json")
+                write_text_atomic(path, self.metrics.to_json())
+                messagebox.showinfo("诊断信息", f"指标已导出到：\n{path}")
+        except Exception as e:
+            show_message("错误", f"无法显示诊断信息: {str(e)}", True)
+
+    def _describe_metric(self, metric):
+        """一行描述一个指标，直方图显示次数、平均值和估计的p50/p99"""
+        labels = "".join(f"[{value}]" for value in metric.labels.values())
+        if metric.kind == "histogram":
+            if not metric.count:
+                return f"{metric.name}{labels}：暂无记录"
+            return (f"{metric.name}{labels}：{metric.count} 次，平均 {metric.sum / metric.count * 1000:.2f} 毫秒，"
+                    f"p50≤{metric.quantile(0.5) * 1000:g} 毫秒，p99≤{metric.quantile(0.99) * 1000:g} 毫秒")
+        value = metric.get()
+        if isinstance(value, float):
+            value = f"{value:.3f}"
+        return f"{metric.name}{labels}：{value}"
+
+    def _describe_tick_rate(self):
+        """描述当前事件源的实际扫描频率"""
+        event_source = self.engine.event_source
+        if event_source is not None and event_source.is_push:
+            return "事件推送（无需轮询）"
+        return f"{self.scheduler.tick_rate():.1f} 次/秒（当前间隔 {self.scheduler.interval:.2f} 秒）"
+
+    def _describe_metrics_server(self):
+        server = self.metrics_server
+        if server is None:
+            return "未开启"
+        return f"http://{server.host}:{server.port}/metrics（已服务 {server.requests} 次）"
+
+    def _describe_startup(self):
+        """描述从启动到监控就绪的耗时"""
+        armed = self.startup.marks.get("monitoring_armed")
+        if armed is None:
+            return "尚未开始监控"
+        return f"{armed * 1000:.0f} 毫秒"
+
+    def _describe_startup_phases(self):
+        """按开始顺序列出各启动阶段的耗时"""
+        return "，".join(f"{STARTUP_PHASE_LABELS.get(name, name)} {duration * 1000:.0f}"
+                        for name, _, duration in self.startup.summary()) + " 毫秒"
+
+    def _describe_recent_events(self, limit=8):
+        """列出事件日志中最近的几条记录"""
+        labels = {"start": "检测到启动", "exit": "检测到退出", STATE_CHANGE: "状态变化",
+                  ACTION_ISSUED: "提交动作", ACTION_RESULT: "动作完成", PROCESS_TREE: "进程树"}
+        now = time.monotonic()
+        lines = []
+        for timestamp, kind, subject, detail in self.journal.entries(limit):
+            if kind == STATE_CHANGE:
+                detail = "运行中" if detail else "已停止"
+            lines.append(f"• {now - timestamp:.1f}秒前 {labels.get(kind, kind)} {subject} {detail}")
+        return lines
+
+    def _describe_process_tree(self, limit=5):
+        """列出运行中的被监控进程各自的子进程，事件源不维护进程树时为空"""
+        tree = self.engine.tree
+        if tree is None:
+            return []
+        source = self.engine.event_source
+        lines = []
+        for name, pids in self.process_cache.items():
+            for pid in sorted(pids):
+                subtree = tree.descendants(pid)
+                shown = ", ".join(f"{source.process_name(child)} {child}" for child in subtree[:limit])
+                more = "…" if len(subtree) > limit else ""
+                lines.append(f"• {name} {pid}：{len(subtree)} 个子进程" + (f"（{shown}{more}）" if subtree else ""))
+        return lines
+
+    def _describe_kill_latency(self):
+        """描述从检测到进程启动到结束进程的延迟"""
+        summary = self.termination.latency_summary()
+        if summary is None:
+            return "暂无记录"
+        count, last, average, worst = summary
+        return f"最近 {last * 1000:.0f} 毫秒，平均 {average * 1000:.0f} 毫秒，最大 {worst * 1000:.0f} 毫秒（{count} 次）"
+
+    def clean_exit(self, _=None):
+        """安全退出程序"""
+        try:
+            self.running = False
+            if hasattr(self, 'settings_writer'):
+                self.settings_writer.stop()
+            if hasattr(self, 'journal'):
+                self.journal.stop()
+            if getattr(self, 'metrics_server', None) is not None:
+                self.metrics_server.stop()
+            if hasattr(self, 'tray_icon'):
+                self.tray_icon.stop()
+            if hasattr(self, 'root'):
+                self.root.after(100, self.root.destroy)
+        except Exception:
+            pass
+        finally:
+            os._exit(0)
+
+
+def main(launched_at=None):
+    """程序入口：依赖检查、免责声明、单实例检查后启动监控器
+
+    launched_at为启动脚本开始执行时的time.perf_counter()，用于统计启动耗时。
+    """
+    startup = StartupProfile(launched_at)
+    from .adapters.dependencies import check_dependencies
+    with startup.phase("check_dependencies"):
+        check_dependencies(DEPENDENCY_RECORD_FILE)
+    try:
+        with startup.phase("disclaimer"):
+            accepted = show_disclaimer(SETTINGS_DIR)
+        if not accepted:
+            sys.exit(0)
+        mutex = acquire_single_instance()
+        if mutex is None:
+            show_message("错误", "程序已经在运行中", True)
+            sys.exit(1)
+        app = GlobalProcessWatcher(startup)
+        app.root.mainloop()
+    except Exception as e:
+        show_message("启动失败", f"初始化错误: {str(e)}", True)
+        sys.exit(1)
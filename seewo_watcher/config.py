@@ -0,0 +1,17 @@
+import os
+
+# ================= 全局配置 =================
+# 推送式事件源无需轮询，只需定期醒来检查是否退出
+PUSH_WAKEUP_INTERVAL = 1.0
+# 非Windows系统（基准测试、测试）没有LOCALAPPDATA，使用用户数据目录
+SETTINGS_DIR = os.path.join(
+    os.getenv('LOCALAPPDATA') or os.path.join(os.path.expanduser('~'), '.local', 'share'),
+    'GlobalProcessWatcher'
+)
+SETTINGS_FILE = os.path.join(SETTINGS_DIR, 'settings.json')
+# 监控规则：匹配哪些进程、各自触发哪些动作，不存在时写入默认规则
+RULES_FILE = os.path.join(SETTINGS_DIR, 'rules.json')
+# 状态变化与动作的事件日志（滚动文件）
+JOURNAL_FILE = os.path.join(SETTINGS_DIR, 'journal.log')
+# 上次完整验证依赖时的解释器与包版本
+DEPENDENCY_RECORD_FILE = os.path.join(SETTINGS_DIR, 'dependencies_verified.json')
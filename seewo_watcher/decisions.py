@@ -0,0 +1,110 @@
+from collections import namedtuple
+
+from .rules import ACTION_ALERT, ACTION_HOTKEY, ACTION_KILL, ACTION_PAUSE, ACTION_SLEEP
+
+# ================= 动作决策 =================
+# 决策的动作类型与规则中的动作名一致，另有暂停后的静音
+ACTION_MUTE = "mute"
+
+# action为动作类型，args为执行动作所需的参数，detected_at为触发决策的检测时间戳
+Decision = namedtuple("Decision", ["action", "args", "detected_at"])
+
+
+class DecisionPolicy:
+    """根据一个tick的状态变化与设置决定要执行的动作，本身不产生任何副作用
+
+    一个tick中的全部状态变化作为一个整体处理：先应用所有变化得到目标状态，
+    再只对比一次目标状态与已执行的状态，因此同一tick中多个进程同时启动时
+    只会有一个汇总的弹窗、最多按一次热键、最多一次暂停与一次睡眠判断。
+    桌面是否已切换、媒体是否已暂停、睡眠是否已触发等跨tick的状态保存在这里。应用把决策
+    交给动作执行器执行，回放模式只把决策记录下来。
+    """
+
+    def __init__(self, rules, state_machine):
+        self.rules = rules
+        self.process_states = state_machine.process_states
+        self.changed_at = state_machine.changed_at
+        self.desktop_switched = False
+        # 切换桌面时按下热键的规则，切回时使用它的退出热键
+        self.switched_by = None
+        self.media_paused = False
+        self.sleep_triggered = False
+        # 结束失败、仍在运行的进程：重试结束时不再视为已停止，直到它真正退出
+        self.kill_failed = set()
+
+    def decide(self, state_changes, settings):
+        """返回一个tick的决策列表，顺序为弹窗、热键、暂停、静音、睡眠、结束进程"""
+        rules = self.rules
+        decisions = []
+        # 启用"仅对远程生效"时，除弹窗提醒外只有远程控制级别的规则触发动作
+        control_only = settings.only_rtc_effective
+
+        alerts = [(name, running) for name, running in state_changes
+                  if rules.effective(name, ACTION_ALERT)]
+        if settings.show_alert and alerts:
+            decisions.append(Decision(ACTION_ALERT, (alerts, settings.alert_duration, settings.alert_on_top),
+                                      self._earliest(name for name, _ in alerts)))
+
+        # 处理自动结束进程逻辑，结束后视为已停止，再据此计算热键、暂停与睡眠的目标状态；
+        # 上次结束失败的进程仍按运行中计算，结束成功后由退出事件改为停止
+        kill_failed = self.kill_failed
+        kill_batch = []
+        for name, running in state_changes:
+            if not running:
+                kill_failed.discard(name)
+            elif settings.auto_kill and rules.effective(name, ACTION_KILL, control_only):
+                kill_batch.append(name)
+                if name not in kill_failed:
+                    self.process_states[name] = False
+
+        if settings.enable_hotkey:
+            # 只要有启用热键的规则在运行就应处于切换后的桌面，与已切换的状态不同时按一次
+            should_switch = rules.active(self.process_states, ACTION_HOTKEY, control_only)
+            if should_switch != self.desktop_switched:
+                names = [name for name, _ in state_changes
+                         if rules.effective(name, ACTION_HOTKEY, control_only)]
+                if should_switch:
+                    # 优先取本tick中最先变化的规则，没有时（如刚启用热键）取任一正在运行的规则
+                    rule = next(name for name in [*names, *rules.with_action(ACTION_HOTKEY, control_only)]
+                                if self.process_states.get(name))
+                else:
+                    # 切换后可能已改为"仅对远程生效"，切回时不论级别，没有任何热键规则时只记为未切换
+                    rule = self.switched_by or next(iter(rules.with_action(ACTION_HOTKEY)), None)
+                self.desktop_switched = should_switch
+                self.switched_by = rule if should_switch else None
+                if rule is not None:
+                    key = rules.get(rule).hotkeys[0 if should_switch else 1]
+                    decisions.append(Decision(ACTION_HOTKEY, (key, should_switch), self._earliest(names)))
+
+        # 暂停与睡眠只与目标状态有关，由本tick最早的变化触发
+        detected = self._earliest(name for name, _ in state_changes)
+        if settings.auto_pause:
+            # 与热键一样按目标状态判断，同一tick中多个进程启动或退出最多切换一次
+            should_pause = rules.active(self.process_states, ACTION_PAUSE, control_only)
+            if should_pause != self.media_paused:
+                decisions.append(Decision(ACTION_PAUSE, (), detected))
+                self.media_paused = should_pause
+                # 如果启用了自动静音，在暂停后执行静音
+                if should_pause and settings.auto_mute:
+                    decisions.append(Decision(ACTION_MUTE, (), detected))
+
+        should_sleep = rules.active(self.process_states, ACTION_SLEEP, control_only)
+        if settings.enable_sleep and should_sleep and not self.sleep_triggered:
+            self.sleep_triggered = True
+            decisions.append(Decision(ACTION_SLEEP, (), detected))
+        elif not should_sleep and self.sleep_triggered:
+            self.sleep_triggered = False
+
+        if kill_batch:
+            decisions.append(Decision(ACTION_KILL, (kill_batch,), self._earliest(kill_batch)))
+        return decisions
+
+    def record_kill_failure(self, names):
+        """记录结束失败的进程，可从结束进程的工作线程调用"""
+        self.kill_failed.update(names)
+
+    def _earliest(self, names):
+        """这些进程中最早的状态变化时间戳，都没有记录时返回None"""
+        times = [self.changed_at.get(name) for name in names]
+        times = [timestamp for timestamp in times if timestamp is not None]
+        return min(times) if times else None
@@ -0,0 +1,146 @@
+import threading
+import time
+
+from .config import PUSH_WAKEUP_INTERVAL
+from .journal import PROCESS_TREE, STATE_CHANGE
+from .metrics import TICK_BUCKETS
+from .process_events import PROCESS_START, PollingProcessSource, create_event_source
+from .rules import RuleSet
+from .state import ProcessStateMachine
+
+# ================= 检测引擎 =================
+
+
+class DetectionEngine:
+    """检测引擎：事件源、状态机与轮询调度，不产生任何副作用
+
+    每次tick等待一批进程事件并应用到状态机，状态变化交给调用方决定如何
+    处理，因此可以在没有Tk、托盘和注册表的环境中运行。
+    """
+
+    def __init__(self, rules, scheduler, source_factory=create_event_source,
+                 push_wakeup=PUSH_WAKEUP_INTERVAL, journal=None, metrics=None, clock=time.monotonic):
+        self.rules = rules if isinstance(rules, RuleSet) else RuleSet.from_names(rules)
+        self.process_names = self.rules.names
+        self.scheduler = scheduler
+        self.source_factory = source_factory
+        self.push_wakeup = push_wakeup
+        self.clock = clock
+        self.journal = journal
+        self.metrics = metrics
+        if metrics is not None:
+            self._ticks = metrics.counter("watcher_ticks_total", "监控循环执行的tick次数")
+            self._tick_seconds = metrics.histogram(
+                "watcher_tick_seconds", "每次tick应用事件与记录日志的耗时（不含等待与扫描）", TICK_BUCKETS)
+            self._events = metrics.counter("watcher_process_events_total", "收到的进程事件数")
+            self._state_changes = metrics.counter("watcher_state_changes_total", "被监控进程的状态变化次数")
+        self.state_machine = ProcessStateMachine(self.process_names, self.rules.thresholds(), clock)
+        if metrics is not None:
+            suppressed = self.state_machine.suppressed
+            for name in self.process_names:
+                metrics.gauge("watcher_state_flaps_suppressed", "确认前就恢复原状、被过滤掉的状态变化次数",
+                              lambda name=name: suppressed[name], process=name)
+        self.event_source = None
+        self._changed = False
+        # 需要按PID缓存重新判断状态的进程名，可由其他线程登记
+        self._recheck = set()
+        self._recheck_lock = threading.Lock()
+
+    def start(self, snapshot=None):
+        """启动事件源，snapshot为启动时已采集的进程快照，供第一次tick复用"""
+        self.event_source = self.source_factory(self.rules)
+        if self.metrics is not None:
+            self.event_source.instrument(self.metrics)
+        if snapshot is not None:
+            self.event_source.seed(snapshot)
+
+    def stop(self):
+        if self.event_source is not None:
+            self.event_source.stop()
+
+    def recheck(self, names):
+        """下一次tick按PID缓存重新判断这些进程的状态，可从任意线程调用
+
+        结束进程失败时使用：决策已把进程视为停止，但其PID仍在缓存中，事件源
+        不会再次报告它的启动。
+        """
+        with self._recheck_lock:
+            self._recheck.update(names)
+
+    def _take_recheck(self):
+        if not self._recheck:
+            return ()
+        with self._recheck_lock:
+            names, self._recheck = self._recheck, set()
+        return names
+
+    @property
+    def tree(self):
+        """当前事件源维护的进程树，事件源不维护进程树时为None"""
+        return self.event_source.tree if self.event_source is not None else None
+
+    def next_timeout(self):
+        """推送式事件源只需定期醒来，轮询式由调度器决定间隔
+
+        有等待确认的状态变化时，不晚于其满足最短持续时间的时刻醒来；该时刻
+        已过去时按正常间隔醒来，确认次数只能由之后的真实观察补足。
+        """
+        if self.event_source.is_push:
+            timeout = self.push_wakeup
+        else:
+            timeout = self.scheduler.next_interval(self._changed)
+        deadline = self.state_machine.next_deadline()
+        if deadline is not None:
+            remaining = deadline - self.clock()
+            if remaining > 0:
+                timeout = min(timeout, remaining)
+        return timeout
+
+    def tick(self):
+        """等待并应用一批事件，返回(事件列表, 状态变化列表)"""
+        if not self.event_source.is_alive():
+            self.fallback_to_polling()
+        timeout = self.next_timeout()
+        events = self.event_source.wait(timeout)
+        started = time.perf_counter()
+        pending = self.state_machine.pending
+        # 轮询式事件源每次等待都完成一次扫描；推送式事件源只有收到事件或
+        # 等满一个唤醒周期才算一次观察，为最短持续时间提前醒来的不算
+        observed = bool(events) or not self.event_source.is_push or timeout >= self.push_wakeup
+        # 等待确认期间保持最小轮询间隔，尽快完成确认
+        self._changed = bool(events) or bool(pending)
+        recheck = self._take_recheck()
+        if not events and not pending and not recheck:
+            state_changes = []
+        else:
+            state_changes = self.state_machine.apply(events, observed, recheck)
+            if self.journal is not None:
+                self._record(events, state_changes)
+        if self.metrics is not None:
+            self._ticks.inc()
+            self._events.inc(len(events))
+            self._state_changes.inc(len(state_changes))
+            self._tick_seconds.observe(time.perf_counter() - started)
+        return events, state_changes
+
+    def _record(self, events, state_changes):
+        record = self.journal.record
+        tree = self.tree
+        for event in events:
+            record(event.kind, event.name, event.pid, event.timestamp)
+            if tree is not None and event.kind == PROCESS_START:
+                ppid = tree.parent(event.pid)
+                if ppid is not None:
+                    parent = self.event_source.process_name(ppid)
+                    record(PROCESS_TREE, event.name, f"{event.pid} 父进程 {parent} {ppid}", event.timestamp)
+        for name, running in state_changes:
+            record(STATE_CHANGE, name, running)
+
+    def fallback_to_polling(self):
+        """推送式事件源失效时回退到轮询"""
+        self.event_source.stop()
+        self.state_machine.reset_pids()
+        self.event_source = PollingProcessSource(self.rules)
+        if self.metrics is not None:
+            self.event_source.instrument(self.metrics)
+        self.event_source.start()
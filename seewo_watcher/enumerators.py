@@ -0,0 +1,251 @@
+import ntpath
+import os
+import threading
+
+# ================= 进程枚举后端 =================
+# 所有后端提供同样的三个方法：
+#   iter_processes() 产出(pid, 进程名)，用于一次性的完整扫描
+#   list_pids()      按升序返回所有PID，供增量快照比较
+#   resolve(pid)     返回(进程名, 创建时间, 父pid)，进程已退出或无权访问时返回None
+# 创建时间用于识别PID复用和校验父子关系，各后端统一为Unix时间戳（秒）。
+
+# Linux的comm最多保存15个字符，更长的进程名需要从命令行补全
+COMM_LENGTH = 15
+
+
+class EnumeratorError(RuntimeError):
+    """进程枚举后端在当前系统上不可用"""
+
+
+class PsutilEnumerator:
+    """通用后端：通过psutil枚举，任何平台都可用，但每个进程都要构造对象"""
+
+    name = "psutil"
+
+    def __init__(self):
+        try:
+            import psutil
+        except ImportError as e:
+            raise EnumeratorError("未安装psutil") from e
+        self._psutil = psutil
+
+    def iter_processes(self):
+        for p in self._psutil.process_iter(['pid', 'name']):
+            info = p.info
+            yield info['pid'], info['name']
+
+    def list_pids(self):
+        return self._psutil.pids()
+
+    def resolve(self, pid):
+        # psutil.Process在构造时已经读取了创建时间，父pid与名称在oneshot中一起读取
+        try:
+            p = self._psutil.Process(pid)
+            with p.oneshot():
+                return p.name(), p.create_time(), p.ppid()
+        except self._psutil.Error:
+            return None
+
+
+def _read_file(path):
+    """不经过缓冲文件对象读取/proc下的小文件，失败时返回None"""
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return None
+    try:
+        return os.read(fd, 4096)
+    except OSError:
+        return None
+    finally:
+        os.close(fd)
+
+
+class ProcfsEnumerator:
+    """Linux后端：直接扫描/proc，完整扫描每个进程只读取comm一个文件
+
+    resolve读取/proc/<pid>/stat，一次读取同时得到进程名、父pid和启动时间。
+    进程名被截断到15个字符时，与psutil一样从命令行的第一项补全。
+    """
+
+    name = "procfs"
+
+    def __init__(self, root="/proc"):
+        self.root = root
+        try:
+            with open(os.path.join(root, "stat"), 'rb') as f:
+                btime = next(line for line in f if line.startswith(b"btime "))
+        except (OSError, StopIteration) as e:
+            raise EnumeratorError(f"无法读取{root}") from e
+        self.boot_time = float(btime.split()[1])
+        self.clock_ticks = os.sysconf("SC_CLK_TCK")
+
+    def _full_name(self, pid, comm):
+        """comm可能被截断时用命令行第一项的文件名补全"""
+        data = _read_file(f"{self.root}/{pid}/cmdline")
+        if data is None:
+            return comm
+        argv0 = data.split(b"\0", 1)[0]
+        name = ntpath.basename(argv0.decode("utf-8", "replace"))
+        return name if name.startswith(comm) else comm
+
+    def iter_processes(self):
+        root = self.root
+        for entry in os.listdir(root):
+            if not entry.isdigit():
+                continue
+            data = _read_file(f"{root}/{entry}/comm")
+            if data is None:
+                # 进程在列出与读取之间退出
+                continue
+            name = data[:-1].decode("utf-8", "replace")
+            if len(name) >= COMM_LENGTH:
+                name = self._full_name(entry, name)
+            yield int(entry), name
+
+    def list_pids(self):
+        pids = [int(entry) for entry in os.listdir(self.root) if entry.isdigit()]
+        pids.sort()
+        return pids
+
+    def resolve(self, pid):
+        data = _read_file(f"{self.root}/{pid}/stat")
+        if data is None:
+            return None
+        # 格式为"pid (comm) state ..."，comm本身可能含空格和括号
+        end = data.rfind(b")")
+        name = data[data.find(b"(") + 1:end].decode("utf-8", "replace")
+        # ")"之后从第3个字段开始：ppid是第4个字段，starttime是第22个字段
+        fields = data[end + 2:].split()
+        if len(name) >= COMM_LENGTH:
+            name = self._full_name(pid, name)
+        return name, self.boot_time + int(fields[19]) / self.clock_ticks, int(fields[1])
+
+
+class NtQueryEnumerator:
+    """Windows后端：一次NtQuerySystemInformation调用取得整个进程表
+
+    返回的缓冲区中每个进程一项，已包含映像名、创建时间与父pid，不需要打开任何
+    进程。list_pids调用一次并保存结果，随后的resolve直接从中查找，因此
+    增量快照每次tick也只有一次系统调用。
+    默认后端在进程内共享，查询与解析共用同一块缓冲区，由锁保证同一时刻只有
+    一个线程在查询。
+    """
+
+    name = "ntquery"
+
+    SYSTEM_PROCESS_INFORMATION = 5
+    STATUS_INFO_LENGTH_MISMATCH = 0xC0000004
+    # FILETIME（1601年起的100纳秒数）与Unix时间戳之差
+    EPOCH_OFFSET = 116444736000000000
+
+    def __init__(self):
+        if os.name != 'nt':
+            raise EnumeratorError("NtQuerySystemInformation仅在Windows上可用")
+        import ctypes
+        from ctypes import wintypes
+
+        class UnicodeString(ctypes.Structure):
+            _fields_ = [("Length", wintypes.USHORT), ("MaximumLength", wintypes.USHORT),
+                        ("Buffer", ctypes.c_void_p)]
+
+        class ProcessInformation(ctypes.Structure):
+            _fields_ = [("NextEntryOffset", wintypes.ULONG), ("NumberOfThreads", wintypes.ULONG),
+                        ("WorkingSetPrivateSize", ctypes.c_longlong), ("HardFaultCount", wintypes.ULONG),
+                        ("NumberOfThreadsHighWatermark", wintypes.ULONG), ("CycleTime", ctypes.c_ulonglong),
+                        ("CreateTime", ctypes.c_longlong), ("UserTime", ctypes.c_longlong),
+                        ("KernelTime", ctypes.c_longlong), ("ImageName", UnicodeString),
+                        ("BasePriority", wintypes.LONG), ("UniqueProcessId", ctypes.c_void_p),
+                        ("InheritedFromUniqueProcessId", ctypes.c_void_p)]
+
+        self._ctypes = ctypes
+        self._entry = ProcessInformation
+        self._query = ctypes.WinDLL("ntdll").NtQuerySystemInformation
+        self._query.restype = ctypes.c_long
+        self._buffer = ctypes.create_string_buffer(256 * 1024)
+        self._table = {}
+        self._lock = threading.Lock()
+        self.query()
+
+    def query(self):
+        """调用一次NtQuerySystemInformation，返回{pid: (进程名, 创建时间, 父pid)}"""
+        with self._lock:
+            return self._query_locked()
+
+    def _query_locked(self):
+        ctypes = self._ctypes
+        needed = ctypes.c_ulong(0)
+        while True:
+            status = self._query(self.SYSTEM_PROCESS_INFORMATION, self._buffer,
+                                 len(self._buffer), ctypes.byref(needed))
+            if status & 0xFFFFFFFF != self.STATUS_INFO_LENGTH_MISMATCH:
+                break
+            # 进程表在两次调用之间可能继续增长，多留一些余量
+            self._buffer = ctypes.create_string_buffer(needed.value + 64 * 1024)
+        if status < 0:
+            raise EnumeratorError(f"NtQuerySystemInformation失败：0x{status & 0xFFFFFFFF:08X}")
+        table = {}
+        entry_type = self._entry
+        buffer = self._buffer
+        wstring_at = ctypes.wstring_at
+        offset = 0
+        while True:
+            entry = entry_type.from_buffer(buffer, offset)
+            pid = entry.UniqueProcessId or 0
+            image = entry.ImageName
+            if image.Buffer:
+                name = wstring_at(image.Buffer, image.Length // 2)
+            else:
+                # 空闲进程与System进程没有映像名，与psutil的命名保持一致
+                name = "System Idle Process" if pid == 0 else "System"
+            table[pid] = (name, (entry.CreateTime - self.EPOCH_OFFSET) / 1e7,
+                          entry.InheritedFromUniqueProcessId or 0)
+            if not entry.NextEntryOffset:
+                break
+            offset += entry.NextEntryOffset
+        self._table = table
+        return table
+
+    def iter_processes(self):
+        for pid, (name, _, _) in self.query().items():
+            yield pid, name
+
+    def list_pids(self):
+        return sorted(self.query())
+
+    def resolve(self, pid):
+        return self._table.get(pid)
+
+
+# 按优先级排列的后端，psutil作为兜底
+ENUMERATORS = {
+    NtQueryEnumerator.name: NtQueryEnumerator,
+    ProcfsEnumerator.name: ProcfsEnumerator,
+    PsutilEnumerator.name: PsutilEnumerator,
+}
+
+_default = None
+
+
+def create_enumerator(name=None):
+    """创建进程枚举后端：指定名称时只尝试该后端，否则按优先级选择第一个可用的"""
+    if name is not None:
+        factory = ENUMERATORS.get(name)
+        if factory is None:
+            raise EnumeratorError(f"未知的进程枚举后端：{name}")
+        return factory()
+    for factory in ENUMERATORS.values():
+        try:
+            return factory()
+        except (EnumeratorError, OSError):
+            # 探测本身失败（如缺少DLL、系统调用出错）时同样换下一个后端
+            continue
+    raise EnumeratorError("没有可用的进程枚举后端")
+
+
+def default_enumerator():
+    """进程内共享的默认后端，第一次使用时选择"""
+    global _default
+    if _default is None:
+        _default = create_enumerator()
+    return _default
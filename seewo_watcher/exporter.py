@@ -0,0 +1,77 @@
+import threading
+from dataclasses import fields
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+from .metrics import Gauge, format_prometheus
+
+# ================= 指标端点 =================
+LOOPBACK = "127.0.0.1"
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def status_metrics(process_states, settings):
+    """把进程状态和设置快照表示为临时的gauge，供与注册表中的指标一起输出"""
+    metrics = [Gauge("watcher_process_running", "被监控进程是否正在运行", {"process": name}, None)
+               for name in process_states]
+    for metric, running in zip(metrics, process_states.values()):
+        metric.set(1 if running else 0)
+    for f in fields(settings):
+        value = getattr(settings, f.name)
+        if isinstance(value, (bool, int, float)):
+            metric = Gauge("watcher_setting", "当前设置（布尔值以0/1表示）", {"name": f.name}, None)
+            metric.set(float(value))
+            metrics.append(metric)
+    return metrics
+
+
+class MetricsServer:
+    """只监听本机回环地址的HTTP指标端点，GET /metrics返回Prometheus文本格式
+
+    运行在单独的后台线程中，每次请求只格式化已经汇总好的数据：读取进程状态、
+    设置快照和注册表中的指标，不触发扫描，也不与监控线程争用锁。
+    """
+
+    def __init__(self, registry, status, port, host=LOOPBACK):
+        """status为返回(进程状态字典, 设置快照)的函数；port为0时由系统分配端口"""
+        self.registry = registry
+        self.status = status
+        self.requests = 0
+        self._server = HTTPServer((host, port), self._make_handler())
+        self.host, self.port = self._server.server_address[:2]
+        self._thread = None
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?", 1)[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                server.requests += 1
+                body = server.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def render(self):
+        process_states, settings = self.status()
+        return format_prometheus(status_metrics(dict(process_states), settings) + self.registry.collect())
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name="MetricsServerThread",
+                                        daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._thread is not None:
+            self._server.shutdown()
+            self._thread = None
+        self._server.server_close()
@@ -0,0 +1,163 @@
+import os
+import threading
+
+# ================= 托盘图标 =================
+# 图标状态位掩码：低5位是功能开关，第5-6位是中心状态
+SHOW_ALERT = 1 << 0
+ENABLE_HOTKEY = 1 << 1
+AUTO_PAUSE = 1 << 2
+ENABLE_SLEEP = 1 << 3
+AUTO_KILL = 1 << 4
+CENTER_SHIFT = 5
+
+CENTER_IDLE = 0
+CENTER_WATCHED = 1
+CENTER_CONTROLLED = 2
+
+CENTER_COLORS = {
+    CENTER_IDLE: (0, 255, 0, 255),
+    CENTER_WATCHED: (255, 255, 0, 255),
+    CENTER_CONTROLLED: (255, 0, 0, 255),
+}
+
+# 所有可能出现的图标状态
+ALL_STATES = tuple((center << CENTER_SHIFT) | flags
+                   for center in sorted(CENTER_COLORS) for flags in range(1 << CENTER_SHIFT))
+
+ICON_SIZE = 64
+ATLAS_VERSION = 1
+
+ALERT_COLOR = (0, 191, 255, 255)
+HOTKEY_COLOR = (215, 194, 70, 255)
+PAUSE_COLOR = (128, 0, 255, 255)
+SLEEP_COLOR = (255, 119, 0, 255)
+OFF_COLOR = (100, 100, 100, 255)
+
+
+def center_status(process_states, watch_only=frozenset()):
+    """根据进程状态计算中心圆点的状态，watch_only为只表示屏幕被观察的规则名"""
+    watched = False
+    for name, running in process_states.items():
+        if running:
+            if name not in watch_only:
+                return CENTER_CONTROLLED
+            watched = True
+    return CENTER_WATCHED if watched else CENTER_IDLE
+
+
+def icon_state(settings, process_states, watch_only=frozenset()):
+    """把影响图标的设置和进程状态编码为一个小整数"""
+    return ((SHOW_ALERT if settings.show_alert else 0)
+            | (ENABLE_HOTKEY if settings.enable_hotkey else 0)
+            | (AUTO_PAUSE if settings.auto_pause else 0)
+            | (ENABLE_SLEEP if settings.enable_sleep else 0)
+            | (AUTO_KILL if settings.auto_kill else 0)
+            | (center_status(process_states, watch_only) << CENTER_SHIFT))
+
+
+def render_icon(state):
+    """绘制指定状态的图标 - 使用透明背景"""
+    from PIL import Image, ImageDraw
+    img = Image.new('RGBA', (ICON_SIZE, ICON_SIZE), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(img)
+    # 外环：弹窗提醒/全局热键
+    if state & SHOW_ALERT and state & ENABLE_HOTKEY:
+        draw.arc((8, 8, 56, 56), 0, 180, ALERT_COLOR, 3)
+        draw.arc((8, 8, 56, 56), 180, 360, HOTKEY_COLOR, 3)
+    elif state & SHOW_ALERT:
+        draw.arc((8, 8, 56, 56), 0, 360, ALERT_COLOR, 3)
+    elif state & ENABLE_HOTKEY:
+        draw.arc((8, 8, 56, 56), 0, 360, HOTKEY_COLOR, 3)
+    else:
+        draw.arc((8, 8, 56, 56), 0, 360, OFF_COLOR, 3)
+    # 内环：自动暂停/睡眠功能
+    if state & AUTO_PAUSE and state & ENABLE_SLEEP:
+        draw.arc((16, 16, 48, 48), 180, 360, PAUSE_COLOR, 3)
+        draw.arc((16, 16, 48, 48), 0, 180, SLEEP_COLOR, 3)
+    elif state & AUTO_PAUSE:
+        draw.arc((16, 16, 48, 48), 0, 360, PAUSE_COLOR, 3)
+    elif state & ENABLE_SLEEP:
+        draw.arc((16, 16, 48, 48), 0, 360, SLEEP_COLOR, 3)
+    else:
+        draw.arc((16, 16, 48, 48), 0, 360, OFF_COLOR, 3)
+    draw.ellipse((22, 22, 42, 42), fill=CENTER_COLORS[state >> CENTER_SHIFT])
+    if state & AUTO_KILL:
+        draw.rectangle([2, 2, 62, 62], outline=(255, 0, 0, 255), width=3)
+    return img
+
+
+def render_error_icon():
+    from PIL import Image, ImageDraw
+    img = Image.new('RGBA', (ICON_SIZE, ICON_SIZE), (0, 0, 0, 0))
+    ImageDraw.Draw(img).ellipse((16, 16, 48, 48), fill=(255, 0, 0, 255))
+    return img
+
+
+class IconAtlas:
+    """按状态位掩码缓存的图标集
+
+    所有可能的图标在后台线程中一次性绘制好，并以横向拼接的PNG保存到
+    磁盘，之后启动时直接读取。切换图标只是一次列表索引。
+    """
+
+    def __init__(self, cache_dir=None):
+        self.path = (os.path.join(cache_dir, f"icon_atlas_v{ATLAS_VERSION}.png")
+                     if cache_dir else None)
+        self._icons = [None] * (max(ALL_STATES) + 1)
+        self._lock = threading.Lock()
+
+    def get(self, state):
+        """返回指定状态的图标，尚未绘制时立即绘制并缓存"""
+        icon = self._icons[state]
+        if icon is None:
+            try:
+                icon = render_icon(state)
+            except Exception:
+                return render_error_icon()
+            self._icons[state] = icon
+        return icon
+
+    def warm(self):
+        """从磁盘加载图标集，不存在或已损坏时重新绘制并保存"""
+        with self._lock:
+            if self._load():
+                return
+            for state in ALL_STATES:
+                self.get(state)
+            self._save()
+
+    def warm_async(self):
+        threading.Thread(target=self.warm, name="IconAtlasThread", daemon=True).start()
+
+    def _load(self):
+        if not self.path or not os.path.exists(self.path):
+            return False
+        try:
+            from PIL import Image
+            with Image.open(self.path) as atlas:
+                atlas.load()
+                if atlas.size != (ICON_SIZE * len(ALL_STATES), ICON_SIZE):
+                    return False
+                atlas = atlas.convert('RGBA')
+            for index, state in enumerate(ALL_STATES):
+                if self._icons[state] is None:
+                    left = index * ICON_SIZE
+                    self._icons[state] = atlas.crop((left, 0, left + ICON_SIZE, ICON_SIZE))
+            return True
+        except Exception:
+            return False
+
+    def _save(self):
+        if not self.path:
+            return
+        try:
+            from PIL import Image
+            atlas = Image.new('RGBA', (ICON_SIZE * len(ALL_STATES), ICON_SIZE), (0, 0, 0, 0))
+            for index, state in enumerate(ALL_STATES):
+                atlas.paste(self._icons[state], (index * ICON_SIZE, 0))
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            temp_file = f"{self.path}.tmp"
+            atlas.save(temp_file, format="PNG")
+            os.replace(temp_file, self.path)
+        except Exception:
+            pass
@@ -0,0 +1,132 @@
+import os
+import threading
+import time
+
+# ================= 事件日志 =================
+# 记录类型，进程事件直接使用其类型（"start"/"exit"），详情为PID
+STATE_CHANGE = "state"
+ACTION_ISSUED = "action"
+ACTION_RESULT = "result"
+# 进程树：被监控进程的父进程与被结束的子树
+PROCESS_TREE = "tree"
+
+
+class EventJournal:
+    """有界环形缓冲的事件日志，异步追加写入滚动文件
+
+    缓冲区是预先分配好的几个并行列表，记录一条只是在持锁状态下写入几个
+    槽位，不创建元组或字符串，监控线程上的开销可以忽略。格式化和写盘都
+    在后台线程中完成；写盘来不及时最旧的记录会被覆盖并计入dropped。
+
+    文件每行一条记录：单调时钟时间戳、类型、对象、详情，以制表符分隔。
+    每次打开文件时先写一行"#"开头的锚点，给出墙上时间与单调时钟的对应关系。
+    """
+
+    def __init__(self, capacity=1024, path=None, flush_interval=2.0,
+                 max_bytes=256 * 1024, backups=2, clock=time.monotonic):
+        self.capacity = capacity
+        self.path = path
+        self.flush_interval = flush_interval
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.clock = clock
+        self.dropped = 0
+        self._times = [0.0] * capacity
+        self._kinds = [None] * capacity
+        self._subjects = [None] * capacity
+        self._details = [None] * capacity
+        # 已记录的总条数与已写盘的条数，都是单调递增的序号
+        self._count = 0
+        self._flushed = 0
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._anchored = False
+        self._stopped = threading.Event()
+        self._thread = None
+        if path is not None:
+            self._thread = threading.Thread(target=self._run, name="JournalWriterThread", daemon=True)
+            self._thread.start()
+
+    def record(self, kind, subject, detail=None, timestamp=None):
+        """记录一条事件，可从任意线程调用"""
+        if timestamp is None:
+            timestamp = self.clock()
+        with self._lock:
+            slot = self._count % self.capacity
+            self._times[slot] = timestamp
+            self._kinds[slot] = kind
+            self._subjects[slot] = subject
+            self._details[slot] = detail
+            self._count += 1
+
+    def __len__(self):
+        return min(self._count, self.capacity)
+
+    def entries(self, limit=None):
+        """按时间顺序返回缓冲区中的记录[(时间戳, 类型, 对象, 详情)]"""
+        with self._lock:
+            available = min(self._count, self.capacity)
+            if limit is not None:
+                available = min(available, limit)
+            return self._slice(self._count - available, self._count)
+
+    def flush(self):
+        """把尚未写盘的记录追加到文件"""
+        if self.path is None:
+            return
+        with self._write_lock:
+            with self._lock:
+                start = self._flushed
+                oldest = self._count - self.capacity
+                if start < oldest:
+                    self.dropped += oldest - start
+                    start = oldest
+                items = self._slice(start, self._count)
+                self._flushed = self._count
+            if not items:
+                return
+            lines = [f"{timestamp:.6f}\t{kind}\t{subject}\t{'' if detail is None else detail}\n"
+                     for timestamp, kind, subject, detail in items]
+            try:
+                self._append(lines)
+            except OSError:
+                pass
+
+    def stop(self):
+        """停止后台线程并写入剩余记录"""
+        self._stopped.set()
+        self.flush()
+
+    def _slice(self, start, end):
+        """取出序号[start, end)的记录，调用方需持有_lock"""
+        items = []
+        for sequence in range(start, end):
+            slot = sequence % self.capacity
+            items.append((self._times[slot], self._kinds[slot], self._subjects[slot], self._details[slot]))
+        return items
+
+    def _append(self, lines):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        if os.path.exists(self.path) and os.path.getsize(self.path) >= self.max_bytes:
+            self._rotate()
+        with open(self.path, 'a', encoding='utf-8') as f:
+            if not self._anchored:
+                f.write(f"#\t{time.time():.3f}\t{self.clock():.6f}\n")
+                self._anchored = True
+            f.writelines(lines)
+
+    def _rotate(self):
+        """journal.log -> journal.log.1 -> ... -> journal.log.N，最旧的删除"""
+        for index in range(self.backups, 0, -1):
+            source = self.path if index == 1 else f"{self.path}.{index - 1}"
+            if os.path.exists(source):
+                os.replace(source, f"{self.path}.{index}")
+        if self.backups == 0:
+            os.remove(self.path)
+        # 新文件需要重新写锚点
+        self._anchored = False
+
+    def _run(self):
+        while not self._stopped.wait(self.flush_interval):
+            if self._flushed != self._count:
+                self.flush()
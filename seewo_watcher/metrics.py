@@ -0,0 +1,187 @@
+import json
+import threading
+import time
+from bisect import bisect_left
+
+# ================= 运行指标 =================
+# 直方图的桶上限（秒），最后还有一个隐含的+Inf桶
+TICK_BUCKETS = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Counter:
+    """只增不减的计数器"""
+
+    __slots__ = ("name", "help", "labels", "value")
+    kind = "counter"
+
+    def __init__(self, name, help, labels):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.value = 0
+
+    def inc(self, amount=1):
+        self.value += amount
+
+    def get(self):
+        return self.value
+
+
+class Gauge:
+    """当前值；提供func时每次读取都调用func，用于暴露其他对象已有的计数"""
+
+    __slots__ = ("name", "help", "labels", "value", "func")
+    kind = "gauge"
+
+    def __init__(self, name, help, labels, func=None):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.value = 0
+        self.func = func
+
+    def set(self, value):
+        self.value = value
+
+    def get(self):
+        if self.func is not None:
+            try:
+                return self.func()
+            except Exception:
+                return None
+        return self.value
+
+
+class Histogram:
+    """固定桶直方图：桶在创建时分配好，记录一次观测只是二分查找和两次加法"""
+
+    __slots__ = ("name", "help", "labels", "bounds", "counts", "sum", "count")
+    kind = "histogram"
+
+    def __init__(self, name, help, labels, bounds):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q):
+        """按桶估计分位数，返回所在桶的上限；落在+Inf桶时返回inf"""
+        if not self.count:
+            return None
+        target = q * self.count
+        seen = 0
+        for bound, count in zip(self.bounds, self.counts):
+            seen += count
+            if seen >= target:
+                return bound
+        return float("inf")
+
+    def get(self):
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "buckets": dict(zip([*map(str, self.bounds), "+Inf"], self.counts)),
+        }
+
+
+class MetricsRegistry:
+    """指标注册表：按(名称, 标签)登记指标，重复登记返回同一个对象
+
+    调用方应在初始化时取得指标对象并保存，热路径上直接调用inc/observe，
+    不再经过注册表查找。每个指标通常只有一个写入线程，因此不加锁。
+    """
+
+    def __init__(self, clock=time.monotonic):
+        self.clock = clock
+        self.started_at = clock()
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def counter(self, name, help="", **labels):
+        return self._register(Counter, name, help, labels)
+
+    def gauge(self, name, help="", func=None, **labels):
+        return self._register(Gauge, name, help, labels, func)
+
+    def histogram(self, name, help="", buckets=LATENCY_BUCKETS, **labels):
+        return self._register(Histogram, name, help, labels, buckets)
+
+    def _register(self, cls, name, help, labels, *args):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            metric = self._metrics.get(key)
+            if metric is None:
+                metric = cls(name, help, dict(key[1]), *args)
+                self._metrics[key] = metric
+            elif not isinstance(metric, cls):
+                raise ValueError(f"指标{name}已登记为{metric.kind}")
+            return metric
+
+    def get(self, name, **labels):
+        return self._metrics.get((name, tuple(sorted(labels.items()))))
+
+    def collect(self):
+        """按名称排序返回所有指标"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return sorted(metrics, key=lambda metric: (metric.name, sorted(metric.labels.items())))
+
+    def snapshot(self):
+        """可直接序列化为JSON的指标快照"""
+        return {
+            "uptime": self.clock() - self.started_at,
+            "metrics": [{"name": metric.name, "type": metric.kind, "help": metric.help,
+                         "labels": metric.labels, "value": metric.get()}
+                        for metric in self.collect()],
+        }
+
+    def to_json(self):
+        return json.dumps(self.snapshot(), indent=2, ensure_ascii=False)
+
+
+def _escape(value, quote=True):
+    value = str(value).replace("\\", "\\\\").replace("\n", "\\n")
+    return value.replace('"', '\\"') if quote else value
+
+
+def _format_labels(labels, extra=None):
+    items = list(labels.items())
+    if extra is not None:
+        items.append(extra)
+    if not items:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in items) + "}"
+
+
+def format_prometheus(metrics):
+    """把指标格式化为Prometheus文本格式，同名指标需相邻（collect的顺序即满足）"""
+    lines = []
+    previous = None
+    for metric in metrics:
+        if metric.name != previous:
+            if metric.help:
+                lines.append(f"# HELP {metric.name} {_escape(metric.help, quote=False)}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            previous = metric.name
+        if metric.kind == "histogram":
+            cumulative = 0
+            for bound, count in zip([*map(repr, metric.bounds), "+Inf"], metric.counts):
+                cumulative += count
+                lines.append(f"{metric.name}_bucket{_format_labels(metric.labels, ('le', bound))} {cumulative}")
+            lines.append(f"{metric.name}_sum{_format_labels(metric.labels)} {metric.sum!r}")
+            lines.append(f"{metric.name}_count{_format_labels(metric.labels)} {metric.count}")
+            continue
+        value = metric.get()
+        if value is None:
+            continue
+        lines.append(f"{metric.name}{_format_labels(metric.labels)} {float(value)!r}")
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,131 @@
+import json
+import os
+import threading
+import time
+
+
+def serialize_settings(settings):
+    return json.dumps(settings, indent=2, ensure_ascii=False)
+
+
+def write_text_atomic(path, text, lock=None):
+    """先写临时文件再替换，替换失败时从备份恢复"""
+    temp_file = f"{path}.tmp"
+    backup_file = f"{path}.bak"
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    try:
+        if lock is not None:
+            lock.acquire()
+        try:
+            with open(temp_file, 'w', encoding='utf-8') as f:
+                f.write(text)
+            if os.path.exists(path):
+                try:
+                    os.replace(path, backup_file)
+                except Exception:
+                    pass
+            try:
+                os.replace(temp_file, path)
+            except Exception as e:
+                if os.path.exists(backup_file):
+                    os.replace(backup_file, path)
+                raise e
+            if os.path.exists(backup_file):
+                try:
+                    os.remove(backup_file)
+                except Exception:
+                    pass
+        finally:
+            if lock is not None:
+                lock.release()
+    except Exception:
+        if os.path.exists(temp_file):
+            try:
+                os.remove(temp_file)
+            except Exception:
+                pass
+        raise
+
+
+class SettingsWriter:
+    """后台设置写入器：合并短时间内的多次保存，只在内容变化时写盘
+
+    schedule只记录最新的设置并立即返回，不会阻塞界面或监控线程。
+    """
+
+    def __init__(self, path, lock=None, debounce=0.5, on_error=None):
+        self.path = path
+        self.lock = lock
+        self.debounce = debounce
+        self.on_error = on_error
+        self.writes = 0
+        self.skipped = 0
+        self._pending = None
+        self._last_written = self._read_existing()
+        self._condition = threading.Condition()
+        self._write_lock = threading.Lock()
+        self._stopped = False
+        self._thread = threading.Thread(target=self._run, name="SettingsWriterThread", daemon=True)
+        self._thread.start()
+
+    def _read_existing(self):
+        """读取磁盘上的内容，启动时未改动的设置不会被重写"""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return serialize_settings(json.load(f))
+        except Exception:
+            return None
+
+    def schedule(self, settings):
+        """登记需要保存的设置，防抖时间结束后由后台线程写入"""
+        with self._condition:
+            self._pending = dict(settings)
+            self._condition.notify()
+
+    def flush(self):
+        """立即写入尚未保存的设置（退出程序前调用），后台线程正在写入时等待其完成"""
+        # 取出与写入都在_write_lock内完成，较旧的设置不会在较新的之后写入
+        with self._write_lock:
+            with self._condition:
+                pending, self._pending = self._pending, None
+            if pending is not None:
+                self._write(pending)
+
+    def stop(self, timeout=5.0):
+        """停止后台线程，等待正在进行的写入结束后写入剩余的设置"""
+        with self._condition:
+            self._stopped = True
+            self._condition.notify()
+        if self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+        self.flush()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while self._pending is None and not self._stopped:
+                    self._condition.wait()
+                if self._stopped:
+                    return
+                # 防抖：等待期间的后续保存会合并到同一次写入
+                deadline = time.monotonic() + self.debounce
+                while not self._stopped:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._condition.wait(remaining)
+            self.flush()
+
+    def _write(self, settings):
+        """写入设置，调用方须持有_write_lock"""
+        text = serialize_settings(settings)
+        if text == self._last_written:
+            self.skipped += 1
+            return
+        try:
+            write_text_atomic(self.path, text, self.lock)
+            self._last_written = text
+            self.writes += 1
+        except Exception as e:
+            if self.on_error is not None:
+                self.on_error(e)
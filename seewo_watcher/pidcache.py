@@ -0,0 +1,128 @@
+import os
+import signal
+
+SYNCHRONIZE = 0x00100000
+PROCESS_QUERY_LIMITED_INFORMATION = 0x1000
+WAIT_TIMEOUT = 0x102
+
+
+class ProcessHandleCache:
+    """按(pid, create_time)缓存的进程句柄，用于低开销地确认进程存活
+
+    句柄在进程加入缓存时打开一次并一直持有：Windows的进程句柄和Linux的
+    pidfd都会锁定进程身份，PID被复用也不会误判。稳定状态下每次检查只是
+    一次系统调用，不创建任何对象。
+    """
+
+    def __init__(self):
+        # pid -> [create_time, handle]
+        self._entries = {}
+        if os.name == 'nt':
+            import ctypes
+            # 私有的WinDLL实例：设置argtypes/restype不影响进程中其他使用ctypes.windll的代码
+            kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+            kernel32.OpenProcess.restype = ctypes.c_void_p
+            kernel32.OpenProcess.argtypes = (ctypes.c_uint32, ctypes.c_int, ctypes.c_uint32)
+            kernel32.WaitForSingleObject.restype = ctypes.c_uint32
+            kernel32.WaitForSingleObject.argtypes = (ctypes.c_void_p, ctypes.c_uint32)
+            kernel32.CloseHandle.argtypes = (ctypes.c_void_p,)
+            self._open = self._open_windows
+            self._close = kernel32.CloseHandle
+            self._probe = self._probe_windows
+            self._kernel32 = kernel32
+        elif hasattr(os, 'pidfd_open') and hasattr(signal, 'pidfd_send_signal'):
+            self._open = self._open_pidfd
+            self._close = os.close
+            self._probe = self._probe_pidfd
+        else:
+            self._open = lambda pid: None
+            self._close = None
+            self._probe = self._probe_kill
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, pid):
+        return pid in self._entries
+
+    def add(self, pid, create_time=None):
+        """将PID加入缓存，create_time与已缓存的不一致时视为PID复用并替换"""
+        if create_time is None:
+            create_time = self._create_time(pid)
+        entry = self._entries.get(pid)
+        if entry is not None:
+            if entry[0] == create_time:
+                return
+            self.discard(pid)
+        try:
+            handle = self._open(pid)
+        except OSError:
+            handle = None
+        self._entries[pid] = [create_time, handle]
+
+    def discard(self, pid):
+        """移除PID并关闭句柄"""
+        entry = self._entries.pop(pid, None)
+        if entry is not None and entry[1] is not None and self._close is not None:
+            try:
+                self._close(entry[1])
+            except OSError:
+                pass
+
+    def clear(self):
+        for pid in list(self._entries):
+            self.discard(pid)
+
+    def create_time(self, pid):
+        """缓存时记录的创建时间，未缓存或无法取得时返回None"""
+        entry = self._entries.get(pid)
+        return entry[0] if entry is not None else None
+
+    def alive(self, pid):
+        """检查缓存的进程是否仍在运行，未缓存的PID视为不存在"""
+        entry = self._entries.get(pid)
+        if entry is None:
+            return False
+        handle = entry[1]
+        if handle is None:
+            return self._probe_kill(pid, None)
+        return self._probe(pid, handle)
+
+    def _create_time(self, pid):
+        import psutil
+        try:
+            return psutil.Process(pid).create_time()
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            return None
+
+    def _open_windows(self, pid):
+        handle = self._kernel32.OpenProcess(SYNCHRONIZE | PROCESS_QUERY_LIMITED_INFORMATION, 0, pid)
+        return handle or None
+
+    def _probe_windows(self, pid, handle):
+        return self._kernel32.WaitForSingleObject(handle, 0) == WAIT_TIMEOUT
+
+    def _open_pidfd(self, pid):
+        return os.pidfd_open(pid)
+
+    def _probe_pidfd(self, pid, handle):
+        try:
+            signal.pidfd_send_signal(handle, 0)
+            return True
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            return True
+
+    def _probe_kill(self, pid, handle):
+        """没有句柄时的回退检查，无法识别PID复用"""
+        if os.name == 'nt':
+            import psutil
+            return psutil.pid_exists(pid)
+        try:
+            os.kill(pid, 0)
+            return True
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            return True
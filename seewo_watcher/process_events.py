@@ -0,0 +1,428 @@
+import os
+import queue
+import threading
+import time
+from collections import namedtuple
+
+from .metrics import TICK_BUCKETS
+from .pidcache import ProcessHandleCache
+from .rules import RuleSet
+from .snapshot import IncrementalSnapshot, ProcessSnapshot
+
+# ================= 进程事件 =================
+PROCESS_START = "start"
+PROCESS_EXIT = "exit"
+
+ProcessEvent = namedtuple("ProcessEvent", ["kind", "pid", "name", "timestamp"])
+
+
+class EventSourceError(RuntimeError):
+    """事件源无法启动"""
+
+
+class ProcessEventSource:
+    """进程事件源接口：报告被监控进程的启动与退出"""
+
+    # 推送式事件源的检测延迟只取决于事件到达时间，与轮询周期无关
+    is_push = False
+    # 维护进程树的事件源提供ProcessTree，其他事件源为None
+    tree = None
+
+    def __init__(self, rules):
+        # 兼容直接传入进程名列表
+        self.rules = rules if isinstance(rules, RuleSet) else RuleSet.from_names(rules)
+        self.process_names = self.rules.names
+
+    def canonical_name(self, name):
+        """将进程名映射为匹配的规则名，不受监控的进程返回None"""
+        return self.rules.match(name)
+
+    def path_matches(self, rule_name, pid):
+        """路径规则需要按PID确认完整路径，其他规则直接通过"""
+        if self.rules.path_pattern(rule_name) is None:
+            return True
+        try:
+            import psutil
+            exe = psutil.Process(pid).exe()
+        except Exception:
+            return False
+        return self.rules.path_matches(rule_name, exe)
+
+    def process_name(self, pid):
+        """事件源所知的pid的进程名，未知时返回None"""
+        return None
+
+    def create_time(self, pid):
+        """开始跟踪pid时记录的创建时间，用于在结束进程前确认PID未被复用，未知时返回None"""
+        return None
+
+    def current_tree(self):
+        """反映最近一次扫描的进程树，进程树可能已过时或不维护进程树时返回None"""
+        return self.tree
+
+    def start(self):
+        """启动事件源"""
+
+    def instrument(self, metrics):
+        """登记事件源自身的指标"""
+
+    def seed(self, snapshot):
+        """提供启动时已采集的进程快照
+
+        推送式事件源在订阅成功后自行补发已在运行的进程（快照采集于订阅之前，
+        可能漏掉其间启动的进程），因此默认忽略。
+        """
+
+    def stop(self):
+        """停止事件源"""
+
+    def is_alive(self):
+        """事件源是否仍在正常工作"""
+        return True
+
+    def wait(self, timeout):
+        """最多阻塞timeout秒，返回期间产生的事件列表"""
+        raise NotImplementedError
+
+
+class QueuedEventSource(ProcessEventSource):
+    """基于队列的推送式事件源基类"""
+
+    is_push = True
+
+    def __init__(self, rules):
+        super().__init__(rules)
+        self._events = queue.Queue()
+
+    def _emit(self, kind, pid, name, timestamp=None):
+        """投递一个事件，唤醒等待中的监控线程"""
+        self._events.put(ProcessEvent(kind, pid, name,
+                                      time.monotonic() if timestamp is None else timestamp))
+
+    def wait(self, timeout):
+        try:
+            events = [self._events.get(timeout=timeout)]
+        except queue.Empty:
+            return []
+        while True:
+            try:
+                events.append(self._events.get_nowait())
+            except queue.Empty:
+                return events
+
+
+class FakeProcessSource(QueuedEventSource):
+    """内存中的假事件源，用于在没有Windows环境时驱动状态机"""
+
+    def __init__(self, rules):
+        super().__init__(rules)
+        self._next_pid = 1000
+        self.running = {}
+
+    def start_process(self, name, pid=None):
+        """模拟进程启动，返回分配的PID"""
+        if pid is None:
+            self._next_pid += 1
+            pid = self._next_pid
+        canonical = self.canonical_name(name)
+        self.running[pid] = name
+        if canonical:
+            self._emit(PROCESS_START, pid, canonical)
+        return pid
+
+    def exit_process(self, pid):
+        """模拟进程退出"""
+        name = self.running.pop(pid, None)
+        canonical = self.canonical_name(name)
+        if canonical:
+            self._emit(PROCESS_EXIT, pid, canonical)
+
+
+class PollingProcessSource(ProcessEventSource):
+    """轮询式事件源：定期扫描进程表并与上次结果比较
+
+    默认使用增量快照，只为新出现的PID解析进程名，并由同一份变化维护进程树；
+    提供enumerate_processes（产出(pid, 进程名)的可调用对象）时每次扫描遍历
+    它给出的完整进程表，不维护进程树，后代规则不会匹配任何进程。
+    """
+
+    def __init__(self, rules, enumerate_processes=None, handles=None, clock=time.monotonic,
+                 incremental=None):
+        super().__init__(rules)
+        self.clock = clock
+        self.enumerate_processes = enumerate_processes
+        if incremental is None and enumerate_processes is None:
+            incremental = IncrementalSnapshot(self.rules, clock=clock)
+        self.incremental = incremental
+        if incremental is not None:
+            self.tree = incremental.tree
+        self.known_pids = {name: set() for name in self.process_names}
+        self.handles = handles if handles is not None else ProcessHandleCache()
+        # 路径规则中映像名相同但路径不符的PID，不再重复打开确认
+        self.rejected = {name: set() for name in self.process_names if self.rules.path_pattern(name)}
+        self.last_snapshot = None
+        self._seed_snapshot = None
+        # 跳过遍历的扫描不更新进程树，此后新启动的子进程不在树中
+        self._tree_current = False
+        self._track_tree = incremental is not None and bool(self.rules.descendant_rules)
+        self._stopped = threading.Event()
+        self._metrics = None
+
+    def stop(self):
+        self._stopped.set()
+
+    def process_name(self, pid):
+        if self.incremental is None:
+            return None
+        return self.incremental.name_of(pid)
+
+    def create_time(self, pid):
+        return self.handles.create_time(pid)
+
+    def current_tree(self):
+        return self.tree if self._tree_current else None
+
+    def instrument(self, metrics):
+        self._metrics = metrics
+        self._poll_seconds = metrics.histogram("watcher_poll_seconds", "每次轮询扫描的耗时", TICK_BUCKETS)
+        self._enumerated = metrics.counter("watcher_processes_enumerated_total", "遍历进程表时经过的进程数")
+        self._cache_hits = metrics.counter(
+            "watcher_pid_cache_hits_total", "所有被监控进程都由缓存PID确认、跳过遍历的扫描次数")
+        self._cache_misses = metrics.counter("watcher_pid_cache_misses_total", "需要遍历进程表的扫描次数")
+        self._resolved = metrics.counter("watcher_process_names_resolved_total", "增量扫描中为新PID解析进程名的次数")
+        hits, misses = self._cache_hits, self._cache_misses
+        metrics.gauge("watcher_pid_cache_hit_ratio", "PID缓存命中率",
+                      lambda: hits.value / (hits.value + misses.value) if hits.value + misses.value else 0.0)
+
+    def seed(self, snapshot):
+        """第一次扫描直接使用启动时的快照，无需再遍历一次进程表"""
+        self._seed_snapshot = snapshot
+
+    def wait(self, timeout):
+        if self._seed_snapshot is not None:
+            # 启动快照已就绪，第一次tick无需等待
+            return self.poll()
+        if self._stopped.wait(timeout):
+            return []
+        return self.poll()
+
+    def poll(self):
+        """扫描一次进程表，返回与上次扫描相比的变化"""
+        if self._metrics is None:
+            return self._poll()
+        started = time.perf_counter()
+        events = self._poll()
+        self._poll_seconds.observe(time.perf_counter() - started)
+        return events
+
+    def _poll(self):
+        events = []
+        now = self.clock()
+        all_confirmed = True
+        alive = self.handles.alive
+        # 先通过持有的句柄检查缓存，稳定状态下不创建任何对象
+        for proc_name, pids in self.known_pids.items():
+            invalid_pids = None
+            for pid in pids:
+                if not alive(pid):
+                    if invalid_pids is None:
+                        invalid_pids = []
+                    invalid_pids.append(pid)
+            if invalid_pids is not None:
+                for pid in invalid_pids:
+                    pids.discard(pid)
+                    self.handles.discard(pid)
+                    events.append(ProcessEvent(PROCESS_EXIT, pid, proc_name, now))
+            if not pids:
+                all_confirmed = False
+        # 每个被监控进程都有存活的缓存PID时，无需遍历进程表；有后代规则时
+        # 仍须比较PID列表，否则已知一个子进程后不再发现新的子进程，进程树也会过时
+        if all_confirmed and not self._track_tree:
+            self._tree_current = False
+            if self._metrics is not None:
+                self._cache_hits.inc()
+            return events
+        if self._metrics is not None:
+            self._cache_misses.inc()
+        snapshot, self._seed_snapshot = self._seed_snapshot, None
+        if snapshot is not None:
+            now = snapshot.timestamp
+        elif self.incremental is not None:
+            self._apply_delta(events, now)
+            return events
+        else:
+            snapshot = ProcessSnapshot.capture(self.rules, self.enumerate_processes(), now)
+        self.last_snapshot = snapshot
+        if self._metrics is not None:
+            self._enumerated.inc(snapshot.process_count)
+        for proc_name, pids in snapshot.index.items():
+            known = self.known_pids[proc_name]
+            rejected = self.rejected.get(proc_name)
+            if rejected is not None:
+                rejected &= pids
+            for pid in pids - known:
+                if rejected is not None:
+                    if pid in rejected:
+                        continue
+                    if not self.path_matches(proc_name, pid):
+                        rejected.add(pid)
+                        continue
+                known.add(pid)
+                self.handles.add(pid)
+                events.append(ProcessEvent(PROCESS_START, pid, proc_name, now))
+        return events
+
+    def _apply_delta(self, events, now):
+        """增量扫描：只处理与上次相比新出现和消失的被监控进程"""
+        started, exited = self.incremental.update()
+        self._tree_current = True
+        if self._metrics is not None:
+            self._enumerated.inc(self.incremental.process_count)
+            self._resolved.inc(self.incremental.resolved)
+        for proc_name, pid in exited:
+            rejected = self.rejected.get(proc_name)
+            if rejected is not None:
+                rejected.discard(pid)
+            known = self.known_pids[proc_name]
+            if pid in known:
+                known.discard(pid)
+                self.handles.discard(pid)
+                events.append(ProcessEvent(PROCESS_EXIT, pid, proc_name, now))
+        for proc_name, pid in started:
+            known = self.known_pids[proc_name]
+            if pid in known:
+                continue
+            rejected = self.rejected.get(proc_name)
+            if rejected is not None:
+                if pid in rejected:
+                    continue
+                if not self.path_matches(proc_name, pid):
+                    rejected.add(pid)
+                    continue
+            known.add(pid)
+            self.handles.add(pid)
+            events.append(ProcessEvent(PROCESS_START, pid, proc_name, now))
+
+
+class WmiProcessSource(QueuedEventSource):
+    """基于WMI进程跟踪事件的推送式事件源（需要管理员权限）"""
+
+    # ETW中的映像名最多保留15个字符，长名称需要再按PID确认
+    TRACE_NAME_LIMIT = 15
+    WBEM_E_TIMED_OUT = -2147209215
+
+    def __init__(self, rules, startup_timeout=5):
+        super().__init__(rules)
+        self.startup_timeout = startup_timeout
+        self.tracked = {}
+        # pid -> 开始跟踪时的创建时间
+        self.created = {}
+        self._stopped = threading.Event()
+        self._ready = threading.Event()
+        self._error = None
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="WmiProcessEventThread", daemon=True)
+        self._thread.start()
+        if not self._ready.wait(self.startup_timeout):
+            self.stop()
+            raise EventSourceError("WMI事件订阅超时")
+        if self._error is not None:
+            raise EventSourceError(f"无法订阅WMI进程事件: {self._error}")
+
+    def stop(self):
+        self._stopped.set()
+
+    def is_alive(self):
+        return self._thread is not None and self._thread.is_alive() and not self._stopped.is_set()
+
+    def _match_start(self, pid, trace_name):
+        """匹配启动事件，必要时通过PID解析完整进程名"""
+        canonical = self.canonical_name(trace_name)
+        if not canonical and len(trace_name) >= self.TRACE_NAME_LIMIT:
+            if not self.rules.may_match_prefix(trace_name.lower()):
+                return None
+            try:
+                import psutil
+                canonical = self.canonical_name(psutil.Process(pid).name())
+            except Exception:
+                return None
+        if canonical and not self.path_matches(canonical, pid):
+            return None
+        return canonical
+
+    def create_time(self, pid):
+        return self.created.get(pid)
+
+    def _track(self, pid, canonical):
+        """开始跟踪一个被监控进程，同时记录其创建时间"""
+        self.tracked[pid] = canonical
+        try:
+            import psutil
+            self.created[pid] = psutil.Process(pid).create_time()
+        except Exception:
+            self.created.pop(pid, None)
+        self._emit(PROCESS_START, pid, canonical)
+
+    def _seed(self):
+        """订阅成功后补发已在运行的被监控进程"""
+        snapshot = ProcessSnapshot.capture(self.rules)
+        for canonical, pids in snapshot.index.items():
+            for pid in pids:
+                if pid not in self.tracked and self.path_matches(canonical, pid):
+                    self._track(pid, canonical)
+
+    def _run(self):
+        try:
+            import pythoncom
+            import pywintypes
+            import win32com.client
+            pythoncom.CoInitialize()
+            wmi = win32com.client.GetObject(r"winmgmts:{impersonationLevel=impersonate}!\\.\root\cimv2")
+            subscription = wmi.ExecNotificationQuery("SELECT * FROM Win32_ProcessTrace")
+        except Exception as e:
+            self._error = e
+            self._ready.set()
+            return
+        self._ready.set()
+        try:
+            self._seed()
+            while not self._stopped.is_set():
+                try:
+                    event = subscription.NextEvent(500)
+                except pywintypes.com_error as e:
+                    if e.hresult == self.WBEM_E_TIMED_OUT:
+                        continue
+                    raise
+                pid = int(event.ProcessID)
+                if event.Path_.Class == "Win32_ProcessStartTrace":
+                    canonical = self._match_start(pid, str(event.ProcessName))
+                    if canonical:
+                        self._track(pid, canonical)
+                else:
+                    self.created.pop(pid, None)
+                    canonical = self.tracked.pop(pid, None)
+                    if canonical:
+                        self._emit(PROCESS_EXIT, pid, canonical)
+        except Exception as e:
+            self._error = e
+        finally:
+            pythoncom.CoUninitialize()
+
+
+def create_event_source(rules, prefer_push=True):
+    """创建事件源：优先使用推送式后端，失败时回退到轮询
+
+    进程树只由轮询的增量快照维护，规则中有后代规则时直接使用轮询。
+    """
+    if prefer_push and os.name == 'nt' and not rules.descendant_rules:
+        source = WmiProcessSource(rules)
+        try:
+            source.start()
+            return source
+        except EventSourceError:
+            pass
+    source = PollingProcessSource(rules)
+    source.start()
+    return source
@@ -0,0 +1,73 @@
+# ================= 进程树 =================
+
+
+class ProcessTree:
+    """父进程 -> 子进程索引，由增量快照在每个新PID和消失的PID上维护
+
+    父进程先于子进程退出后，子进程的父PID可能被新进程复用，因此只有当
+    父进程已在树中且创建时间不晚于子进程时才建立父子关系；父进程退出时
+    其子进程成为根节点，不会被挂到复用了该PID的新进程下面。
+    查询子树只访问子树中的节点，与进程总数无关。
+    """
+
+    def __init__(self):
+        # pid -> 父pid，没有已知父进程的pid不在其中
+        self.parents = {}
+        # pid -> 子pid集合，没有子进程的pid不在其中
+        self.children = {}
+        # pid -> 创建时间
+        self.created = {}
+
+    def __len__(self):
+        return len(self.created)
+
+    def __contains__(self, pid):
+        return pid in self.created
+
+    def add(self, pid, ppid, create_time):
+        """加入一个进程，同一批中的进程须按创建时间先后加入"""
+        self.created[pid] = create_time
+        parent_created = self.created.get(ppid)
+        if ppid != pid and parent_created is not None and parent_created <= create_time:
+            self.parents[pid] = ppid
+            self.children.setdefault(ppid, set()).add(pid)
+
+    def remove(self, pid):
+        """移除一个进程，其子进程成为根节点"""
+        if self.created.pop(pid, None) is None:
+            return
+        ppid = self.parents.pop(pid, None)
+        if ppid is not None:
+            siblings = self.children[ppid]
+            siblings.discard(pid)
+            if not siblings:
+                del self.children[ppid]
+        for child in self.children.pop(pid, ()):
+            del self.parents[child]
+
+    def clear(self):
+        self.parents.clear()
+        self.children.clear()
+        self.created.clear()
+
+    def parent(self, pid):
+        return self.parents.get(pid)
+
+    def ancestors(self, pid):
+        """由近及远产出pid的祖先"""
+        parents = self.parents
+        pid = parents.get(pid)
+        while pid is not None:
+            yield pid
+            pid = parents.get(pid)
+
+    def descendants(self, pid):
+        """pid的全部后代，父进程排在子进程之前"""
+        children = self.children
+        result = []
+        stack = list(children.get(pid, ()))
+        while stack:
+            child = stack.pop()
+            result.append(child)
+            stack.extend(children.get(child, ()))
+        return result
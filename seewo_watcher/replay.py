@@ -0,0 +1,424 @@
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+from .decisions import ACTION_SLEEP, DecisionPolicy
+from .engine import DetectionEngine
+from .enumerators import default_enumerator
+from .process_events import PollingProcessSource
+from .rules import default_rules, load_rules
+from .scheduler import AdaptiveScheduler, parse_hot_hours
+from .settings import WatcherSettings
+from .snapshot import IncrementalSnapshot
+
+# ================= 回放模式 =================
+# 轨迹文件每行一个JSON对象：第一行可以是表头{"version": 1, "wall": 录制开始的墙上时间}，
+# 之后每行一条记录，t为相对录制开始的秒数：
+#   {"t": 0.0, "processes": [[pid, 进程名], ...]}   全量进程表
+#   {"t": 1.5, "start": [[pid, 进程名]], "exit": [pid]}   相对上一条的变化
+# 进程项可以附带第三项完整路径（供路径规则匹配，没有时为null）和第四项父pid
+# （供后代规则匹配，录制时会记录）。
+TRACE_VERSION = 1
+
+
+class TraceError(ValueError):
+    """轨迹文件格式错误"""
+
+
+class VirtualClock:
+    """虚拟时钟：时间只在等待时前进，不真正休眠"""
+
+    def __init__(self, start=0.0):
+        self.now = start
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+def load_trace(path):
+    """读取轨迹文件，返回(表头, 记录列表)，记录按时间排序"""
+    header = {}
+    records = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                item = json.loads(line)
+            except ValueError as e:
+                raise TraceError(f"第{number}行不是有效的JSON：{e}") from e
+            if not isinstance(item, dict):
+                raise TraceError(f"第{number}行不是对象")
+            if "t" not in item:
+                header = item
+                continue
+            if not isinstance(item["t"], (int, float)):
+                raise TraceError(f"第{number}行的时间无效")
+            records.append(item)
+    if header.get("version", TRACE_VERSION) != TRACE_VERSION:
+        raise TraceError(f"不支持的轨迹版本：{header.get('version')}")
+    records.sort(key=lambda item: item["t"])
+    return header, records
+
+
+class TraceProcessTable:
+    """按虚拟时间重放轨迹的进程表
+
+    同时按规则记录每个被监控进程最近一次从无到有、从有到无的时刻，用于
+    统计从进程真实启动/退出到检测到状态变化的延迟。
+    """
+
+    def __init__(self, records, rules):
+        self.records = records
+        self.rules = rules
+        self.position = 0
+        self.processes = {}
+        self.paths = {}
+        self.parents = {}
+        # pid -> 虚拟的创建时间：记录的时间，同一条记录中父进程早于子进程
+        self.created = {}
+        self._pids = None
+        self.transition_at = {}
+        self._rule_pids = {name: set() for name in rules.names}
+
+    @property
+    def end(self):
+        return self.records[-1]["t"] if self.records else 0.0
+
+    def advance_to(self, now):
+        """应用时间不晚于now的记录，返回进程表是否有变化"""
+        changed = False
+        while self.position < len(self.records) and self.records[self.position]["t"] <= now:
+            changed = self._apply(self.records[self.position]) or changed
+            self.position += 1
+        return changed
+
+    def _apply(self, record):
+        timestamp = record["t"]
+        if "processes" in record:
+            entries = {entry[0]: entry for entry in record["processes"]}
+            exits = [pid for pid in self.processes if pid not in entries]
+            starts = [entry for pid, entry in entries.items()
+                      if self.processes.get(pid) != entry[1]]
+        else:
+            exits = record.get("exit", ())
+            starts = record.get("start", ())
+        for pid in exits:
+            name = self.processes.pop(pid, None)
+            self.paths.pop(pid, None)
+            self.parents.pop(pid, None)
+            self.created.pop(pid, None)
+            self._track(name, pid, False, timestamp)
+        for order, entry in enumerate(_parents_first(starts)):
+            pid, name = entry[0], entry[1]
+            if pid in self.processes:
+                self._track(self.processes[pid], pid, False, timestamp)
+            self.processes[pid] = name
+            if len(entry) > 2 and entry[2] is not None:
+                self.paths[pid] = entry[2]
+            self.parents[pid] = entry[3] if len(entry) > 3 else 0
+            self.created[pid] = timestamp + order * 1e-6
+            self._track(name, pid, True, timestamp)
+        if exits or starts:
+            self._pids = None
+            return True
+        return False
+
+    def _track(self, name, pid, started, timestamp):
+        rule = self.rules.match(name)
+        if rule is None:
+            return
+        pids = self._rule_pids[rule]
+        was_running = bool(pids)
+        if started:
+            pids.add(pid)
+        else:
+            pids.discard(pid)
+        if bool(pids) != was_running:
+            self.transition_at[rule] = timestamp
+
+    def list_pids(self):
+        """按升序返回当前的PID，进程表没有变化时沿用上次的列表"""
+        if self._pids is None:
+            self._pids = sorted(self.processes)
+        return self._pids
+
+    def resolve(self, pid):
+        name = self.processes.get(pid)
+        if name is None:
+            return None
+        return name, self.created[pid], self.parents[pid]
+
+
+def _parents_first(entries):
+    """把同一条记录中的进程项排成父进程在子进程之前，其余保持原顺序"""
+    by_pid = {entry[0]: entry for entry in entries}
+    ordered = []
+    visited = set()
+    for entry in entries:
+        chain = []
+        while entry is not None and entry[0] not in visited:
+            visited.add(entry[0])
+            chain.append(entry)
+            entry = by_pid.get(entry[3]) if len(entry) > 3 else None
+        ordered.extend(reversed(chain))
+    return ordered
+
+
+class TraceHandles:
+    """与ProcessHandleCache接口一致，存活状态取自轨迹进程表"""
+
+    def __init__(self, table):
+        self.table = table
+        self.pids = set()
+
+    def add(self, pid, create_time=None):
+        self.pids.add(pid)
+
+    def discard(self, pid):
+        self.pids.discard(pid)
+
+    def clear(self):
+        self.pids.clear()
+
+    def create_time(self, pid):
+        return None
+
+    def alive(self, pid):
+        return pid in self.pids and pid in self.table.processes
+
+
+class ReplayProcessSource(PollingProcessSource):
+    """从轨迹读取进程表的轮询事件源，等待只推进虚拟时钟
+
+    与正常运行一样通过增量快照扫描，由轨迹中的父pid维护进程树，后代规则
+    因此同样生效。两次轮询之间进程表没有变化时不会产生事件，直接跳过扫描。
+    """
+
+    def __init__(self, rules, table, clock):
+        incremental = IncrementalSnapshot(rules, table.list_pids, table.resolve, clock=clock)
+        super().__init__(rules, handles=TraceHandles(table), clock=clock, incremental=incremental)
+        self.table = table
+        self.polls = 0
+        self._polled = False
+        table.advance_to(clock())
+
+    def path_matches(self, rule_name, pid):
+        if self.rules.path_pattern(rule_name) is None:
+            return True
+        return self.rules.path_matches(rule_name, self.table.paths.get(pid))
+
+    def wait(self, timeout):
+        self.clock.advance(timeout)
+        if not self.table.advance_to(self.clock()) and self._polled:
+            return []
+        self._polled = True
+        self.polls += 1
+        return self.poll()
+
+
+class ReplayResult:
+    """回放结果：动作只记录不执行，供回归测试断言"""
+
+    def __init__(self):
+        # [(虚拟时间, Decision)]
+        self.actions = []
+        # [(虚拟时间, 规则名, 是否运行)]
+        self.state_changes = []
+        # 从进程真实启动/退出到提交状态变化的延迟（秒）
+        self.latencies = []
+        self.suppressed = {}
+        self.ticks = 0
+        self.polls = 0
+        self.virtual_seconds = 0.0
+        self.elapsed = 0.0
+
+    def action_log(self, ndigits=3):
+        """可直接序列化为JSON的动作列表"""
+        return [{"t": round(timestamp, ndigits), "action": decision.action,
+                 "args": json.loads(json.dumps(decision.args, ensure_ascii=False))}
+                for timestamp, decision in self.actions]
+
+    def assert_actions(self, expected, ndigits=3):
+        """断言动作序列与expected（action_log的格式）一致，不一致时抛出AssertionError"""
+        actual = self.action_log(ndigits)
+        for index, (got, want) in enumerate(zip(actual, expected)):
+            if got != want:
+                raise AssertionError(f"第{index + 1}个动作不一致：期望{want}，实际{got}")
+        if len(actual) != len(expected):
+            raise AssertionError(f"动作数量不一致：期望{len(expected)}个，实际{len(actual)}个")
+
+    def summary(self):
+        counts = {}
+        for _, decision in self.actions:
+            counts[decision.action] = counts.get(decision.action, 0) + 1
+        latencies = sorted(self.latencies)
+        return {
+            "virtual_seconds": round(self.virtual_seconds, 3),
+            "elapsed_seconds": round(self.elapsed, 3),
+            "ticks": self.ticks,
+            "polls": self.polls,
+            "state_changes": len(self.state_changes),
+            "actions": counts,
+            "suppressed": self.suppressed,
+            "latency_p50": round(statistics.median(latencies), 4) if latencies else None,
+            "latency_p99": round(latencies[int(len(latencies) * 0.99)], 4) if latencies else None,
+            "latency_max": round(latencies[-1], 4) if latencies else None,
+        }
+
+
+def replay(records, rules=None, settings=None, header=None, tail=None):
+    """在虚拟时间中回放轨迹，检测与决策逻辑与正常运行相同，所有动作只记录不执行
+
+    tail为最后一条记录之后继续回放的秒数，默认足够完成最后一次轮询和去抖确认。
+    """
+    rules = rules if rules is not None else default_rules()
+    settings = settings if settings is not None else WatcherSettings()
+    header = header or {}
+    start = min(0.0, records[0]["t"]) if records else 0.0
+    clock = VirtualClock(start)
+    table = TraceProcessTable(records, rules)
+    wall = header.get("wall")
+    localtime = (lambda: time.localtime(wall + clock())) if wall is not None else time.localtime
+    scheduler = AdaptiveScheduler(settings.check_interval, settings.max_check_interval,
+                                  settings.burst_duration, parse_hot_hours(settings.hot_hours),
+                                  clock=clock, localtime=localtime)
+    sources = []
+
+    def source_factory(rules):
+        source = ReplayProcessSource(rules, table, clock)
+        sources.append(source)
+        return source
+
+    engine = DetectionEngine(rules, scheduler, source_factory=source_factory, clock=clock)
+    policy = DecisionPolicy(rules, engine.state_machine)
+    if tail is None:
+        tail = settings.max_check_interval + max((dwell for _, dwell in rules.thresholds().values()), default=0) + 1.0
+    end = table.end + tail
+    result = ReplayResult()
+    started = time.perf_counter()
+    engine.start()
+    while clock() < end:
+        _, state_changes = engine.tick()
+        result.ticks += 1
+        if not state_changes:
+            continue
+        now = clock()
+        for name, running in state_changes:
+            result.state_changes.append((now, name, running))
+            if name in table.transition_at:
+                result.latencies.append(now - table.transition_at[name])
+        for decision in policy.decide(state_changes, settings):
+            result.actions.append((now, decision))
+            if decision.action == ACTION_SLEEP:
+                # 与正常运行一致：进入睡眠后自动禁用睡眠功能
+                settings = settings.replace(enable_sleep=False)
+    engine.stop()
+    result.elapsed = time.perf_counter() - started
+    result.virtual_seconds = clock() - start
+    result.polls = sum(source.polls for source in sources)
+    result.suppressed = {name: count for name, count in engine.state_machine.suppressed.items() if count}
+    return result
+
+
+def record_trace(path, duration, interval=1.0):
+    """录制本机进程表的轨迹：第一条为全量进程表，之后只记录变化
+
+    只为新出现的进程查询父pid，录制开销与全量扫描基本相同。
+    """
+    enumerator = default_enumerator()
+
+    def entry(pid, name):
+        info = enumerator.resolve(pid)
+        return [pid, name, None, info[2] if info is not None else 0]
+
+    started = time.monotonic()
+    previous = {}
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(json.dumps({"version": TRACE_VERSION, "wall": time.time()}) + "\n")
+        while True:
+            now = time.monotonic() - started
+            current = dict(enumerator.iter_processes())
+            if not previous:
+                record = {"t": round(now, 3), "processes": [entry(pid, name) for pid, name in sorted(current.items())]}
+            else:
+                starts = [entry(pid, name) for pid, name in sorted(current.items()) if previous.get(pid) != name]
+                exits = sorted(pid for pid, name in previous.items() if current.get(pid) != name)
+                record = {"t": round(now, 3), "start": starts, "exit": exits} if starts or exits else None
+            if record is not None:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+                f.flush()
+            previous = current
+            if now >= duration:
+                return
+            time.sleep(interval)
+
+
+def _load_settings(path, overrides):
+    data = {}
+    if path:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    for item in overrides:
+        key, sep, value = item.partition("=")
+        if not sep:
+            raise ValueError(f"无效的设置项：{item}，应为名称=值")
+        data[key] = value
+    return WatcherSettings.from_dict(data)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m seewo_watcher.replay",
+                                     description="在虚拟时间中回放进程轨迹，或录制本机的进程轨迹")
+    commands = parser.add_subparsers(dest="command", required=True)
+    run = commands.add_parser("run", help="回放轨迹，动作只记录不执行")
+    run.add_argument("trace")
+    run.add_argument("--rules", help="规则文件，默认使用内置规则")
+    run.add_argument("--settings", help="settings.json，默认使用默认设置")
+    run.add_argument("--set", action="append", default=[], metavar="名称=值",
+                     help="覆盖单项设置，例如--set check_interval=0.2 --set auto_pause=true")
+    run.add_argument("--expect", help="期望的动作列表（--output的格式），不一致时返回1")
+    run.add_argument("--output", help="把动作列表写入文件")
+    record = commands.add_parser("record", help="录制本机进程表的轨迹")
+    record.add_argument("trace")
+    record.add_argument("--duration", type=float, default=60.0)
+    record.add_argument("--interval", type=float, default=1.0)
+    args = parser.parse_args(argv)
+
+    if args.command == "record":
+        record_trace(args.trace, args.duration, args.interval)
+        return 0
+    try:
+        header, records = load_trace(args.trace)
+        if args.rules and not os.path.exists(args.rules):
+            raise OSError(f"规则文件不存在：{args.rules}")
+        rules = load_rules(args.rules) if args.rules else default_rules()
+        settings = _load_settings(args.settings, args.set)
+    except (OSError, ValueError) as e:
+        print(f"错误：{e}", file=sys.stderr)
+        return 2
+    result = replay(records, rules, settings, header)
+    print(json.dumps(result.summary(), indent=2, ensure_ascii=False))
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(result.action_log(), f, indent=2, ensure_ascii=False)
+    if args.expect:
+        with open(args.expect, 'r', encoding='utf-8') as f:
+            expected = json.load(f)
+        try:
+            result.assert_actions(expected)
+        except AssertionError as e:
+            print(f"回放结果与期望不一致：{e}", file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
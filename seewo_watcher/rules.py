@@ -0,0 +1,307 @@
+import fnmatch
+import json
+import ntpath
+import os
+
+from .persistence import write_text_atomic
+
+# ================= 监控规则 =================
+MATCH_NAME = "name"
+MATCH_GLOB = "glob"
+MATCH_PATH = "path"
+# 匹配另一条规则（pattern为其规则名）所匹配进程的全部后代进程
+MATCH_DESCENDANT = "descendant"
+MATCH_KINDS = (MATCH_NAME, MATCH_GLOB, MATCH_PATH, MATCH_DESCENDANT)
+
+# 规则级别决定托盘中心颜色，以及"仅对远程控制生效"时是否触发动作
+LEVEL_WATCH = "watch"
+LEVEL_CONTROL = "control"
+LEVELS = (LEVEL_WATCH, LEVEL_CONTROL)
+
+ACTION_ALERT = "alert"
+ACTION_HOTKEY = "hotkey"
+ACTION_KILL = "kill"
+ACTION_PAUSE = "pause"
+ACTION_SLEEP = "sleep"
+ACTIONS = (ACTION_ALERT, ACTION_HOTKEY, ACTION_KILL, ACTION_PAUSE, ACTION_SLEEP)
+
+RULES_VERSION = 1
+DEFAULT_HOTKEYS = ["ctrl+windows+d", "ctrl+windows+f4"]
+DEFAULT_RULES = [
+    {"name": "rtcRemoteDesktop.exe", "priority": 20, "level": LEVEL_CONTROL,
+     "actions": list(ACTIONS), "hotkeys": DEFAULT_HOTKEYS},
+    {"name": "screenCapture.exe", "priority": 10, "level": LEVEL_WATCH,
+     "actions": list(ACTIONS), "hotkeys": DEFAULT_HOTKEYS},
+]
+
+
+class RuleError(ValueError):
+    """规则文件格式错误"""
+
+
+def _normalize_path(path):
+    return ntpath.normcase(path.replace("/", "\\"))
+
+
+class WatchRule:
+    """一条监控规则：按进程名、通配符、完整路径或进程树中的祖先匹配进程"""
+
+    __slots__ = ("name", "match", "pattern", "priority", "level", "actions", "hotkeys",
+                 "confirm", "min_dwell", "order")
+
+    def __init__(self, name, match=MATCH_NAME, pattern=None, priority=0, level=LEVEL_CONTROL,
+                 actions=ACTIONS, hotkeys=None, confirm=1, min_dwell=0, order=0):
+        self.name = name
+        self.match = match
+        self.pattern = name if pattern is None else pattern
+        self.priority = priority
+        self.level = level
+        self.actions = frozenset(actions)
+        self.hotkeys = tuple(hotkeys) if hotkeys else None
+        # 状态变化需连续观察到的次数与最短持续秒数，用于过滤短暂出现的进程
+        self.confirm = confirm
+        self.min_dwell = min_dwell
+        self.order = order
+
+    @classmethod
+    def from_dict(cls, data, order=0):
+        """从规则文件中的一项构造规则，格式错误时抛出RuleError"""
+        if not isinstance(data, dict):
+            raise RuleError(f"第{order + 1}条规则不是对象")
+        name = data.get("name")
+        if not isinstance(name, str) or not name:
+            raise RuleError(f"第{order + 1}条规则缺少名称")
+        match = data.get("match", MATCH_NAME)
+        if match not in MATCH_KINDS:
+            raise RuleError(f"规则{name}的匹配方式无效：{match}")
+        pattern = data.get("pattern", name if match == MATCH_NAME else None)
+        if not isinstance(pattern, str) or not pattern:
+            raise RuleError(f"规则{name}缺少匹配模式")
+        if match == MATCH_PATH and any(c in ntpath.basename(pattern) for c in "*?["):
+            raise RuleError(f"规则{name}的路径必须给出确定的文件名")
+        priority = data.get("priority", 0)
+        if not isinstance(priority, int) or isinstance(priority, bool):
+            raise RuleError(f"规则{name}的优先级必须是整数")
+        level = data.get("level", LEVEL_CONTROL)
+        if level not in LEVELS:
+            raise RuleError(f"规则{name}的级别无效：{level}")
+        actions = data.get("actions", list(ACTIONS))
+        if not isinstance(actions, list) or any(action not in ACTIONS for action in actions):
+            raise RuleError(f"规则{name}的动作无效，可选：{', '.join(ACTIONS)}")
+        hotkeys = data.get("hotkeys")
+        if hotkeys is not None and (not isinstance(hotkeys, list) or len(hotkeys) != 2
+                                    or not all(isinstance(key, str) for key in hotkeys)):
+            raise RuleError(f"规则{name}的热键必须是[启动时, 退出时]两项")
+        if ACTION_HOTKEY in actions and hotkeys is None:
+            raise RuleError(f"规则{name}启用了热键动作但没有配置热键")
+        confirm = data.get("confirm", 1)
+        if not isinstance(confirm, int) or isinstance(confirm, bool) or confirm < 1:
+            raise RuleError(f"规则{name}的确认次数必须是正整数")
+        min_dwell = data.get("min_dwell", 0)
+        if not isinstance(min_dwell, (int, float)) or isinstance(min_dwell, bool) or not 0 <= min_dwell <= 60:
+            raise RuleError(f"规则{name}的最短持续时间必须在0-60秒之间")
+        return cls(name, match, pattern, priority, level, actions, hotkeys, confirm, min_dwell, order)
+
+    def to_dict(self):
+        data = {"name": self.name}
+        if self.match != MATCH_NAME:
+            data["match"] = self.match
+        if self.pattern != self.name:
+            data["pattern"] = self.pattern
+        data.update(priority=self.priority, level=self.level,
+                    actions=[action for action in ACTIONS if action in self.actions])
+        if self.hotkeys is not None:
+            data["hotkeys"] = list(self.hotkeys)
+        if self.confirm != 1:
+            data["confirm"] = self.confirm
+        if self.min_dwell:
+            data["min_dwell"] = self.min_dwell
+        return data
+
+    @property
+    def key(self):
+        """名称和路径规则在查找表中的键：小写的映像名"""
+        return ntpath.basename(self.pattern).lower()
+
+    @property
+    def image(self):
+        """按名称结束进程时使用的映像名，taskkill /IM支持*通配符
+
+        路径规则按名称结束会连同其他位置的同名进程一起结束，后代规则没有确定的
+        名称，两者都没有映像名。
+        """
+        if self.match in (MATCH_PATH, MATCH_DESCENDANT):
+            return None
+        if self.match == MATCH_GLOB:
+            return self.pattern.replace("?", "*")
+        return ntpath.basename(self.pattern)
+
+
+class RuleSet:
+    """编译后的规则集
+
+    匹配结果保存在table中（小写进程名 -> 规则名，不匹配为False）：名称与
+    路径规则在编译时直接填入，通配符规则在第一次遇到某个进程名时求值一次并
+    缓存，之后每个进程只是一次字典查找，与规则数量无关。多条规则匹配同一
+    进程时取优先级最高的，优先级相同时取文件中靠前的。
+
+    路径规则按映像名放入查找表，完整路径需要打开进程才能取得，由事件源
+    在每个新PID上确认一次。后代规则不参与按名称匹配，descendant_rules给出
+    祖先规则名 -> 后代规则名，由维护进程树的增量快照在新PID上查找祖先。
+    """
+
+    # 通配符规则的缓存上限，进程名数量异常时清空重建
+    MEMO_LIMIT = 4096
+
+    def __init__(self, rules):
+        self.rules = tuple(sorted(rules, key=lambda rule: (-rule.priority, rule.order)))
+        self.by_name = {}
+        for rule in self.rules:
+            if rule.name in self.by_name:
+                raise RuleError(f"规则名称重复：{rule.name}")
+            self.by_name[rule.name] = rule
+        self.names = tuple(rule.name for rule in self.rules)
+        self._exact = {}
+        for rule in self.rules:
+            if rule.match in (MATCH_NAME, MATCH_PATH):
+                self._exact.setdefault(rule.key, rule)
+        self._globs = tuple((rule, rule.pattern.lower()) for rule in self.rules if rule.match == MATCH_GLOB)
+        self._paths = {rule.name: _normalize_path(rule.pattern)
+                       for rule in self.rules if rule.match == MATCH_PATH}
+        self.descendant_rules = {}
+        for rule in self.rules:
+            if rule.match != MATCH_DESCENDANT:
+                continue
+            ancestor = self.by_name.get(rule.pattern)
+            if ancestor is None or ancestor.match == MATCH_DESCENDANT:
+                raise RuleError(f"规则{rule.name}的祖先必须是另一条非后代规则的名称：{rule.pattern}")
+            if rule.pattern in self.descendant_rules:
+                raise RuleError(f"规则{rule.name}与规则{self.descendant_rules[rule.pattern]}"
+                                f"是同一祖先{rule.pattern}的后代规则，每个祖先只能有一条后代规则")
+            self.descendant_rules[rule.pattern] = rule.name
+        self.watch_only = frozenset(rule.name for rule in self.rules if rule.level == LEVEL_WATCH)
+        self._with_action = {}
+        self.table = self._prefilled()
+
+    @classmethod
+    def from_dicts(cls, items):
+        if not isinstance(items, list) or not items:
+            raise RuleError("规则列表为空")
+        return cls(WatchRule.from_dict(item, order) for order, item in enumerate(items))
+
+    @classmethod
+    def from_names(cls, names):
+        """由进程名列表构造规则集，每个名称一条按名称匹配、不含热键动作的规则"""
+        actions = tuple(action for action in ACTIONS if action != ACTION_HOTKEY)
+        return cls(WatchRule(name, actions=actions, order=order) for order, name in enumerate(names))
+
+    def _prefilled(self):
+        """只含名称与路径规则的新查找表"""
+        return {key: self._evaluate(key) for key in self._exact}
+
+    def classify(self, key):
+        """查找表未命中时的慢路径：按优先级求出匹配的规则并写入查找表
+
+        监控线程与界面线程都可能调用。缓存达到上限时建好新表后整体替换，
+        不清空其他线程可能正在查找的旧表。
+        """
+        result = self._evaluate(key)
+        table = self.table
+        if len(table) >= self.MEMO_LIMIT:
+            table = self._prefilled()
+            self.table = table
+        table[key] = result
+        return result
+
+    def _evaluate(self, key):
+        """按优先级求出匹配的规则名，不匹配时返回False"""
+        best = self._exact.get(key)
+        for rule, pattern in self._globs:
+            if best is not None and (rule.priority, -rule.order) <= (best.priority, -best.order):
+                break
+            if fnmatch.fnmatchcase(key, pattern):
+                best = rule
+                break
+        return best.name if best is not None else False
+
+    def match(self, name):
+        """返回匹配进程名的规则名，不受监控的进程返回None"""
+        if not name:
+            return None
+        key = name.lower()
+        result = self.table.get(key)
+        if result is None:
+            result = self.classify(key)
+        return result or None
+
+    def may_match_prefix(self, prefix):
+        """被截断的小写进程名是否可能匹配某条规则"""
+        return bool(self._globs) or any(key.startswith(prefix) for key in self._exact)
+
+    def path_pattern(self, rule_name):
+        """路径规则的规范化路径，其他规则返回None"""
+        return self._paths.get(rule_name)
+
+    def path_matches(self, rule_name, exe):
+        pattern = self._paths.get(rule_name)
+        if pattern is None:
+            return True
+        return bool(exe) and fnmatch.fnmatchcase(_normalize_path(exe), pattern)
+
+    def get(self, rule_name):
+        return self.by_name.get(rule_name)
+
+    def with_action(self, action, control_only=False):
+        """启用了指定动作的规则名，control_only时只取远程控制级别的规则"""
+        key = (action, control_only)
+        names = self._with_action.get(key)
+        if names is None:
+            names = tuple(rule.name for rule in self.rules
+                          if action in rule.actions and (not control_only or rule.level == LEVEL_CONTROL))
+            self._with_action[key] = names
+        return names
+
+    def active(self, process_states, action, control_only=False):
+        """是否有启用了指定动作的规则对应的进程正在运行"""
+        return any(process_states.get(name, False) for name in self.with_action(action, control_only))
+
+    def effective(self, rule_name, action, control_only=False):
+        """指定规则是否应触发某个动作"""
+        rule = self.by_name.get(rule_name)
+        return (rule is not None and action in rule.actions
+                and (not control_only or rule.level == LEVEL_CONTROL))
+
+    def thresholds(self):
+        """规则名 -> (确认次数, 最短持续秒数)"""
+        return {rule.name: (rule.confirm, rule.min_dwell) for rule in self.rules}
+
+    def images(self):
+        """规则名 -> 按名称结束进程时使用的映像名"""
+        return {rule.name: rule.image for rule in self.rules}
+
+    def to_dicts(self):
+        return [rule.to_dict() for rule in sorted(self.rules, key=lambda rule: rule.order)]
+
+
+def default_rules():
+    return RuleSet.from_dicts(DEFAULT_RULES)
+
+
+def load_rules(path):
+    """读取规则文件，文件不存在时写入默认规则；格式错误时抛出RuleError"""
+    if not os.path.exists(path):
+        rules = default_rules()
+        try:
+            write_text_atomic(path, json.dumps({"version": RULES_VERSION, "rules": rules.to_dicts()},
+                                               indent=2, ensure_ascii=False))
+        except OSError:
+            pass
+        return rules
+    with open(path, 'r', encoding='utf-8') as f:
+        try:
+            data = json.load(f)
+        except ValueError as e:
+            raise RuleError(f"规则文件不是有效的JSON：{e}") from e
+    if not isinstance(data, dict):
+        raise RuleError("规则文件格式错误")
+    return RuleSet.from_dicts(data.get("rules"))
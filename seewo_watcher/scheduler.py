@@ -0,0 +1,83 @@
+import time
+from collections import deque
+
+
+def parse_hot_hours(text):
+    """解析"8-12,14-17"形式的重点时段，返回[(开始小时, 结束小时)]，结束小时不含
+
+    开始大于结束表示跨越午夜，例如"22-6"。
+    """
+    ranges = []
+    for part in (text or "").replace("，", ",").split(","):
+        part = part.strip()
+        if not part:
+            continue
+        start, sep, end = part.partition("-")
+        if not sep:
+            raise ValueError(f"无效的时段: {part}")
+        start, end = int(start), int(end)
+        if not (0 <= start <= 23 and 0 <= end <= 24) or start == end:
+            raise ValueError(f"无效的时段: {part}")
+        ranges.append((start, end))
+    return ranges
+
+
+class AdaptiveScheduler:
+    """自适应轮询间隔：无变化时逐步退避，状态变化后进入一段时间的快速模式
+
+    重点时段内始终使用最小间隔。
+    """
+
+    # 重点时段判断按分钟缓存，避免每次tick都调用localtime
+    HOT_HOURS_RECHECK = 60.0
+
+    def __init__(self, min_interval, max_interval, burst_duration=30.0, hot_hours=(),
+                 backoff=1.5, clock=time.monotonic, localtime=time.localtime):
+        self.clock = clock
+        self.localtime = localtime
+        self.backoff = backoff
+        self.configure(min_interval, max_interval, burst_duration, hot_hours)
+        self.interval = self.min_interval
+        self._burst_until = 0.0
+        self._hot = False
+        self._hot_checked_at = None
+        self._ticks = deque(maxlen=64)
+
+    def configure(self, min_interval, max_interval, burst_duration, hot_hours):
+        """更新调度参数，设置修改后立即生效"""
+        self.min_interval = min_interval
+        self.max_interval = max(min_interval, max_interval)
+        self.burst_duration = burst_duration
+        self.hot_hours = tuple(hot_hours)
+        self._hot_checked_at = None
+        self.interval = min_interval
+
+    def in_hot_hours(self, now):
+        if not self.hot_hours:
+            return False
+        if self._hot_checked_at is None or now - self._hot_checked_at >= self.HOT_HOURS_RECHECK:
+            hour = self.localtime().tm_hour
+            self._hot = any(start <= hour < end if start < end else (hour >= start or hour < end)
+                            for start, end in self.hot_hours)
+            self._hot_checked_at = now
+        return self._hot
+
+    def next_interval(self, changed):
+        """记录一次tick并返回下一次等待的时长"""
+        now = self.clock()
+        self._ticks.append(now)
+        if changed:
+            self._burst_until = now + self.burst_duration
+            self.interval = self.min_interval
+        elif now < self._burst_until or self.in_hot_hours(now):
+            self.interval = self.min_interval
+        else:
+            self.interval = min(self.interval * self.backoff, self.max_interval)
+        return self.interval
+
+    def tick_rate(self):
+        """最近若干次tick的实际频率(次/秒)"""
+        if len(self._ticks) < 2:
+            return 0.0
+        span = self._ticks[-1] - self._ticks[0]
+        return (len(self._ticks) - 1) / span if span > 0 else 0.0
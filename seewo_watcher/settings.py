@@ -0,0 +1,128 @@
+from dataclasses import asdict, dataclass, field, fields, replace
+
+from .scheduler import parse_hot_hours
+
+# ================= 设置模型 =================
+SETTINGS_VERSION = 2
+DEFAULT_CHECK_INTERVAL = 0.05
+DEFAULT_MAX_CHECK_INTERVAL = 1.0
+DEFAULT_BURST_DURATION = 30
+
+
+def _ranged(default, low, high, label, unit="秒"):
+    return field(default=default, metadata={"range": (low, high), "label": label, "unit": unit})
+
+
+@dataclass(frozen=True, slots=True)
+class WatcherSettings:
+    """程序设置：默认值、取值范围和版本迁移都定义在这里
+
+    实例不可变，修改设置时生成新实例整体替换，监控线程每次tick只读取
+    一次引用，即使界面中途修改设置也能看到一致的快照。
+    """
+
+    auto_start: bool = False
+    show_alert: bool = False
+    alert_on_top: bool = False
+    enable_hotkey: bool = False
+    enable_sleep: bool = False
+    auto_pause: bool = False
+    auto_mute: bool = False
+    auto_kill: bool = False
+    check_interval: float = _ranged(DEFAULT_CHECK_INTERVAL, 0.02, 10, "监测间隔")
+    max_check_interval: float = _ranged(DEFAULT_MAX_CHECK_INTERVAL, 0.02, 10, "最大监测间隔")
+    burst_duration: float = _ranged(DEFAULT_BURST_DURATION, 0, 600, "快速监测时长")
+    hot_hours: str = ""
+    alert_duration: int = _ranged(1, 1, 30, "弹窗显示时间")
+    only_rtc_effective: bool = False
+    tray_max_refresh_hz: float = _ranged(10, 1, 60, "托盘最高刷新频率", "次/秒")
+    # 本机指标端点的端口，0表示关闭
+    metrics_port: int = _ranged(0, 0, 65535, "指标端口", "")
+
+    @classmethod
+    def from_dict(cls, data):
+        """从settings.json的内容构造，兼容旧版本：缺失的项使用默认值，越界的值被限制到范围内"""
+        data = migrate(dict(data))
+        values = {}
+        for f in fields(cls):
+            if f.name not in data:
+                continue
+            try:
+                value = _coerce(f.type, data[f.name])
+            except (TypeError, ValueError):
+                continue
+            if "range" in f.metadata:
+                low, high = f.metadata["range"]
+                value = max(low, min(high, value))
+            values[f.name] = value
+        settings = cls(**values)
+        try:
+            parse_hot_hours(settings.hot_hours)
+        except ValueError:
+            settings = replace(settings, hot_hours="")
+        if settings.max_check_interval < settings.check_interval:
+            settings = replace(settings, max_check_interval=settings.check_interval)
+        return settings
+
+    def to_dict(self):
+        data = asdict(self)
+        data["settings_version"] = SETTINGS_VERSION
+        return data
+
+    def replace(self, **changes):
+        """返回修改后的新设置，取值非法时抛出ValueError"""
+        updated = replace(self, **changes)
+        updated.validate()
+        return updated
+
+    def validate(self):
+        for f in fields(self):
+            if "range" in f.metadata:
+                low, high = f.metadata["range"]
+                value = getattr(self, f.name)
+                if not low <= value <= high:
+                    unit = f.metadata["unit"]
+                    raise ValueError(f"{f.metadata['label']}必须在{low}{unit}到{high}{unit}之间")
+        if self.max_check_interval < self.check_interval:
+            raise ValueError("最大监测间隔不能小于监测间隔")
+        try:
+            parse_hot_hours(self.hot_hours)
+        except ValueError:
+            raise ValueError("重点时段格式错误，示例：8-12,14-17")
+
+
+def _coerce(kind, value):
+    if kind is bool or kind == "bool":
+        if isinstance(value, str):
+            return value.strip().lower() in ("1", "true", "yes")
+        return bool(value)
+    if kind is float or kind == "float":
+        return float(value)
+    if kind is int or kind == "int":
+        return int(value)
+    return str(value)
+
+
+def _migrate_v1(data):
+    """v1（无版本号）没有自适应调度：保留用户调大的监测间隔，避免退避上限比原来还短"""
+    if "max_check_interval" not in data and "check_interval" in data:
+        try:
+            data["max_check_interval"] = max(DEFAULT_MAX_CHECK_INTERVAL, float(data["check_interval"]))
+        except (TypeError, ValueError):
+            pass
+    return data
+
+
+# 版本号 -> 升级到下一版本的函数
+MIGRATIONS = {
+    1: _migrate_v1,
+}
+
+
+def migrate(data):
+    """把旧版本的设置逐级升级到当前版本"""
+    version = data.pop("settings_version", 1)
+    while version < SETTINGS_VERSION:
+        data = MIGRATIONS[version](data)
+        version += 1
+    return data
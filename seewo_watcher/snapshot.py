@@ -0,0 +1,356 @@
+import time
+from array import array
+from bisect import bisect_left
+
+from .enumerators import default_enumerator
+from .process_tree import ProcessTree
+
+
+def iter_processes():
+    """通过默认的进程枚举后端遍历进程表，产出(pid, 进程名)"""
+    return default_enumerator().iter_processes()
+
+
+class ProcessSnapshot:
+    """一次遍历进程表得到的快照，按规则名索引被监控进程的PID"""
+
+    __slots__ = ("index", "process_count", "timestamp")
+
+    def __init__(self, index, process_count, timestamp):
+        self.index = index
+        self.process_count = process_count
+        self.timestamp = timestamp
+
+    @classmethod
+    def capture(cls, rules, processes=None, timestamp=None):
+        """遍历一次进程表，rules为编译后的规则集，timestamp默认为当前单调时钟
+
+        每个进程只做一次lower()和一次查找表查找，开销与进程数成正比，
+        与规则的数量无关。
+        """
+        if processes is None:
+            processes = iter_processes()
+        table = rules.table
+        classify = rules.classify
+        index = {}
+        count = 0
+        for pid, name in processes:
+            count += 1
+            if not name:
+                continue
+            key = name.lower()
+            rule = table.get(key)
+            if rule is None:
+                rule = classify(key)
+            if rule:
+                pids = index.get(rule)
+                if pids is None:
+                    index[rule] = {pid}
+                else:
+                    pids.add(pid)
+        return cls(index, count, time.monotonic() if timestamp is None else timestamp)
+
+    def pids(self, name):
+        """返回指定规则的PID集合"""
+        return self.index.get(name, frozenset())
+
+    def __contains__(self, name):
+        return name in self.index
+
+
+def list_pids():
+    """通过默认的进程枚举后端按升序列出当前所有PID，不查询任何进程属性"""
+    return default_enumerator().list_pids()
+
+
+def resolve_process(pid):
+    """查询单个进程的(进程名, 创建时间, 父pid)，进程已退出或无权访问时返回None"""
+    return default_enumerator().resolve(pid)
+
+
+class NameTable:
+    """进程名驻留表：每个不同的进程名只保存一次，以小整数id引用
+
+    每个id匹配的规则在驻留时求出一次，之后按id查列表即可，不再做lower()
+    或字典查找。id 0固定表示无法解析名称的进程。
+    """
+
+    def __init__(self, rules):
+        self.rules = rules
+        self.ids = {"": 0}
+        self.names = [""]
+        # id -> 规则名或False
+        self.matches = [False]
+
+    def __len__(self):
+        return len(self.names)
+
+    def intern(self, name):
+        name_id = self.ids.get(name)
+        if name_id is None:
+            name_id = len(self.names)
+            self.ids[name] = name_id
+            self.names.append(name)
+            self.matches.append(self.rules.match(name) or False)
+        return name_id
+
+
+class CompactSnapshot:
+    """紧凑的进程表快照：PID升序存放在array('I')中，进程名以驻留表id存放在
+    并行的array('I')中，创建时间存放在并行的array('d')中
+
+    整张进程表只占三块连续缓冲区，不为每个进程创建任何对象。
+    """
+
+    __slots__ = ("pids", "name_ids", "create_times", "names", "timestamp")
+
+    def __init__(self, pids, name_ids, create_times, names, timestamp):
+        self.pids = pids
+        self.name_ids = name_ids
+        self.create_times = create_times
+        self.names = names
+        self.timestamp = timestamp
+
+    def __len__(self):
+        return len(self.pids)
+
+    def find(self, pid):
+        """二分查找PID的下标，不存在时返回-1"""
+        index = bisect_left(self.pids, pid)
+        if index < len(self.pids) and self.pids[index] == pid:
+            return index
+        return -1
+
+    def name(self, index):
+        return self.names.names[self.name_ids[index]]
+
+    def index(self):
+        """按规则名索引被监控进程的PID，格式与ProcessSnapshot.index一致"""
+        matches = self.names.matches
+        index = {}
+        for pid, name_id in zip(self.pids, self.name_ids):
+            rule = matches[name_id]
+            if rule:
+                index.setdefault(rule, set()).add(pid)
+        return index
+
+
+def _changed_pids(current, previous):
+    """两个升序PID数组的对称差，按升序返回
+
+    按归并的方式比较，但相同的连续区间不逐个比较：先用一次切片比较判断剩余
+    部分是否整段相同，不同时二分找出相同区间的长度。变化很少时只需要少量
+    在C中完成的数组比较，不为每个PID创建整数对象。
+    """
+    changed = []
+    i = j = 0
+    n, m = len(current), len(previous)
+    while i < n and j < m:
+        a, b = current[i], previous[j]
+        if a < b:
+            changed.append(a)
+            i += 1
+        elif a > b:
+            changed.append(b)
+            j += 1
+        else:
+            lo, hi = 1, min(n - i, m - j)
+            if current[i:i + hi] == previous[j:j + hi]:
+                lo = hi
+            while hi - lo > 1:
+                mid = (lo + hi) // 2
+                if current[i:i + mid] == previous[j:j + mid]:
+                    lo = mid
+                else:
+                    hi = mid
+            i += lo
+            j += lo
+    changed.extend(current[i:])
+    changed.extend(previous[j:])
+    return changed
+
+
+class IncrementalSnapshot:
+    """增量进程快照：与上一次的紧凑快照比较，只为新出现的PID解析进程名
+
+    PID列表与上次完全相同时（稳定状态下的大多数tick），比较只是一次数组的
+    内存比较，不做任何逐进程的工作；有变化时按升序归并找出新出现和消失的PID，
+    已有PID的名称id与创建时间整块沿用，只查询新PID。
+    PID在两次更新之间被复用时比较看不出变化，因此每隔resync_interval秒
+    重新解析全部PID一次，按创建时间识别复用，同时重建名称驻留表。
+    list_pids须按升序返回PID。
+
+    同一份变化同时用于维护进程树tree：后代规则匹配的进程在启动时沿树向上
+    查找一次祖先，之后保存在inherited中，祖先先退出也不影响其匹配。
+    """
+
+    def __init__(self, rules, list_pids=None, resolve=None,
+                 resync_interval=30.0, clock=time.monotonic):
+        self.rules = rules
+        if list_pids is None or resolve is None:
+            enumerator = default_enumerator()
+            list_pids = list_pids or enumerator.list_pids
+            resolve = resolve or enumerator.resolve
+        self.list_pids = list_pids
+        self.resolve = resolve
+        self.resync_interval = resync_interval
+        self.clock = clock
+        self.snapshot = None
+        self.tree = ProcessTree()
+        # 通过后代规则匹配的pid -> 规则名
+        self.inherited = {}
+        self.process_count = 0
+        self.resolved = 0
+        self._resync_at = None
+
+    def update(self):
+        """列出一次PID并与上次比较，返回(新出现的[(规则名, pid)], 消失的[(规则名, pid)])"""
+        now = self.clock()
+        pids = array('I', self.list_pids())
+        previous = self.snapshot
+        self.process_count = len(pids)
+        if self._resync_at is None or now >= self._resync_at:
+            self._resync_at = now + self.resync_interval
+            return self._resync(pids, now)
+        if pids == previous.pids:
+            self.resolved = 0
+            previous.timestamp = now
+            return [], []
+        # 在上次数组的副本上原地删除消失的PID、插入新PID，变化的PID很少时
+        # 每次操作只是一次二分查找和一次内存移动
+        changed = _changed_pids(pids, previous.pids)
+        work_pids = array('I', previous.pids)
+        name_ids = array('I', previous.name_ids)
+        create_times = array('d', previous.create_times)
+        names = previous.names
+        matches = names.matches
+        tree = self.tree
+        inherited = self.inherited
+        new = []
+        started = []
+        exited = []
+        for pid in changed:
+            i = bisect_left(work_pids, pid)
+            if i < len(work_pids) and work_pids[i] == pid:
+                rule = matches[name_ids[i]] or inherited.pop(pid, False)
+                if rule:
+                    exited.append((rule, pid))
+                del work_pids[i]
+                del name_ids[i]
+                del create_times[i]
+                tree.remove(pid)
+                continue
+            info = self.resolve(pid)
+            name_id, create_time, ppid = (names.intern(info[0]), info[1], info[2]) if info is not None else (0, 0.0, 0)
+            work_pids.insert(i, pid)
+            name_ids.insert(i, name_id)
+            create_times.insert(i, create_time)
+            new.append((create_time, pid, ppid, name_id))
+        # 按创建时间先后加入进程树，同一批中的父进程先于子进程处理
+        new.sort()
+        for create_time, pid, ppid, name_id in new:
+            tree.add(pid, ppid, create_time)
+            rule = matches[name_id]
+            if not rule:
+                rule = self._inherit(pid, work_pids, name_ids, matches)
+                if not rule:
+                    continue
+                inherited[pid] = rule
+            started.append((rule, pid))
+        self.snapshot = CompactSnapshot(work_pids, name_ids, create_times, names, now)
+        self.resolved = len(new)
+        return started, exited
+
+    def _inherit(self, pid, pids, name_ids, matches):
+        """沿进程树向上查找，最近的祖先匹配了某条后代规则所指的规则（或本身
+        已通过后代规则匹配）时返回该后代规则名，否则返回False"""
+        descendant_rules = self.rules.descendant_rules
+        if not descendant_rules:
+            return False
+        inherited = self.inherited
+        for ancestor in self.tree.ancestors(pid):
+            rule = inherited.get(ancestor)
+            if rule:
+                return rule
+            i = bisect_left(pids, ancestor)
+            if i < len(pids) and pids[i] == ancestor:
+                rule = descendant_rules.get(matches[name_ids[i]])
+                if rule:
+                    return rule
+        return False
+
+    def _resync(self, pids, now):
+        """重新解析全部PID并重建名称驻留表与进程树，按规则与创建时间识别PID复用"""
+        previous = self.snapshot
+        if previous is None:
+            old_ids, old_times, old_names = {}, {}, None
+        else:
+            old_ids = dict(zip(previous.pids, previous.name_ids))
+            old_times = dict(zip(previous.pids, previous.create_times))
+            old_names = previous.names
+        tree = self.tree
+        old_parents = dict(tree.parents)
+        old_inherited = self.inherited
+        inherited = self.inherited = {}
+        tree.clear()
+        names = NameTable(self.rules)
+        matches = names.matches
+        name_ids = array('I', bytes(4 * len(pids)))
+        create_times = array('d', bytes(8 * len(pids)))
+        entries = []
+        for i, pid in enumerate(pids):
+            info = self.resolve(pid)
+            ppid = 0
+            if info is not None:
+                name_ids[i] = names.intern(info[0])
+                create_times[i] = info[1]
+                ppid = info[2]
+            elif pid in old_ids:
+                # 暂时无法查询的已有PID沿用上次的结果
+                name_ids[i] = names.intern(old_names.names[old_ids[pid]])
+                create_times[i] = old_times[pid]
+                ppid = old_parents.get(pid, 0)
+            entries.append((create_times[i], pid, ppid, i))
+        entries.sort()
+        started = []
+        exited = []
+        for create_time, pid, ppid, i in entries:
+            tree.add(pid, ppid, create_time)
+            old_id = old_ids.get(pid)
+            same = old_id is not None and old_times[pid] == create_time
+            rule = matches[name_ids[i]]
+            if not rule:
+                # 祖先已退出的进程找不到匹配的祖先，同一进程沿用上次的继承结果
+                rule = (self._inherit(pid, pids, name_ids, matches)
+                        or (same and old_inherited.get(pid)) or False)
+                if rule:
+                    inherited[pid] = rule
+            if old_id is None:
+                if rule:
+                    started.append((rule, pid))
+                continue
+            old_rule = old_names.matches[old_id] or old_inherited.get(pid, False)
+            if old_rule != rule or not same:
+                if old_rule:
+                    exited.append((old_rule, pid))
+                if rule:
+                    started.append((rule, pid))
+        for pid in old_ids.keys() - set(pids):
+            rule = old_names.matches[old_ids[pid]] or old_inherited.get(pid, False)
+            if rule:
+                exited.append((rule, pid))
+        self.snapshot = CompactSnapshot(pids, name_ids, create_times, names, now)
+        self.resolved = len(pids)
+        return started, exited
+
+    def name_of(self, pid):
+        """最近一次快照中pid的进程名，不存在时返回None"""
+        snapshot = self.snapshot
+        if snapshot is None:
+            return None
+        i = snapshot.find(pid)
+        return snapshot.name(i) if i >= 0 else None
+
+    def subtree(self, pid):
+        """pid的全部后代[(pid, 进程名)]，只访问子树中的节点"""
+        return [(child, self.name_of(child)) for child in self.tree.descendants(pid)]
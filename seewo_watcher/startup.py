@@ -0,0 +1,69 @@
+import threading
+import time
+from contextlib import contextmanager
+
+# ================= 启动耗时 =================
+
+
+class StartupProfile:
+    """记录启动各阶段的耗时，互不依赖的阶段可以放到后台线程并行执行
+
+    所有时间都是相对launched_at（启动脚本开始执行的时刻）的偏移。
+    """
+
+    def __init__(self, launched_at=None, clock=time.perf_counter):
+        self.clock = clock
+        self.launched_at = clock() if launched_at is None else launched_at
+        # 阶段名 -> (开始偏移, 耗时)
+        self.phases = {}
+        # 里程碑名 -> 偏移
+        self.marks = {}
+        self._threads = {}
+        self._results = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def phase(self, name):
+        """在当前线程中计时一个阶段"""
+        start = self.clock()
+        try:
+            yield
+        finally:
+            self._record(name, start)
+
+    def start(self, name, func, *args):
+        """在后台线程中执行一个阶段，之后通过join取得结果"""
+        def run():
+            start = self.clock()
+            try:
+                self._results[name] = (True, func(*args))
+            except BaseException as e:
+                self._results[name] = (False, e)
+            finally:
+                self._record(name, start)
+        thread = threading.Thread(target=run, name=f"Startup-{name}", daemon=True)
+        self._threads[name] = thread
+        thread.start()
+
+    def join(self, name):
+        """等待后台阶段结束并返回其结果，阶段中抛出的异常在这里重新抛出"""
+        self._threads[name].join()
+        ok, value = self._results[name]
+        if not ok:
+            raise value
+        return value
+
+    def mark(self, name):
+        """记录里程碑距启动的时间，只记录第一次"""
+        with self._lock:
+            self.marks.setdefault(name, self.clock() - self.launched_at)
+
+    def summary(self):
+        """按开始时间排序的[(阶段名, 开始偏移, 耗时)]"""
+        with self._lock:
+            items = [(name, start, duration) for name, (start, duration) in self.phases.items()]
+        return sorted(items, key=lambda item: item[1])
+
+    def _record(self, name, start):
+        with self._lock:
+            self.phases[name] = (start - self.launched_at, self.clock() - start)
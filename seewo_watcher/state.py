@@ -0,0 +1,99 @@
+import time
+
+from .process_events import PROCESS_START, PROCESS_EXIT
+
+
+class ProcessStateMachine:
+    """根据进程事件维护每个被监控进程的PID集合与运行状态
+
+    thresholds为{进程名: (确认次数, 最短持续秒数)}，未给出的进程立即提交。
+    PID集合变化后得到的原始状态与已提交状态不同时，需要在连续confirm次
+    观察中都保持不同，且距第一次不同已过去min_dwell秒，才提交为状态变化；
+    在此之前恢复原状的变化视为抖动，计入suppressed，不产生状态变化。
+    一次观察是一次真实的扫描结果或一批事件，只为等待持续时间而醒来的
+    apply不计入确认次数。
+    """
+
+    def __init__(self, process_names, thresholds=None, clock=time.monotonic):
+        self.clock = clock
+        self.thresholds = {name: threshold for name, threshold in (thresholds or {}).items()
+                           if threshold != (1, 0)}
+        self.process_states = {name: False for name in process_names}
+        self.process_cache = {name: set() for name in process_names}
+        # 最近一次启动事件的时间戳，用于计算检测到处理的延迟
+        self.detected_at = {name: None for name in process_names}
+        # 最近一次导致状态变化（启动或退出）的事件时间戳，用于计算检测到动作的延迟
+        self.changed_at = {name: None for name in process_names}
+        # 被过滤掉的抖动次数
+        self.suppressed = {name: 0 for name in process_names}
+        # 等待确认的变化：进程名 -> [第一次不同的时间戳, 已观察次数]
+        self.pending = {}
+        self._event_at = {name: None for name in process_names}
+
+    def apply(self, events, observed=True, recheck=()):
+        """应用一批事件，返回状态发生变化的(进程名, 是否运行)列表
+
+        有等待确认的变化时，即使没有新事件也应调用；observed表示这次调用
+        是否对应一次真实的观察（扫描或事件），只有真实观察才增加确认次数。
+        recheck中的进程即使没有事件也按PID缓存重新判断，其PID已经确认过，
+        状态变化不再等待确认。
+        """
+        touched = []
+        for event in events:
+            pids = self.process_cache.get(event.name)
+            if pids is None:
+                continue
+            if event.kind == PROCESS_START:
+                pids.add(event.pid)
+                if not self.process_states[event.name]:
+                    self.detected_at[event.name] = event.timestamp
+            elif event.kind == PROCESS_EXIT:
+                pids.discard(event.pid)
+            self._event_at[event.name] = event.timestamp
+            if event.name not in touched:
+                touched.append(event.name)
+        for name in self.pending:
+            if name not in touched:
+                touched.append(name)
+        for name in recheck:
+            if name in self.process_cache and name not in touched:
+                touched.append(name)
+        state_changes = []
+        for name in touched:
+            running = bool(self.process_cache[name])
+            if running == self.process_states[name]:
+                if self.pending.pop(name, None) is not None:
+                    self.suppressed[name] += 1
+                continue
+            threshold = self.thresholds.get(name)
+            if threshold is not None and name not in recheck and not self._confirmed(name, threshold, observed):
+                continue
+            since = self.pending.pop(name, (self._event_at[name],))[0]
+            self.process_states[name] = running
+            self.changed_at[name] = since
+            state_changes.append((name, running))
+        return state_changes
+
+    def _confirmed(self, name, threshold, observed=True):
+        """记录一次观察，返回变化是否已满足确认次数与持续时间"""
+        confirm, min_dwell = threshold
+        pending = self.pending.get(name)
+        if pending is None:
+            pending = self.pending[name] = [self._event_at[name], 0]
+        if observed:
+            pending[1] += 1
+        return pending[1] >= confirm and self.clock() - pending[0] >= min_dwell
+
+    def next_deadline(self):
+        """最早一个等待中的变化满足持续时间的时刻，没有时返回None"""
+        deadlines = [since + self.thresholds[name][1] for name, (since, _) in self.pending.items()]
+        return min(deadlines) if deadlines else None
+
+    def any_running(self):
+        return any(self.process_states.values())
+
+    def reset_pids(self):
+        """切换事件源前清空PID缓存，运行状态保留到新事件源重新报告"""
+        for pids in self.process_cache.values():
+            pids.clear()
+        self.pending.clear()
@@ -0,0 +1,195 @@
+import os
+import subprocess
+import time
+from collections import deque, namedtuple
+
+# ================= 进程终止 =================
+TERMINATED = "terminated"
+ALREADY_GONE = "gone"
+ACCESS_DENIED = "denied"
+TIMED_OUT = "timeout"
+FALLBACK_OK = "fallback_ok"
+FALLBACK_FAILED = "fallback_failed"
+
+SUCCESS_STATUSES = frozenset((TERMINATED, ALREADY_GONE, FALLBACK_OK))
+
+# 不同来源取得的创建时间换算为浮点数后可能有微小差异
+CREATE_TIME_TOLERANCE = 0.001
+
+TerminationResult = namedtuple("TerminationResult", ["pid", "name", "status", "elapsed"])
+
+
+def terminate_processes_direct(process_names=(), pids=()):
+    """直接以管理员权限结束进程：process_names按映像名结束，pids按PID结束，都连同子进程
+
+    全部目标都结束成功时返回True。
+    """
+    targets = [(['/IM', name], f'Get-Process -Name "{name.replace(".exe", "")}" -ErrorAction SilentlyContinue', name)
+               for name in process_names]
+    targets += [(['/PID', str(pid)], f'Get-Process -Id {pid} -ErrorAction SilentlyContinue', pid)
+                for pid in pids]
+    success_count = 0
+    for taskkill_args, get_process, target in targets:
+        try:
+            # 使用CREATE_NO_WINDOW标志隐藏窗口
+            result = subprocess.run(
+                ['taskkill', '/F', *taskkill_args, '/T'],
+                capture_output=True,
+                text=True,
+                timeout=10,
+                creationflags=subprocess.CREATE_NO_WINDOW if os.name == 'nt' else 0
+            )
+            if result.returncode == 0 or "成功" in result.stdout:
+                success_count += 1
+            else:
+                ps_command = f'''
+                $process = {get_process}
+                if ($process) {{
+                    Stop-Process -Id $process.Id -Force
+                    Write-Host "成功结束进程: {target}"
+                }} else {{
+                    Write-Host "未找到进程: {target}"
+                }}
+                '''
+                # PowerShell命令也使用CREATE_NO_WINDOW标志隐藏窗口
+                result = subprocess.run(
+                    ['powershell', '-Command', ps_command],
+                    capture_output=True,
+                    text=True,
+                    timeout=15,
+                    creationflags=subprocess.CREATE_NO_WINDOW if os.name == 'nt' else 0
+                )
+                if result.returncode == 0:
+                    success_count += 1
+        except Exception:
+            pass
+    return bool(targets) and success_count == len(targets)
+
+
+def same_process(proc, create_time):
+    """psutil.Process是否仍是创建时间为create_time的进程，create_time为None时无法确认，视为相同"""
+    if create_time is None:
+        return True
+    return abs(proc.create_time() - create_time) < CREATE_TIME_TOLERANCE
+
+
+class TerminationEngine:
+    """在进程内直接结束已知PID的进程，失败时回退到taskkill/PowerShell
+
+    每次调用可以同时处理多个进程名，返回每个PID的结构化结果，并记录
+    从检测到进程启动到进程被结束的延迟。
+    """
+
+    def __init__(self, timeout=2.0, fallback=terminate_processes_direct, history=100):
+        self.timeout = timeout
+        self.fallback = fallback
+        self.latencies = deque(maxlen=history)
+        self.last_results = []
+
+    def terminate(self, targets, detected_at=None, images=None, tree=None):
+        """结束进程，targets为{进程名: {PID: 创建时间}}，detected_at为{进程名: 检测时间戳}
+
+        结束前按创建时间确认PID仍是当初检测到的进程，已被其他进程复用的PID
+        视为原进程已退出，不会被结束；创建时间为None时无法确认，直接结束。
+
+        images为{进程名: 映像名}，没有已知PID的进程回退按名称结束时使用，未给出时
+        直接使用进程名，映像名为None的进程无法按名称结束。tree为反映最近一次扫描的进程树，
+        从中取得子进程并同样按树中记录的创建时间确认，创建时间不符的子进程
+        视为已退出；未给出时通过psutil查找子进程，需要遍历整个进程表。
+        """
+        import psutil
+        started = time.monotonic()
+        results = []
+        pending = {}
+        # 没有已知PID时只能按名称结束
+        fallback_names = [name for name, pids in targets.items() if not pids]
+        for name, pids in targets.items():
+            for pid, create_time in pids.items():
+                try:
+                    proc = psutil.Process(pid)
+                    if not same_process(proc, create_time):
+                        results.append(TerminationResult(pid, name, ALREADY_GONE, time.monotonic() - started))
+                        continue
+                    # 与taskkill /T一致，连同子进程一起结束
+                    if tree is None:
+                        for child in proc.children(recursive=True):
+                            try:
+                                child.kill()
+                            except psutil.Error:
+                                pass
+                    else:
+                        created = tree.created
+                        for child_pid in tree.descendants(pid):
+                            try:
+                                child = psutil.Process(child_pid)
+                                if not same_process(child, created.get(child_pid)):
+                                    results.append(TerminationResult(child_pid, name, ALREADY_GONE,
+                                                                     time.monotonic() - started))
+                                    continue
+                                child.kill()
+                            except psutil.Error:
+                                pass
+                    proc.kill()
+                    pending[proc] = name
+                except psutil.NoSuchProcess:
+                    results.append(TerminationResult(pid, name, ALREADY_GONE, time.monotonic() - started))
+                except psutil.AccessDenied:
+                    results.append(TerminationResult(pid, name, ACCESS_DENIED, time.monotonic() - started))
+        if pending:
+            gone, alive = psutil.wait_procs(list(pending), timeout=self.timeout)
+            finished = time.monotonic() - started
+            for proc in gone:
+                results.append(TerminationResult(proc.pid, pending[proc], TERMINATED, finished))
+            for proc in alive:
+                results.append(TerminationResult(proc.pid, pending[proc], TIMED_OUT, finished))
+        if self.fallback is not None:
+            results = self._fall_back(results, fallback_names, images, started)
+        self._record_latency(results, detected_at)
+        self.last_results = results
+        return results
+
+    def _fall_back(self, results, fallback_names, images, started):
+        """用taskkill结束psutil无法结束的进程
+
+        已知PID的进程只按这些PID结束（创建时间已在前面确认过），不按映像名
+        结束同名的其他进程；没有已知PID的进程按映像名结束，路径规则与后代
+        规则没有映像名，无法回退。
+        """
+        failed = {}
+        kept = []
+        for result in results:
+            if result.status in (ACCESS_DENIED, TIMED_OUT):
+                failed.setdefault(result.name, []).append(result.pid)
+            else:
+                kept.append(result)
+        for name, pids in failed.items():
+            status = FALLBACK_OK if self.fallback(pids=pids) else FALLBACK_FAILED
+            finished = time.monotonic() - started
+            kept.extend(TerminationResult(pid, name, status, finished) for pid in pids)
+        for name in fallback_names:
+            image = images.get(name, name) if images else name
+            fallback_ok = image is not None and self.fallback([image])
+            kept.append(TerminationResult(None, name, FALLBACK_OK if fallback_ok else FALLBACK_FAILED,
+                                          time.monotonic() - started))
+        return kept
+
+    def _record_latency(self, results, detected_at):
+        if not detected_at:
+            return
+        now = time.monotonic()
+        for name in {result.name for result in results if result.status in SUCCESS_STATUSES}:
+            if detected_at.get(name) is not None:
+                self.latencies.append(now - detected_at[name])
+
+    def latency_summary(self):
+        """返回(次数, 最近一次, 平均, 最大)检测到结束的延迟(秒)，没有记录时返回None"""
+        if not self.latencies:
+            return None
+        values = list(self.latencies)
+        return len(values), values[-1], sum(values) / len(values), max(values)
+
+
+def succeeded(results, name=None):
+    """判断结束进程是否全部成功，可只检查指定进程名"""
+    relevant = [result for result in results if name is None or result.name == name]
+    return bool(relevant) and all(result.status in SUCCESS_STATUSES for result in relevant)
@@ -0,0 +1,107 @@
+import threading
+import time
+
+# ================= 托盘刷新 =================
+
+
+def menu_state(settings):
+    """把菜单文字依赖的设置编码为一个小整数"""
+    return ((1 if settings.auto_start else 0)
+            | (2 if settings.show_alert else 0)
+            | (4 if settings.enable_hotkey else 0)
+            | (8 if settings.enable_sleep else 0)
+            | (16 if settings.auto_pause else 0)
+            | (32 if settings.auto_kill else 0))
+
+
+class TrayRefresher:
+    """托盘刷新节流：只推送与上次不同的图标/菜单，并限制最高刷新频率
+
+    频率受限时请求不会丢失：最后一次请求总会在间隔结束后推送出去。
+    已推送状态的比较、记录与推送本身都在同一把锁内进行，判断"与已推送的
+    相同"时不会有推送正在进行。
+    """
+
+    def __init__(self, push_icon, push_menu, max_rate=10.0, clock=time.monotonic):
+        self.push_icon = push_icon
+        self.push_menu = push_menu
+        self.clock = clock
+        self.min_gap = 1.0 / max_rate
+        self.requests = 0
+        self.pushed = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self._pushed_icon = None
+        self._pushed_menu = None
+        self._wanted = None
+        self._last_push = None
+        self._flush_pending = False
+        self._condition = threading.Condition()
+        self._thread = None
+
+    def set_max_rate(self, max_rate):
+        self.min_gap = 1.0 / max_rate
+
+    def request(self, icon_key, menu_key):
+        """请求刷新托盘，可从任意线程调用，只在其他线程正在推送时等待其完成"""
+        with self._condition:
+            self.requests += 1
+            if self._flush_pending:
+                # 已有待推送的刷新，只更新目标状态
+                self._wanted = (icon_key, menu_key)
+                self.coalesced += 1
+                return
+            if icon_key == self._pushed_icon and menu_key == self._pushed_menu:
+                self.dropped += 1
+                return
+            self._wanted = (icon_key, menu_key)
+            now = self.clock()
+            if self._last_push is None or now - self._last_push >= self.min_gap:
+                wanted, self._wanted = self._wanted, None
+                self._last_push = now
+                self._push(*wanted)
+            else:
+                # 超出频率上限，交给后台线程在间隔结束后推送最新状态
+                self._flush_pending = True
+                self._ensure_thread()
+                self._condition.notify()
+
+    def flush(self):
+        """立即推送尚未推送的状态"""
+        with self._condition:
+            wanted, self._wanted = self._wanted, None
+            self._flush_pending = False
+            self._last_push = self.clock()
+            if wanted is not None:
+                self._push(*wanted)
+
+    def _ensure_thread(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="TrayRefreshThread", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._flush_pending:
+                    self._condition.wait()
+                delay = self._last_push + self.min_gap - self.clock()
+            if delay > 0:
+                time.sleep(delay)
+            self.flush()
+
+    def _push(self, icon_key, menu_key):
+        """只推送实际变化的部分，调用方须持有_condition"""
+        changed = False
+        if icon_key != self._pushed_icon:
+            self.push_icon(icon_key)
+            self._pushed_icon = icon_key
+            changed = True
+        if menu_key != self._pushed_menu:
+            self.push_menu()
+            self._pushed_menu = menu_key
+            changed = True
+        if changed:
+            self.pushed += 1
+        else:
+            self.dropped += 1
@@ -0,0 +1,64 @@
+import time
+
+from seewo_watcher.engine import DetectionEngine
+from seewo_watcher.process_events import FakeProcessSource
+from seewo_watcher.replay import replay
+from seewo_watcher.rules import RuleSet
+from seewo_watcher.scheduler import AdaptiveScheduler
+from seewo_watcher.settings import WatcherSettings
+
+ACTIONS = ["alert", "kill", "pause", "sleep"]
+
+
+def make_rules(confirm=1, min_dwell=0):
+    return RuleSet.from_dicts([{"name": "rtcRemoteDesktop.exe", "actions": ACTIONS,
+                                "confirm": confirm, "min_dwell": min_dwell}])
+
+
+def test_single_poll_blip_is_suppressed_in_replay():
+    # 进程只存在60毫秒，只被一次轮询看到
+    records = [{"t": 0.0, "processes": [[1, "explorer.exe"]]},
+               {"t": 1.0, "start": [[100, "rtcRemoteDesktop.exe"]], "exit": []},
+               {"t": 1.06, "start": [], "exit": [100]}]
+    settings = WatcherSettings(check_interval=0.05, max_check_interval=0.05)
+    result = replay(records, make_rules(confirm=3), settings)
+    assert result.state_changes == []
+    assert result.suppressed == {"rtcRemoteDesktop.exe": 1}
+
+
+def test_steady_process_is_confirmed_after_confirm_polls_in_replay():
+    records = [{"t": 0.0, "processes": [[1, "explorer.exe"]]},
+               {"t": 1.0, "start": [[100, "rtcRemoteDesktop.exe"]], "exit": []}]
+    settings = WatcherSettings(check_interval=0.05, max_check_interval=0.05)
+    result = replay(records, make_rules(confirm=3), settings)
+    assert [(name, running) for _, name, running in result.state_changes] == [("rtcRemoteDesktop.exe", True)]
+    # 第一次看到之后还需要两次间隔为check_interval的轮询
+    assert result.latencies[0] >= 2 * 0.05 - 1e-9
+
+
+def test_empty_reticks_do_not_advance_confirm_count():
+    rules = make_rules(confirm=3)
+    sources = []
+
+    def factory(rules):
+        source = FakeProcessSource(rules)
+        sources.append(source)
+        return source
+
+    wakeup = 0.02
+    engine = DetectionEngine(rules, AdaptiveScheduler(0.01, 0.01, 0, []), source_factory=factory,
+                             push_wakeup=wakeup)
+    engine.start()
+    sources[0].start_process("rtcRemoteDesktop.exe")
+    started = time.monotonic()
+    ticks = 0
+    while True:
+        ticks += 1
+        _, state_changes = engine.tick()
+        if state_changes:
+            break
+        assert ticks < 50
+    assert state_changes == [("rtcRemoteDesktop.exe", True)]
+    assert ticks == 3
+    # 事件之后还需要两个完整的唤醒周期
+    assert time.monotonic() - started >= 2 * wakeup
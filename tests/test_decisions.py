@@ -0,0 +1,123 @@
+from seewo_watcher.decisions import ACTION_MUTE, DecisionPolicy
+from seewo_watcher.engine import DetectionEngine
+from seewo_watcher.process_events import FakeProcessSource
+from seewo_watcher.rules import ACTION_ALERT, ACTION_HOTKEY, ACTION_KILL, ACTION_PAUSE, RuleSet
+from seewo_watcher.scheduler import AdaptiveScheduler
+from seewo_watcher.settings import WatcherSettings
+from seewo_watcher.state import ProcessStateMachine
+from seewo_watcher.termination import TerminationEngine, succeeded
+
+NAMES = ["a.exe", "b.exe", "c.exe"]
+
+
+def make_policy(actions=("alert", "hotkey", "pause")):
+    rules = RuleSet.from_dicts([{"name": name, "actions": list(actions), "hotkeys": ["ctrl+win+right", "ctrl+win+left"]}
+                                for name in NAMES])
+    machine = ProcessStateMachine(rules.names, rules.thresholds())
+    return DecisionPolicy(rules, machine), machine
+
+
+def make_settings(**overrides):
+    values = dict(show_alert=True, enable_hotkey=True, auto_pause=True, auto_mute=False,
+                  auto_kill=False, enable_sleep=False, only_rtc_effective=False)
+    values.update(overrides)
+    return WatcherSettings(**values)
+
+
+def tick(policy, machine, changes, settings):
+    for name, running in changes:
+        machine.process_states[name] = running
+    return [(decision.action, decision.args) for decision in policy.decide(changes, settings)]
+
+
+def test_simultaneous_starts_are_decided_once():
+    policy, machine = make_policy()
+    decisions = tick(policy, machine, [(name, True) for name in NAMES], make_settings())
+    assert [action for action, _ in decisions] == [ACTION_ALERT, ACTION_HOTKEY, ACTION_PAUSE]
+    # 一个汇总弹窗列出全部进程，热键只按一次
+    assert [name for name, _ in decisions[0][1][0]] == NAMES
+    assert decisions[1][1] == ("ctrl+win+right", True)
+
+
+def test_hotkey_and_pause_follow_net_target_state():
+    policy, machine = make_policy()
+    settings = make_settings(show_alert=False)
+    assert tick(policy, machine, [("a.exe", True)], settings) == [
+        (ACTION_HOTKEY, ("ctrl+win+right", True)), (ACTION_PAUSE, ())]
+    # 另一个进程启动、仍有进程运行时的退出都不改变目标状态
+    assert tick(policy, machine, [("b.exe", True)], settings) == []
+    assert tick(policy, machine, [("a.exe", False)], settings) == []
+    # 同一tick中一个退出一个启动，净目标仍为已切换
+    assert tick(policy, machine, [("b.exe", False), ("c.exe", True)], settings) == []
+    assert tick(policy, machine, [("c.exe", False)], settings) == [
+        (ACTION_HOTKEY, ("ctrl+win+left", False)), (ACTION_PAUSE, ())]
+
+
+def test_auto_killed_processes_do_not_switch_desktop():
+    policy, machine = make_policy(actions=("hotkey", "pause", "kill"))
+    decisions = tick(policy, machine, [("a.exe", True), ("b.exe", True)],
+                     make_settings(auto_kill=True, auto_mute=True))
+    assert decisions == [(ACTION_KILL, (["a.exe", "b.exe"],))]
+    assert ACTION_MUTE not in [action for action, _ in decisions]
+    assert not any(machine.process_states.values())
+
+
+def test_failed_kill_restores_running_state_and_retries():
+    rules = RuleSet.from_dicts([{"name": "a.exe", "actions": ["hotkey", "pause", "kill"],
+                                 "hotkeys": ["ctrl+win+right", "ctrl+win+left"]}])
+    sources = []
+
+    def factory(rules):
+        sources.append(FakeProcessSource(rules))
+        return sources[-1]
+
+    engine = DetectionEngine(rules, AdaptiveScheduler(0.01, 0.01, 0, []), source_factory=factory, push_wakeup=0.01)
+    policy = DecisionPolicy(rules, engine.state_machine)
+    # 没有已知PID时只能按名称结束，按名称结束也失败
+    terminator = TerminationEngine(fallback=lambda names: False)
+    settings = make_settings(show_alert=False, auto_kill=True)
+    engine.start()
+    pid = sources[0].start_process("a.exe")
+
+    def run_tick():
+        _, state_changes = engine.tick()
+        return [(decision.action, decision.args) for decision in policy.decide(state_changes, settings)]
+
+    def kill(decisions):
+        names = dict(decisions)[ACTION_KILL][0]
+        results = terminator.terminate({name: {} for name in names})
+        failed = [name for name in names if not succeeded(results, name)]
+        policy.record_kill_failure(failed)
+        engine.recheck(failed)
+        return failed
+
+    decisions = run_tick()
+    assert decisions == [(ACTION_KILL, (["a.exe"],))]
+    assert engine.state_machine.process_states["a.exe"] is False
+    assert kill(decisions) == ["a.exe"]
+    # 下一次tick恢复为运行中，热键与暂停按仍在运行处理，并重试一次结束
+    decisions = run_tick()
+    assert decisions == [(ACTION_HOTKEY, ("ctrl+win+right", True)), (ACTION_PAUSE, ()), (ACTION_KILL, (["a.exe"],))]
+    assert engine.state_machine.process_states["a.exe"] is True
+    assert kill(decisions) == ["a.exe"]
+    assert run_tick() == []
+    assert engine.state_machine.process_states["a.exe"] is True
+    # 进程最终退出时恢复桌面与播放
+    sources[0].exit_process(pid)
+    assert run_tick() == [(ACTION_HOTKEY, ("ctrl+win+left", False)), (ACTION_PAUSE, ())]
+    assert policy.kill_failed == set()
+
+
+def test_switch_back_uses_switching_rule_after_only_rtc_is_enabled():
+    rules = RuleSet.from_dicts([{"name": "a.exe", "level": "watch", "actions": ["hotkey"],
+                                 "hotkeys": ["ctrl+win+right", "ctrl+win+left"]},
+                                {"name": "b.exe", "actions": ["alert"]}])
+    machine = ProcessStateMachine(rules.names, rules.thresholds())
+    policy = DecisionPolicy(rules, machine)
+    settings = make_settings(show_alert=False, auto_pause=False)
+    assert tick(policy, machine, [("a.exe", True)], settings) == [(ACTION_HOTKEY, ("ctrl+win+right", True))]
+    # 开启"仅对远程生效"后没有任何远程控制级别的热键规则，仍用切换时的规则切回
+    settings = make_settings(show_alert=False, auto_pause=False, only_rtc_effective=True)
+    assert tick(policy, machine, [("b.exe", True)], settings) == [(ACTION_HOTKEY, ("ctrl+win+left", False))]
+    assert tick(policy, machine, [("b.exe", False)], settings) == []
+    assert not policy.desktop_switched
@@ -0,0 +1,29 @@
+import json
+
+from seewo_watcher.adapters import dependencies
+
+
+def test_find_missing_does_not_import():
+    assert dependencies.find_missing({"json": "json", "no_such_module_xyz": "xyz"}) == ["xyz"]
+
+
+def test_verification_record_skips_the_full_import(tmp_path, monkeypatch):
+    record = str(tmp_path / "deps.json")
+    imports = []
+
+    def import_missing(required):
+        imports.append(list(required))
+        return []
+
+    monkeypatch.setattr(dependencies, "REQUIRED", {"json": "json"})
+    monkeypatch.setattr(dependencies, "import_missing", import_missing)
+    dependencies.check_dependencies(record)
+    assert imports == [["json"]]
+    with open(record, encoding='utf-8') as f:
+        assert json.load(f) == dependencies.dependency_fingerprint({"json": "json"})
+    dependencies.check_dependencies(record)
+    assert len(imports) == 1
+    # 解释器或包版本变化后重新完整验证
+    monkeypatch.setattr(dependencies.sys, "version", "0.0")
+    dependencies.check_dependencies(record)
+    assert len(imports) == 2
@@ -0,0 +1,51 @@
+from seewo_watcher.engine import DetectionEngine
+from seewo_watcher.process_events import FakeProcessSource
+from seewo_watcher.rules import RuleSet
+from seewo_watcher.scheduler import AdaptiveScheduler
+
+NAMES = ["rtcRemoteDesktop.exe", "media_player.exe"]
+
+
+def make_engine():
+    sources = []
+
+    def factory(rules):
+        sources.append(FakeProcessSource(rules))
+        return sources[-1]
+
+    engine = DetectionEngine(RuleSet.from_names(NAMES), AdaptiveScheduler(0.01, 0.01, 0, []),
+                             source_factory=factory, push_wakeup=0.01)
+    engine.start()
+    return engine, sources[0]
+
+
+def test_start_and_exit_events_drive_process_states():
+    engine, source = make_engine()
+    states = engine.state_machine.process_states
+    first = source.start_process("rtcRemoteDesktop.exe")
+    second = source.start_process("RTCREMOTEDESKTOP.EXE")
+    # 不受监控的进程不产生事件
+    source.start_process("explorer.exe")
+    events, state_changes = engine.tick()
+    assert [(event.kind, event.pid) for event in events] == [("start", first), ("start", second)]
+    assert state_changes == [("rtcRemoteDesktop.exe", True)]
+    assert states == {"rtcRemoteDesktop.exe": True, "media_player.exe": False}
+    assert engine.state_machine.process_cache["rtcRemoteDesktop.exe"] == {first, second}
+
+    # 还有一个实例在运行时退出不改变状态
+    source.exit_process(first)
+    assert engine.tick()[1] == []
+    assert states["rtcRemoteDesktop.exe"] is True
+
+    source.exit_process(second)
+    player = source.start_process("media_player.exe")
+    _, state_changes = engine.tick()
+    assert sorted(state_changes) == [("media_player.exe", True), ("rtcRemoteDesktop.exe", False)]
+    assert states == {"rtcRemoteDesktop.exe": False, "media_player.exe": True}
+    assert engine.state_machine.process_cache == {"rtcRemoteDesktop.exe": set(), "media_player.exe": {player}}
+
+
+def test_tick_without_events_reports_nothing():
+    engine, _ = make_engine()
+    assert engine.tick() == ([], [])
+    assert not engine.state_machine.any_running()
@@ -0,0 +1,60 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+from seewo_watcher.enumerators import (EnumeratorError, ProcfsEnumerator, PsutilEnumerator,
+                                       create_enumerator)
+
+
+def write(path, data):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(data)
+
+
+@pytest.fixture
+def fake_proc(tmp_path):
+    write(tmp_path / "stat", b"cpu 1 2 3\nbtime 1000\n")
+    fields = b"S 7" + b" 0" * 17 + b" 500 0"
+    # comm含空格和括号，且被截断到15个字符
+    write(tmp_path / "42" / "stat", b"42 (a) b (very long) " + fields + b"\n")
+    write(tmp_path / "42" / "cmdline", b"C:\\Tools\\a) b (very long) name.exe\0--flag\0")
+    write(tmp_path / "42" / "comm", b"a) b (very long\n")
+    write(tmp_path / "7" / "stat", b"7 (init) " + fields + b"\n")
+    write(tmp_path / "7" / "comm", b"init\n")
+    (tmp_path / "self").mkdir()
+    return str(tmp_path)
+
+
+def test_procfs_parses_stat_and_completes_truncated_names(fake_proc):
+    enumerator = ProcfsEnumerator(fake_proc)
+    assert enumerator.list_pids() == [7, 42]
+    assert sorted(enumerator.iter_processes()) == [(7, "init"), (42, "a) b (very long) name.exe")]
+    name, create_time, ppid = enumerator.resolve(42)
+    assert name == "a) b (very long) name.exe"
+    assert ppid == 7
+    assert create_time == pytest.approx(1000 + 500 / os.sysconf("SC_CLK_TCK"))
+    assert enumerator.resolve(99) is None
+
+
+@pytest.mark.skipif(not os.path.exists("/proc/stat"), reason="需要Linux的/proc")
+def test_procfs_matches_psutil_for_a_live_process():
+    child = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(30)"])
+    try:
+        procfs = ProcfsEnumerator().resolve(child.pid)
+        reference = PsutilEnumerator().resolve(child.pid)
+        assert procfs[0] == reference[0]
+        assert procfs[2] == reference[2] == os.getpid()
+        assert procfs[1] == pytest.approx(reference[1], abs=0.05)
+        assert child.pid in ProcfsEnumerator().list_pids()
+    finally:
+        child.kill()
+        child.wait()
+
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(EnumeratorError):
+        create_enumerator("missing")
+    with pytest.raises(EnumeratorError):
+        ProcfsEnumerator("/nonexistent")
@@ -0,0 +1,39 @@
+import pytest
+
+from seewo_watcher import icons
+from seewo_watcher.settings import WatcherSettings
+
+pytest.importorskip("PIL")
+
+
+def test_icon_state_encodes_settings_and_center():
+    settings = WatcherSettings(show_alert=True, auto_kill=True)
+    assert icons.icon_state(settings, {}) == icons.SHOW_ALERT | icons.AUTO_KILL
+    states = {"rtcRemoteDesktop.exe": True, "screenCapture.exe": False}
+    assert icons.icon_state(settings, states) >> icons.CENTER_SHIFT == icons.CENTER_CONTROLLED
+    watched = icons.icon_state(settings, states, watch_only={"rtcRemoteDesktop.exe"})
+    assert watched >> icons.CENTER_SHIFT == icons.CENTER_WATCHED
+
+
+def test_atlas_round_trips_through_disk(tmp_path, monkeypatch):
+    atlas = icons.IconAtlas(str(tmp_path))
+    atlas.warm()
+    assert (tmp_path / f"icon_atlas_v{icons.ATLAS_VERSION}.png").exists()
+
+    def fail(state):
+        raise AssertionError("图标集已缓存，不应重新绘制")
+
+    monkeypatch.setattr(icons, "render_icon", fail)
+    loaded = icons.IconAtlas(str(tmp_path))
+    loaded.warm()
+    for state in icons.ALL_STATES:
+        assert loaded.get(state).tobytes() == atlas.get(state).tobytes()
+
+
+def test_corrupt_atlas_is_redrawn(tmp_path):
+    (tmp_path / f"icon_atlas_v{icons.ATLAS_VERSION}.png").write_bytes(b"not a png")
+    atlas = icons.IconAtlas(str(tmp_path))
+    atlas.warm()
+    state = icons.ALL_STATES[-1]
+    assert atlas.get(state).tobytes() == icons.render_icon(state).tobytes()
+    assert icons.IconAtlas(str(tmp_path))._load()
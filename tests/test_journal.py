@@ -0,0 +1,46 @@
+import os
+
+from seewo_watcher.journal import ACTION_ISSUED, STATE_CHANGE, EventJournal
+
+
+def read_records(path):
+    with open(path, encoding='utf-8') as f:
+        return [line.rstrip("\n").split("\t") for line in f if not line.startswith("#")]
+
+
+def test_ring_buffer_keeps_the_newest_entries():
+    journal = EventJournal(capacity=4)
+    for index in range(10):
+        journal.record(STATE_CHANGE, f"p{index}.exe", index, timestamp=float(index))
+    assert len(journal) == 4
+    assert [entry[2] for entry in journal.entries()] == ["p6.exe", "p7.exe", "p8.exe", "p9.exe"]
+    assert journal.entries(limit=2) == [(8.0, STATE_CHANGE, "p8.exe", 8), (9.0, STATE_CHANGE, "p9.exe", 9)]
+
+
+def test_overwritten_entries_are_counted_as_dropped(tmp_path):
+    path = str(tmp_path / "journal.log")
+    journal = EventJournal(capacity=4, path=path, flush_interval=3600)
+    for index in range(3):
+        journal.record(ACTION_ISSUED, "kill", index, timestamp=float(index))
+    journal.flush()
+    for index in range(3, 10):
+        journal.record(ACTION_ISSUED, "kill", index, timestamp=float(index))
+    journal.stop()
+    assert journal.dropped == 3
+    records = read_records(path)
+    assert [int(detail) for _, _, _, detail in records] == [0, 1, 2, 6, 7, 8, 9]
+    assert records[0] == ["0.000000", ACTION_ISSUED, "kill", "0"]
+
+
+def test_rotation_keeps_the_configured_backups(tmp_path):
+    path = str(tmp_path / "journal.log")
+    journal = EventJournal(capacity=8, path=path, flush_interval=3600, max_bytes=1, backups=2)
+    for index in range(4):
+        journal.record(STATE_CHANGE, "a.exe", index)
+        journal.flush()
+    journal.stop()
+    assert os.path.exists(f"{path}.1") and os.path.exists(f"{path}.2")
+    assert not os.path.exists(f"{path}.3")
+    with open(path, encoding='utf-8') as f:
+        assert f.readline().startswith("#\t")
+    assert [detail for _, _, _, detail in read_records(path)] == ["3"]
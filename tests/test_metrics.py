@@ -0,0 +1,81 @@
+import re
+import urllib.error
+import urllib.request
+
+import pytest
+
+from seewo_watcher.exporter import CONTENT_TYPE, MetricsServer
+from seewo_watcher.metrics import MetricsRegistry
+from seewo_watcher.settings import WatcherSettings
+
+SAMPLE = re.compile(r'^[a-zA-Z_:][a-zA-Z0-9_:]*(\{[a-zA-Z_][a-zA-Z0-9_]*="(?:[^"\\]|\\.)*"'
+                    r'(,[a-zA-Z_][a-zA-Z0-9_]*="(?:[^"\\]|\\.)*")*\})? \S+$')
+
+
+@pytest.fixture
+def server():
+    registry = MetricsRegistry()
+    registry.counter("watcher_ticks_total", "监控循环执行的tick次数").inc(3)
+    histogram = registry.histogram("watcher_tick_seconds", "每次tick的耗时", [0.001, 0.01])
+    for value in (0.0005, 0.005, 0.5):
+        histogram.observe(value)
+    states = {"rtcRemoteDesktop.exe": True, "media_player.exe": False}
+    server = MetricsServer(registry, lambda: (states, WatcherSettings()), 0)
+    server.start()
+    yield server
+    server.stop()
+
+
+def fetch(server, path):
+    with urllib.request.urlopen(f"http://{server.host}:{server.port}{path}", timeout=5) as response:
+        return response.headers["Content-Type"], response.read().decode("utf-8")
+
+
+def test_metrics_endpoint_serves_prometheus_text(server):
+    content_type, body = fetch(server, "/metrics")
+    assert content_type == CONTENT_TYPE
+    assert body.endswith("\n")
+    lines = body.splitlines()
+    for line in lines:
+        assert line.startswith(("# HELP ", "# TYPE ")) or SAMPLE.match(line), line
+    # 同名指标只有一组HELP/TYPE，且出现在它的样本之前
+    types = [line.split()[2] for line in lines if line.startswith("# TYPE ")]
+    assert len(types) == len(set(types))
+    assert 'watcher_process_running{process="rtcRemoteDesktop.exe"} 1.0' in lines
+    assert 'watcher_process_running{process="media_player.exe"} 0.0' in lines
+    assert "watcher_ticks_total 3.0" in lines
+    assert "# TYPE watcher_tick_seconds histogram" in lines
+    # 直方图的桶是累计计数，+Inf等于总数
+    assert 'watcher_tick_seconds_bucket{le="0.001"} 1' in lines
+    assert 'watcher_tick_seconds_bucket{le="0.01"} 2' in lines
+    assert 'watcher_tick_seconds_bucket{le="+Inf"} 3' in lines
+    assert "watcher_tick_seconds_count 3" in lines
+    assert server.requests == 1
+
+
+def test_other_paths_return_404(server):
+    with pytest.raises(urllib.error.HTTPError) as error:
+        fetch(server, "/")
+    assert error.value.code == 404
+
+
+def test_histogram_buckets_include_their_upper_bound():
+    histogram = MetricsRegistry().histogram("latency", buckets=(0.01, 0.1))
+    for value in (0.001, 0.01, 0.05, 0.1, 3.0):
+        histogram.observe(value)
+    assert histogram.get() == {"count": 5, "sum": pytest.approx(3.161),
+                               "buckets": {"0.01": 2, "0.1": 2, "+Inf": 1}}
+    assert histogram.quantile(0.4) == 0.01
+    assert histogram.quantile(0.5) == 0.1
+    assert histogram.quantile(1.0) == float("inf")
+    assert MetricsRegistry().histogram("empty").quantile(0.5) is None
+
+
+def test_registry_returns_the_same_metric_per_labels():
+    registry = MetricsRegistry()
+    kills = registry.counter("kills_total", result="ok")
+    assert registry.counter("kills_total", result="ok") is kills
+    assert registry.counter("kills_total", result="failed") is not kills
+    with pytest.raises(ValueError):
+        registry.gauge("kills_total", result="ok")
+    assert registry.gauge("broken", func=lambda: 1 / 0).get() is None
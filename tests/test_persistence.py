@@ -0,0 +1,58 @@
+import json
+import time
+
+from seewo_watcher.persistence import SettingsWriter
+
+
+def read(path):
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def test_debounced_saves_are_coalesced(tmp_path):
+    path = str(tmp_path / "settings.json")
+    writer = SettingsWriter(path, debounce=60)
+    for interval in (0.1, 0.2, 0.3):
+        writer.schedule({"check_interval": interval})
+    assert writer.writes == 0
+    writer.stop()
+    assert writer.writes == 1
+    assert read(path) == {"check_interval": 0.3}
+
+
+def test_background_thread_writes_after_debounce(tmp_path):
+    path = str(tmp_path / "settings.json")
+    writer = SettingsWriter(path, debounce=0.01)
+    writer.schedule({"auto_kill": True})
+    deadline = time.monotonic() + 5
+    while writer.writes == 0 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    writer.stop()
+    assert writer.writes == 1
+    assert read(path) == {"auto_kill": True}
+
+
+def test_unchanged_content_is_not_rewritten(tmp_path):
+    path = tmp_path / "settings.json"
+    path.write_text(json.dumps({"auto_kill": True}), encoding='utf-8')
+    writer = SettingsWriter(str(path), debounce=60)
+    writer.schedule({"auto_kill": True})
+    writer.flush()
+    assert (writer.writes, writer.skipped) == (0, 1)
+    writer.schedule({"auto_kill": False})
+    writer.flush()
+    writer.schedule({"auto_kill": False})
+    writer.stop()
+    assert (writer.writes, writer.skipped) == (1, 2)
+    assert read(str(path)) == {"auto_kill": False}
+
+
+def test_write_errors_are_reported(tmp_path):
+    blocker = tmp_path / "file"
+    blocker.write_text("")
+    errors = []
+    writer = SettingsWriter(str(blocker / "settings.json"), debounce=60, on_error=errors.append)
+    writer.schedule({"auto_kill": True})
+    writer.stop()
+    assert writer.writes == 0
+    assert len(errors) == 1
@@ -0,0 +1,38 @@
+import subprocess
+import sys
+
+import psutil
+
+from seewo_watcher.pidcache import ProcessHandleCache
+
+
+def test_alive_follows_the_cached_process():
+    child = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(30)"])
+    cache = ProcessHandleCache()
+    try:
+        cache.add(child.pid)
+        assert child.pid in cache
+        assert cache.create_time(child.pid) == psutil.Process(child.pid).create_time()
+        assert cache.alive(child.pid)
+        child.kill()
+        child.wait()
+        assert not cache.alive(child.pid)
+    finally:
+        child.kill()
+        cache.clear()
+    assert len(cache) == 0
+    assert not cache.alive(child.pid)
+
+
+def test_new_create_time_replaces_the_entry():
+    cache = ProcessHandleCache()
+    pid = psutil.Process().pid
+    cache.add(pid, 1.0)
+    cache.add(pid, 1.0)
+    assert cache.create_time(pid) == 1.0
+    cache.add(pid, 2.0)
+    assert cache.create_time(pid) == 2.0
+    assert len(cache) == 1
+    cache.discard(pid)
+    cache.discard(pid)
+    assert pid not in cache
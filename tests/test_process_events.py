@@ -0,0 +1,56 @@
+from seewo_watcher.process_events import PROCESS_START, PollingProcessSource
+from seewo_watcher.rules import RuleSet
+from seewo_watcher.snapshot import IncrementalSnapshot
+
+
+class FakeTable:
+    """内存中的进程表，提供增量快照所需的list_pids与resolve"""
+
+    def __init__(self):
+        self.processes = {}
+
+    def start(self, pid, name, ppid=0):
+        self.processes[pid] = (name, float(len(self.processes)), ppid)
+
+    def list_pids(self):
+        return sorted(self.processes)
+
+    def resolve(self, pid):
+        return self.processes.get(pid)
+
+
+class FakeHandles:
+    def __init__(self, table):
+        self.table = table
+        self.pids = set()
+
+    def add(self, pid, create_time=None):
+        self.pids.add(pid)
+
+    def discard(self, pid):
+        self.pids.discard(pid)
+
+    def create_time(self, pid):
+        return None
+
+    def alive(self, pid):
+        return pid in self.pids and pid in self.table.processes
+
+
+def test_new_descendants_are_found_after_every_rule_is_confirmed():
+    rules = RuleSet.from_dicts([
+        {"name": "EasiAgent.exe", "level": "watch", "actions": ["alert"]},
+        {"name": "agent-child", "match": "descendant", "pattern": "EasiAgent.exe", "actions": ["alert"]},
+    ])
+    table = FakeTable()
+    table.start(1, "explorer.exe")
+    table.start(10, "EasiAgent.exe", 1)
+    table.start(11, "helper.exe", 10)
+    source = PollingProcessSource(rules, handles=FakeHandles(table),
+                                  incremental=IncrementalSnapshot(rules, table.list_pids, table.resolve))
+    assert sorted((event.name, event.pid) for event in source.poll()) == [("EasiAgent.exe", 10), ("agent-child", 11)]
+    # 每条规则都有存活的缓存PID，新的子进程仍要被发现，进程树保持最新
+    table.start(12, "updater.exe", 10)
+    assert [(event.kind, event.name, event.pid) for event in source.poll()] == [(PROCESS_START, "agent-child", 12)]
+    tree = source.current_tree()
+    assert tree is not None and sorted(tree.descendants(10)) == [11, 12]
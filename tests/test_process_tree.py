@@ -0,0 +1,44 @@
+from seewo_watcher.process_tree import ProcessTree
+
+
+def build():
+    tree = ProcessTree()
+    tree.add(1, 0, 1.0)
+    tree.add(10, 1, 2.0)
+    tree.add(11, 10, 3.0)
+    tree.add(12, 10, 4.0)
+    tree.add(13, 11, 5.0)
+    return tree
+
+
+def test_descendants_list_parents_before_children():
+    tree = build()
+    descendants = tree.descendants(10)
+    assert sorted(descendants) == [11, 12, 13]
+    assert descendants.index(11) < descendants.index(13)
+    assert list(tree.ancestors(13)) == [11, 10, 1]
+    assert tree.descendants(13) == []
+
+
+def test_orphans_are_not_adopted_by_a_reused_parent_pid():
+    tree = build()
+    tree.remove(10)
+    assert 10 not in tree
+    assert tree.parent(11) is None and tree.parent(12) is None
+    assert tree.descendants(1) == []
+    # 复用PID 10的新进程比11晚创建，不能成为11的父进程
+    tree.add(10, 1, 9.0)
+    tree.add(20, 11, 1.5)
+    assert tree.descendants(10) == []
+    assert tree.parent(20) is None
+    assert tree.descendants(11) == [13]
+
+
+def test_remove_cleans_empty_child_sets():
+    tree = build()
+    tree.remove(13)
+    tree.remove(11)
+    tree.remove(12)
+    tree.remove(404)
+    assert tree.children == {1: {10}}
+    assert len(tree) == 2
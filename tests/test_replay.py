@@ -0,0 +1,42 @@
+import json
+
+from seewo_watcher import replay as replay_module
+from seewo_watcher.replay import replay
+from seewo_watcher.rules import RuleSet
+from seewo_watcher.settings import WatcherSettings
+
+SETTINGS = WatcherSettings(check_interval=0.1, max_check_interval=0.1)
+
+
+def test_descendant_rule_matches_child_recorded_with_ppid():
+    rules = RuleSet.from_dicts([
+        {"name": "EasiAgent.exe", "level": "watch", "actions": ["alert"]},
+        {"name": "agent-child", "match": "descendant", "pattern": "EasiAgent.exe", "actions": ["alert"]},
+    ])
+    # 子进程与父进程在同一条记录中出现，且子进程的pid更小
+    records = [{"t": 0.0, "processes": [[1, "explorer.exe", None, 0]]},
+               {"t": 1.0, "start": [[50, "helper.exe", None, 60], [60, "EasiAgent.exe", None, 1]], "exit": []},
+               {"t": 2.0, "start": [], "exit": [50]}]
+    result = replay(records, rules, SETTINGS)
+    changes = [(name, running) for _, name, running in result.state_changes]
+    assert ("agent-child", True) in changes
+    assert ("agent-child", False) in changes
+
+
+def test_expect_round_trip(tmp_path):
+    trace = tmp_path / "trace.jsonl"
+    lines = [{"version": 1},
+             {"t": 0.0, "processes": [[1, "explorer.exe"]]},
+             {"t": 1.0, "start": [[100, "rtcRemoteDesktop.exe"]], "exit": []},
+             {"t": 3.0, "start": [], "exit": [100]}]
+    trace.write_text("\n".join(json.dumps(line) for line in lines), encoding="utf-8")
+    actions = tmp_path / "actions.json"
+    run = ["run", str(trace), "--set", "check_interval=0.1", "--set", "max_check_interval=0.1",
+           "--set", "show_alert=true", "--set", "auto_pause=true"]
+    assert replay_module.main(run + ["--output", str(actions)]) == 0
+    recorded = json.loads(actions.read_text(encoding="utf-8"))
+    assert recorded
+    assert replay_module.main(run + ["--expect", str(actions)]) == 0
+    # 动作序列不同时返回1
+    actions.write_text(json.dumps(recorded[:-1]), encoding="utf-8")
+    assert replay_module.main(run + ["--expect", str(actions)]) == 1
@@ -0,0 +1,28 @@
+import pytest
+
+from seewo_watcher.rules import RuleError, RuleSet
+
+ACTIONS = ["alert"]
+
+
+def test_second_descendant_rule_for_same_ancestor_is_rejected():
+    items = [{"name": "EasiAgent.exe", "actions": ACTIONS},
+             {"name": "helper", "match": "descendant", "pattern": "EasiAgent.exe", "actions": ACTIONS},
+             {"name": "updater", "match": "descendant", "pattern": "EasiAgent.exe", "actions": ACTIONS}]
+    with pytest.raises(RuleError):
+        RuleSet.from_dicts(items)
+    assert RuleSet.from_dicts(items[:2]).descendant_rules == {"EasiAgent.exe": "helper"}
+
+
+def test_memo_overflow_swaps_in_a_new_table_without_clearing_the_old_one():
+    rules = RuleSet.from_dicts([{"name": "rtc", "match": "glob", "pattern": "rtc*.exe", "actions": ACTIONS},
+                                {"name": "agent.exe", "actions": ACTIONS}])
+    old = rules.table
+    for i in range(RuleSet.MEMO_LIMIT):
+        rules.match(f"other{i}.exe")
+    # 另一个线程正在使用的旧表不会被清空
+    assert len(old) == RuleSet.MEMO_LIMIT
+    assert rules.table is not old
+    assert rules.table["agent.exe"] == "agent.exe"
+    assert rules.match("RTCRemote.exe") == "rtc"
+    assert rules.match("other0.exe") is None
@@ -0,0 +1,60 @@
+import time
+
+import pytest
+
+from seewo_watcher.scheduler import AdaptiveScheduler, parse_hot_hours
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.hour = 3
+
+    def __call__(self):
+        return self.now
+
+    def localtime(self):
+        return time.struct_time((2024, 1, 1, self.hour, 0, 0, 0, 1, -1))
+
+
+def make_scheduler(clock, hot_hours=()):
+    return AdaptiveScheduler(0.1, 1.0, burst_duration=5.0, hot_hours=hot_hours, backoff=2.0,
+                             clock=clock, localtime=clock.localtime)
+
+
+def test_idle_backoff_is_capped_and_changes_start_a_burst():
+    clock = FakeClock()
+    scheduler = make_scheduler(clock)
+    intervals = []
+    for _ in range(6):
+        intervals.append(scheduler.next_interval(False))
+        clock.now += intervals[-1]
+    assert intervals == pytest.approx([0.2, 0.4, 0.8, 1.0, 1.0, 1.0])
+    # 状态变化后在burst_duration内保持最小间隔
+    assert scheduler.next_interval(True) == 0.1
+    clock.now += 4.9
+    assert scheduler.next_interval(False) == 0.1
+    clock.now += 0.2
+    assert scheduler.next_interval(False) == pytest.approx(0.2)
+
+
+def test_hot_hours_keep_the_minimum_interval():
+    clock = FakeClock()
+    clock.hour = 23
+    scheduler = make_scheduler(clock, parse_hot_hours("22-6，9-10"))
+    assert [scheduler.next_interval(False) for _ in range(3)] == [0.1, 0.1, 0.1]
+    # 重点时段按分钟重新判断
+    clock.hour = 7
+    clock.now += 30
+    assert scheduler.next_interval(False) == 0.1
+    clock.now += 31
+    assert scheduler.next_interval(False) == pytest.approx(0.2)
+
+
+def test_parse_hot_hours():
+    assert parse_hot_hours("") == []
+    assert parse_hot_hours("8-12, 14-17") == [(8, 12), (14, 17)]
+    assert parse_hot_hours("22-6") == [(22, 6)]
+    for text in ("8", "8-8", "25-3", "a-b"):
+        with pytest.raises(ValueError):
+            parse_hot_hours(text)
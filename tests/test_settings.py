@@ -0,0 +1,49 @@
+import pytest
+
+from seewo_watcher.settings import SETTINGS_VERSION, WatcherSettings
+
+
+def test_v1_settings_keep_a_larger_check_interval():
+    settings = WatcherSettings.from_dict({"check_interval": 3, "auto_kill": "true"})
+    assert settings.check_interval == 3
+    assert settings.max_check_interval == 3
+    assert settings.auto_kill is True
+    small = WatcherSettings.from_dict({"check_interval": 0.1})
+    assert small.max_check_interval == 1.0
+
+
+def test_current_version_is_not_migrated_again():
+    data = WatcherSettings(check_interval=3, max_check_interval=3).to_dict()
+    assert data["settings_version"] == SETTINGS_VERSION
+    data["check_interval"] = 0.5
+    assert WatcherSettings.from_dict(data).max_check_interval == 3
+
+
+def test_invalid_values_fall_back_to_defaults_or_range():
+    settings = WatcherSettings.from_dict({
+        "settings_version": SETTINGS_VERSION,
+        "check_interval": "abc",
+        "alert_duration": 99,
+        "metrics_port": -1,
+        "hot_hours": "8",
+        "unknown": 1,
+    })
+    assert settings.check_interval == WatcherSettings().check_interval
+    assert settings.alert_duration == 30
+    assert settings.metrics_port == 0
+    assert settings.hot_hours == ""
+
+
+def test_max_interval_is_raised_to_check_interval():
+    settings = WatcherSettings.from_dict({"settings_version": SETTINGS_VERSION,
+                                          "check_interval": 5, "max_check_interval": 1})
+    assert settings.max_check_interval == 5
+
+
+def test_replace_validates():
+    settings = WatcherSettings()
+    assert settings.replace(hot_hours="8-12").hot_hours == "8-12"
+    for changes in ({"check_interval": 0}, {"hot_hours": "x"},
+                    {"check_interval": 2, "max_check_interval": 1}):
+        with pytest.raises(ValueError):
+            settings.replace(**changes)
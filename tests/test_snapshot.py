@@ -0,0 +1,136 @@
+from seewo_watcher.rules import RuleSet
+from seewo_watcher.snapshot import CompactSnapshot, IncrementalSnapshot, NameTable, ProcessSnapshot, _changed_pids
+
+ACTIONS = ["alert"]
+
+
+def make_rules():
+    return RuleSet.from_dicts([{"name": "rtcRemoteDesktop.exe", "priority": 20, "actions": ACTIONS},
+                               {"name": "screen", "match": "glob", "pattern": "screen*.exe", "actions": ACTIONS},
+                               {"name": "screenCapture.exe", "priority": 10, "actions": ACTIONS}])
+
+
+def test_capture_indexes_pids_by_rule_in_one_pass():
+    processes = [(1, "explorer.exe"), (10, "rtcRemoteDesktop.exe"), (11, "RTCREMOTEDESKTOP.EXE"),
+                 (20, "screenCapture.exe"), (21, "screenRecorder.exe"), (30, None), (31, "")]
+    snapshot = ProcessSnapshot.capture(make_rules(), processes, timestamp=5.0)
+    # 名称规则优先级高于通配符规则，无名进程只计数
+    assert snapshot.index == {"rtcRemoteDesktop.exe": {10, 11}, "screenCapture.exe": {20}, "screen": {21}}
+    assert snapshot.process_count == len(processes)
+    assert snapshot.timestamp == 5.0
+    assert "screen" in snapshot and "other" not in snapshot
+    assert snapshot.pids("other") == frozenset()
+
+
+class FakeSystem:
+    """可控的进程表：pid -> (进程名, 创建时间, 父pid)"""
+
+    def __init__(self):
+        self.processes = {}
+        self.now = 0.0
+
+    def list_pids(self):
+        return sorted(self.processes)
+
+    def resolve(self, pid):
+        return self.processes.get(pid)
+
+    def clock(self):
+        return self.now
+
+
+NAMES = ["explorer.exe", "rtcRemoteDesktop.exe", "screenCapture.exe", "screenRecorder.exe", "svchost.exe"]
+
+
+def expected_index(rules, system):
+    index = {}
+    for pid, (name, _, _) in system.processes.items():
+        rule = rules.match(name)
+        if rule:
+            index.setdefault(rule, set()).add(pid)
+    return index
+
+
+def apply_delta(index, delta):
+    started, exited = delta
+    for rule, pid in exited:
+        index[rule].remove(pid)
+        if not index[rule]:
+            del index[rule]
+    for rule, pid in started:
+        assert pid not in index.get(rule, ())
+        index.setdefault(rule, set()).add(pid)
+
+
+def test_incremental_snapshot_tracks_churn_between_resyncs():
+    import random
+    rng = random.Random(21)
+    rules = make_rules()
+    system = FakeSystem()
+    snapshot = IncrementalSnapshot(rules, system.list_pids, system.resolve, resync_interval=1e9, clock=system.clock)
+    next_pid = 100
+    index = {}
+    for step in range(300):
+        for _ in range(rng.randrange(4)):
+            next_pid += rng.randrange(1, 5)
+            system.processes[next_pid] = (rng.choice(NAMES), float(step), 0)
+        for pid in rng.sample(sorted(system.processes), min(len(system.processes), rng.randrange(3))):
+            del system.processes[pid]
+        system.now += 1
+        apply_delta(index, snapshot.update())
+        assert index == expected_index(rules, system)
+        assert list(snapshot.snapshot.pids) == system.list_pids()
+        assert all(snapshot.name_of(pid) == name for pid, (name, _, _) in system.processes.items())
+    # 只为新PID解析名称：PID列表不变时不解析任何进程
+    apply_delta(index, snapshot.update())
+    assert snapshot.resolved == 0
+
+
+def test_incremental_snapshot_detects_pid_reuse_at_resync():
+    import random
+    rng = random.Random(22)
+    rules = make_rules()
+    system = FakeSystem()
+    snapshot = IncrementalSnapshot(rules, system.list_pids, system.resolve, resync_interval=5, clock=system.clock)
+    index = {}
+    for step in range(200):
+        # 在固定的小范围内反复复用PID，名称与创建时间都可能变化
+        for pid in rng.sample(range(1, 40), rng.randrange(1, 6)):
+            if pid in system.processes and rng.random() < 0.3:
+                del system.processes[pid]
+            else:
+                system.processes[pid] = (rng.choice(NAMES), float(step), 0)
+        system.now += 1
+        apply_delta(index, snapshot.update())
+        # 第一次更新及之后每隔resync_interval秒重新解析全部PID
+        if (system.now - 1) % 5 == 0:
+            assert index == expected_index(rules, system)
+
+
+def test_changed_pids_is_the_sorted_symmetric_difference():
+    import random
+    from array import array
+    rng = random.Random(22)
+    for _ in range(500):
+        universe = rng.sample(range(1, 5000), rng.randrange(0, 300))
+        previous = sorted(pid for pid in universe if rng.random() < 0.9)
+        current = sorted(pid for pid in universe if rng.random() < 0.9)
+        expected = sorted(set(current) ^ set(previous))
+        assert _changed_pids(array('I', current), array('I', previous)) == expected
+
+
+def test_name_table_and_compact_snapshot():
+    from array import array
+    rules = make_rules()
+    names = NameTable(rules)
+    # id 0固定表示无法解析名称的进程，相同名称只驻留一次
+    assert names.intern("explorer.exe") == names.intern("explorer.exe") == 1
+    rtc = names.intern("rtcRemoteDesktop.exe")
+    recorder = names.intern("screenRecorder.exe")
+    assert len(names) == 4
+    assert names.matches == [False, False, "rtcRemoteDesktop.exe", "screen"]
+    snapshot = CompactSnapshot(array('I', [4, 8, 15, 16]), array('I', [1, rtc, 0, recorder]),
+                               array('d', [0.0] * 4), names, 1.0)
+    assert snapshot.index() == {"rtcRemoteDesktop.exe": {8}, "screen": {16}}
+    assert snapshot.find(15) == 2 and snapshot.find(9) == -1 and snapshot.find(99) == -1
+    assert snapshot.name(1) == "rtcRemoteDesktop.exe"
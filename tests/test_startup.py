@@ -0,0 +1,42 @@
+import threading
+
+import pytest
+
+from seewo_watcher.startup import StartupProfile
+
+
+class StepClock:
+    """每次读取前进一秒的时钟，用于得到确定的偏移"""
+
+    def __init__(self):
+        self.now = 0.0
+        self._lock = threading.Lock()
+
+    def __call__(self):
+        with self._lock:
+            self.now += 1.0
+            return self.now
+
+
+def test_phases_and_marks_are_relative_to_launch():
+    profile = StartupProfile(launched_at=0.0, clock=StepClock())
+    with profile.phase("settings"):
+        pass
+    profile.mark("window")
+    profile.mark("window")
+    assert profile.phases == {"settings": (1.0, 1.0)}
+    assert profile.marks == {"window": 3.0}
+
+
+def test_background_phase_returns_result_or_raises():
+    profile = StartupProfile()
+    release = threading.Event()
+    profile.start("deps", lambda: release.wait(5) and "ok")
+    profile.start("broken", lambda: 1 / 0)
+    release.set()
+    assert profile.join("deps") == "ok"
+    with pytest.raises(ZeroDivisionError):
+        profile.join("broken")
+    summary = profile.summary()
+    assert {name for name, _, _ in summary} == {"deps", "broken"}
+    assert [start for _, start, _ in summary] == sorted(start for _, start, _ in summary)
@@ -0,0 +1,110 @@
+import subprocess
+import sys
+import time
+
+import pytest
+
+psutil = pytest.importorskip("psutil")
+
+from seewo_watcher.process_tree import ProcessTree
+from seewo_watcher.rules import RuleSet
+from seewo_watcher.termination import (ACCESS_DENIED, ALREADY_GONE, FALLBACK_FAILED, FALLBACK_OK, TERMINATED,
+                                       TerminationEngine, TerminationResult, succeeded)
+
+SLEEPER = [sys.executable, "-c", "import time; time.sleep(60)"]
+PARENT = [sys.executable, "-c",
+          "import subprocess, sys, time; subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(60)']); "
+          "time.sleep(60)"]
+
+
+@pytest.fixture
+def spawn():
+    procs = []
+
+    def spawn(args):
+        proc = subprocess.Popen(args)
+        procs.append(proc)
+        return proc
+
+    yield spawn
+    for proc in procs:
+        if proc.poll() is None:
+            proc.kill()
+        proc.wait()
+
+
+def children_of(pid, count=1, timeout=10):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        children = psutil.Process(pid).children()
+        if len(children) >= count:
+            return children
+        time.sleep(0.02)
+    raise AssertionError("子进程没有启动")
+
+
+def no_fallback(names):
+    raise AssertionError(f"不应按名称结束：{names}")
+
+
+def test_terminates_spawned_child(spawn):
+    engine = TerminationEngine(fallback=no_fallback)
+    proc = spawn(SLEEPER)
+    create_time = psutil.Process(proc.pid).create_time()
+    results = engine.terminate({"sleeper": {proc.pid: create_time}}, {"sleeper": time.monotonic()})
+    assert [(result.pid, result.status) for result in results] == [(proc.pid, TERMINATED)]
+    assert proc.wait(timeout=5) is not None
+    assert succeeded(results, "sleeper")
+    assert len(engine.latencies) == 1
+
+
+def test_reused_pid_is_reported_gone_and_not_killed(spawn):
+    proc = spawn(SLEEPER)
+    create_time = psutil.Process(proc.pid).create_time()
+    results = TerminationEngine(fallback=no_fallback).terminate({"sleeper": {proc.pid: create_time - 10}})
+    assert [(result.pid, result.status) for result in results] == [(proc.pid, ALREADY_GONE)]
+    assert proc.poll() is None
+
+
+def test_subtree_from_tree_checks_create_time(spawn):
+    parent = spawn(PARENT)
+    child = children_of(parent.pid)[0]
+    root = psutil.Process(parent.pid)
+    tree = ProcessTree()
+    tree.add(parent.pid, 0, root.create_time())
+    # 树中记录的创建时间与实际进程不符，视为PID已被复用
+    tree.add(child.pid, parent.pid, child.create_time() + 10)
+    results = TerminationEngine(fallback=no_fallback).terminate(
+        {"parent": {parent.pid: root.create_time()}}, tree=tree)
+    statuses = {result.pid: result.status for result in results}
+    assert statuses == {parent.pid: TERMINATED, child.pid: ALREADY_GONE}
+    assert child.is_running() and child.status() != psutil.STATUS_ZOMBIE
+    child.kill()
+
+
+def test_without_tree_children_are_found_through_psutil(spawn):
+    parent = spawn(PARENT)
+    child = children_of(parent.pid)[0]
+    results = TerminationEngine(fallback=no_fallback).terminate({"parent": {parent.pid: None}})
+    assert [(result.pid, result.status) for result in results] == [(parent.pid, TERMINATED)]
+    child.wait(timeout=5)
+
+
+def test_fallback_kills_known_pids_only_and_never_path_rules_by_name():
+    calls = []
+
+    def fallback(process_names=(), pids=()):
+        calls.append((list(process_names), list(pids)))
+        return True
+
+    rules = RuleSet.from_dicts([{"name": "rtc.exe", "actions": ["kill"]},
+                                {"name": "agent", "match": "path", "pattern": r"C:\Seewo\agent.exe",
+                                 "actions": ["kill"]}])
+    engine = TerminationEngine(fallback=fallback)
+    denied = [TerminationResult(4321, "agent", ACCESS_DENIED, 0.0), TerminationResult(4322, "agent", ALREADY_GONE, 0.0)]
+    results = engine._fall_back(denied, ["rtc.exe", "agent"], rules.images(), time.monotonic())
+    # 已知PID只按PID结束；没有PID的路径规则不按名称结束，名称规则按映像名结束
+    assert calls == [([], [4321]), (["rtc.exe"], [])]
+    assert [(result.pid, result.name, result.status) for result in results] == [
+        (4322, "agent", ALREADY_GONE), (4321, "agent", FALLBACK_OK),
+        (None, "rtc.exe", FALLBACK_OK), (None, "agent", FALLBACK_FAILED)]
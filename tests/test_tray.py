@@ -0,0 +1,54 @@
+import threading
+
+from seewo_watcher.tray import TrayRefresher
+
+
+class Recorder:
+    def __init__(self):
+        self.icons = []
+        self.menus = 0
+        self.pushed = threading.Event()
+
+    def push_icon(self, key):
+        self.icons.append(key)
+        self.pushed.set()
+
+    def push_menu(self):
+        self.menus += 1
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_unchanged_requests_are_dropped():
+    recorder, clock = Recorder(), FakeClock()
+    refresher = TrayRefresher(recorder.push_icon, recorder.push_menu, 10, clock=clock)
+    refresher.request(1, 0)
+    clock.now += 1
+    refresher.request(1, 0)
+    clock.now += 1
+    # 只有菜单变化时不重新推送图标
+    refresher.request(1, 1)
+    assert recorder.icons == [1]
+    assert recorder.menus == 2
+    assert (refresher.requests, refresher.pushed, refresher.dropped) == (3, 2, 1)
+
+
+def test_requests_within_the_rate_limit_are_coalesced_into_the_latest():
+    recorder, clock = Recorder(), FakeClock()
+    refresher = TrayRefresher(recorder.push_icon, recorder.push_menu, 10, clock=clock)
+    refresher.request(1, 0)
+    recorder.pushed.clear()
+    # 间隔不足0.1秒的请求交给后台线程，只推送最后一个状态
+    for key in (2, 3, 4):
+        refresher.request(key, 0)
+    assert refresher.coalesced == 2
+    clock.now += 1
+    assert recorder.pushed.wait(5)
+    assert recorder.icons == [1, 4]
+    assert refresher.pushed == 2